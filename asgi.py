@@ -0,0 +1,18 @@
+"""
+ASGI entry point for serving the training application alongside the framework's gunicorn, with the async variants
+of the views, e.g.
+
+    gunicorn training.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8443
+
+Each worker serves many requests at once from one event loop, so a request that is waiting on Membership does not
+hold a thread that other requests could use.
+"""
+# stdlib
+import os
+# libs
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'system_conf.settings')
+os.environ.setdefault('TRAINING_ASYNC_VIEWS', 'true')
+
+application = get_asgi_application()
@@ -0,0 +1,21 @@
+"""
+Benchmarks of the optimisations made to the training application, run with `python manage.py benchmark <name>`.
+
+Each benchmark measures a code path before and after its optimisation against the DB and settings that the command is
+run with, so they are run against a DB holding realistic data rather than as part of the tests.
+"""
+# local
+from . import async_load, explain, pool, uri
+
+__all__ = [
+    'BENCHMARKS',
+]
+
+# The modules of the benchmarks, keyed by name. Each has a `HELP` string, an `add_arguments(parser)` function and a
+# `run(command, **options)` function that writes its results to the command's stdout
+BENCHMARKS = {
+    'async_load': async_load,
+    'explain': explain,
+    'pool': pool,
+    'uri': uri,
+}
@@ -0,0 +1,192 @@
+"""
+Compare the throughput of the sync and async Student views for creates that each check a new User in Membership.
+
+The creates are made through the real views, as a worker would handle them; the sync views from a number of threads
+at once, as the threads of a WSGI worker do, and the async views from one event loop with each request in its own
+context, as the ASGI handler does. Membership is simulated by a client that waits for the given latency before finding
+the User, so the comparison does not depend on the network and no Users need to exist.
+The Students are created in a Syllabus and Class made for the benchmark, which are removed along with them afterwards.
+"""
+# stdlib
+import asyncio
+import statistics
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest import mock
+# libs
+from asgiref.sync import sync_to_async, ThreadSensitiveContext
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+# local
+from training import views
+from training.models import Cls, Student, Syllabus
+from training.utils import membership, routing, shards
+
+HELP = 'Compare the throughput of the sync and async Student views for creates that wait on Membership'
+
+MODE_SYNC = 'sync'
+MODE_ASYNC = 'async'
+MODES = (MODE_SYNC, MODE_ASYNC)
+
+
+def add_arguments(parser: ArgumentParser):
+    parser.add_argument('--member-id', type=int, default=1, help='The Member to create the Students in')
+    parser.add_argument('--requests', type=int, default=200, help='The number of Students created by each mode')
+    parser.add_argument('--threads', type=int, default=8, help='The number of threads of the sync mode')
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.05,
+        help='The number of seconds that the simulated Membership takes to read a User',
+    )
+    parser.add_argument('modes', nargs='*', help=f'The modes to compare, out of {", ".join(MODES)}, or all')
+
+
+class _Response:
+    """
+    A response from the simulated Membership
+    """
+
+    def __init__(self, content: Any):
+        self.status_code = status.HTTP_200_OK
+        self.content = content
+
+    def json(self) -> Dict[str, Any]:
+        return {'content': self.content}
+
+
+class _Users:
+    """
+    The User service of the simulated Membership, which finds every User after waiting for the latency
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def read(self, pk: int, **kwargs) -> _Response:
+        time.sleep(self.latency)
+        return _Response({'id': pk})
+
+    def list(self, params: Dict[str, Any], **kwargs) -> _Response:
+        time.sleep(self.latency)
+        return _Response([{'id': pk} for pk in params['search[id__in]']])
+
+
+class _User:
+    """
+    The requesting User, who is an administrator of a self managed Member
+    """
+    id = 0
+    is_authenticated = True
+
+    def __init__(self, member_id: int):
+        self.member = {'id': member_id, 'self_managed': True}
+
+
+def _request(user: _User, cls: Cls, user_id: int):
+    """
+    Build an authenticated request to create a Student in the benchmark's Class
+    """
+    request = APIRequestFactory().post('/student/', {'cls_id': cls.pk, 'user_id': user_id}, format='json')
+    force_authenticate(request, user=user, token='benchmark')
+    return request
+
+
+def _sync(user: _User, cls: Cls, user_ids: List[int]) -> List[float]:
+    """
+    Create a Student for each User through the sync view, timing each request in milliseconds
+    """
+    view = views.StudentCollection.as_view()
+    times = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        with settings.TRACER.start_span('benchmark') as span:
+            request = _request(user, cls, user_id)
+            request.span = span
+            response = view(request)
+        close_old_connections()
+        if response.status_code != status.HTTP_201_CREATED:
+            raise CommandError(f'the sync view responded {response.status_code}: {response.data}')
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+async def _async(user: _User, cls: Cls, user_ids: List[int]) -> List[float]:
+    """
+    Create a Student for each User through the async view, all at once, timing each request in milliseconds
+    """
+    view = views.AsyncStudentCollection.as_view()
+
+    async def create(user_id: int) -> float:
+        # Each request makes its DB queries in a thread of its own, as it does under the ASGI handler
+        async with ThreadSensitiveContext():
+            start = time.perf_counter()
+            with settings.TRACER.start_span('benchmark') as span:
+                request = _request(user, cls, user_id)
+                request.span = span
+                response = await view(request)
+            await sync_to_async(close_old_connections)()
+            if response.status_code != status.HTTP_201_CREATED:
+                raise CommandError(f'the async view responded {response.status_code}: {response.data}')
+            return (time.perf_counter() - start) * 1000
+
+    return list(await asyncio.gather(*(create(user_id) for user_id in user_ids)))
+
+
+def run(
+    command: BaseCommand,
+    member_id: int,
+    requests: int,
+    threads: int,
+    latency: float,
+    modes: list,
+    **options,
+):
+    unknown = set(modes) - set(MODES)
+    if len(unknown) > 0:
+        raise CommandError(f'unknown modes: {", ".join(sorted(unknown))}')
+    modes = modes or list(MODES)
+    user = _User(member_id)
+
+    with routing.use(shards.for_member(member_id)):
+        syllabus = Syllabus.objects.create(name='async_load benchmark', description='', member_id=member_id)
+        cls = Cls.objects.create(syllabus=syllabus, member_id=member_id, trainer='benchmark', start_date=timezone.now())
+    command.stdout.write(
+        f'{requests} Students created by each mode in Member {member_id}, with {latency * 1000:.0f} ms of Membership '
+        f'latency:',
+    )
+    try:
+        with mock.patch.object(membership, 'Membership', SimpleNamespace(user=_Users(latency))):
+            for index, mode in enumerate(modes):
+                # Every request checks a User that has not been cached yet
+                membership.user_cache.clear()
+                user_ids = list(range(index * requests + 1, (index + 1) * requests + 1))
+                start = time.perf_counter()
+                if mode == MODE_SYNC:
+                    batches = [user_ids[thread::threads] for thread in range(threads)]
+                    with ThreadPoolExecutor(threads) as executor:
+                        results = list(executor.map(_sync, [user] * threads, [cls] * threads, batches))
+                    times = [t for result in results for t in result]
+                    label = f'{mode} ({threads} threads)'
+                else:
+                    times = asyncio.run(_async(user, cls, user_ids))
+                    label = f'{mode} (1 loop)'
+                elapsed = time.perf_counter() - start
+                p99 = statistics.quantiles(times, n=100)[98]
+                command.stdout.write(
+                    f'  {label:<18}  {len(times) / elapsed:8.0f} req/s  '
+                    f'p50 {statistics.median(times):7.2f} ms  p99 {p99:7.2f} ms',
+                )
+    finally:
+        membership.user_cache.clear()
+        with routing.use(shards.for_member(member_id)):
+            Student._base_manager.filter(cls=cls).delete()
+            Cls._base_manager.filter(pk=cls.pk).delete()
+            Syllabus._base_manager.filter(pk=syllabus.pk).delete()
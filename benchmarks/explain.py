@@ -0,0 +1,112 @@
+"""
+Compare the PostgreSQL plans of the list queries with and without the indexes that were added for them.
+
+The plans without the indexes are taken in a transaction that drops them and is then rolled back, so the indexes are
+never really removed. Dropping an index locks its table until the transaction ends, so this should be run against a
+copy of the DB rather than one that is serving requests.
+"""
+# stdlib
+from argparse import ArgumentParser
+from typing import Callable, Dict, Tuple
+# libs
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import Count, QuerySet
+# local
+from training.models import Cls, Student, Syllabus
+from training.utils import pagination
+
+HELP = 'Compare the PostgreSQL plans of the list queries with and without their indexes, on a copy of the DB'
+
+# The queries to explain, keyed by name, with a function that builds each for a Member and a search term, and the
+# indexes it should use
+QUERIES: Dict[str, Tuple[Callable[[int, str], QuerySet], Tuple[str, ...]]] = {
+    'cls_list_by_id': (
+        lambda member_id, term: Cls.objects.filter(member_id=member_id).order_by(*pagination.ordering('id')),
+        ('cls_member_id',),
+    ),
+    'cls_list_by_start_date': (
+        lambda member_id, term: Cls.objects.filter(member_id=member_id).order_by(*pagination.ordering('start_date')),
+        ('cls_member_start_date',),
+    ),
+    'cls_list_by_trainer': (
+        lambda member_id, term: Cls.objects.filter(member_id=member_id).order_by(*pagination.ordering('-trainer')),
+        ('cls_member_trainer',),
+    ),
+    'cls_trainer_icontains': (
+        lambda member_id, term: Cls.objects.filter(member_id=member_id, trainer__icontains=term).order_by('id'),
+        ('cls_trainer_upper_trgm',),
+    ),
+    'student_list_by_created': (
+        lambda member_id, term: Student.objects.filter(member_id=member_id).order_by(*pagination.ordering('created')),
+        ('student_member_created',),
+    ),
+    'student_list_by_user_id': (
+        lambda member_id, term: Student.objects.filter(member_id=member_id).order_by(*pagination.ordering('user_id')),
+        ('student_member_user_id',),
+    ),
+    'student_notes_icontains': (
+        lambda member_id, term: Student.objects.filter(member_id=member_id, notes__icontains=term).order_by('id'),
+        ('student_notes_upper_trgm',),
+    ),
+    'syllabus_list_by_name': (
+        lambda member_id, term: Syllabus.objects.filter(member_id=member_id).order_by(*pagination.ordering('name')),
+        ('syllabus_member_name',),
+    ),
+    'syllabus_name_icontains': (
+        lambda member_id, term: Syllabus.objects.filter(member_id=member_id, name__icontains=term).order_by('id'),
+        ('syllabus_name_upper_trgm',),
+    ),
+}
+
+
+def add_arguments(parser: ArgumentParser):
+    parser.add_argument(
+        '--member-id',
+        type=int,
+        help='The Member to list the records of, which defaults to the Member with the most Students',
+    )
+    parser.add_argument('--limit', type=int, default=50, help='The number of records on the page')
+    parser.add_argument('--term', default='son', help='The substring to search for, which should be 3 or more letters')
+    parser.add_argument('--analyze', action='store_true', help='Run the queries, reporting their real timings')
+    parser.add_argument('query', nargs='*', help=f'The queries to explain, out of {", ".join(sorted(QUERIES))}')
+
+
+def _explain(objs: QuerySet, analyze: bool) -> str:
+    """
+    Explain a query, running it as well if asked so that the plan includes its timings and the buffers it read
+    """
+    return objs.explain(analyze=analyze, buffers=analyze)
+
+
+def run(command: BaseCommand, member_id: int, limit: int, term: str, analyze: bool, query: list, **options):
+    unknown = set(query) - set(QUERIES)
+    if len(unknown) > 0:
+        raise CommandError(f'unknown queries: {", ".join(sorted(unknown))}')
+    # The indexes can only be dropped on the primary, so the queries are explained there as well
+    using = router.db_for_write(Student)
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        raise CommandError(f'the plans can only be compared on PostgreSQL, not {connection.vendor}')
+    if member_id is None:
+        members = Student.objects.using(using).values('member_id').annotate(total=Count('pk'))
+        busiest = members.order_by('-total').first()
+        if busiest is None:
+            raise CommandError('there are no Students to list')
+        member_id = busiest['member_id']
+
+    for name in query or sorted(QUERIES):
+        build, indexes = QUERIES[name]
+        objs = build(member_id, term).using(using)[:limit + 1]
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                for index in indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index)}')
+            before = _explain(objs, analyze)
+            transaction.set_rollback(True, using=using)
+        after = _explain(objs, analyze)
+        command.stdout.write(f'{name} for Member {member_id}, without {", ".join(indexes)}:')
+        command.stdout.write(before)
+        command.stdout.write(f'{name} for Member {member_id}, with them:')
+        command.stdout.write(after)
+        command.stdout.write('')
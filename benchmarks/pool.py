@@ -0,0 +1,111 @@
+"""
+Compare the cost of getting a DB connection for each request, with a new connection per request, with persistent
+connections and with a psycopg pool.
+
+Each simulated request closes the connections that Django would close at the start and end of a request and makes one
+query in between, from a number of threads at once as the threads of a worker do. The modes are set on the connection
+settings of the DB for the length of the benchmark, so the pool can be compared whether or not TRAINING_DB_POOL is on.
+"""
+# stdlib
+import copy
+import statistics
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+# libs
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+# local
+from training.utils import shards
+
+HELP = 'Compare new, persistent and pooled DB connections for simulated requests from many threads'
+
+MODE_CONNECT = 'connect'
+MODE_PERSISTENT = 'persistent'
+MODE_POOL = 'pool'
+MODES = (MODE_CONNECT, MODE_PERSISTENT, MODE_POOL)
+
+
+def add_arguments(parser: ArgumentParser):
+    parser.add_argument('--database', default=shards.DEFAULT, help='The DB to connect to')
+    parser.add_argument('--threads', type=int, default=8, help='The number of threads making requests at once')
+    parser.add_argument('--requests', type=int, default=200, help='The number of requests made by each thread')
+    parser.add_argument('--pool-size', type=int, default=8, help='The max_size of the pool, for the pool mode')
+    parser.add_argument('modes', nargs='*', help=f'The modes to compare, out of {", ".join(MODES)}, or all')
+
+
+def _settings(base: Dict[str, Any], mode: str, pool_size: int) -> Dict[str, Any]:
+    """
+    Generate the connection settings of the DB for a mode, from the settings it is configured with
+    """
+    settings = copy.deepcopy(base)
+    settings['OPTIONS'].pop('pool', None)
+    if mode == MODE_CONNECT:
+        settings['CONN_MAX_AGE'] = 0
+    elif mode == MODE_PERSISTENT:
+        settings['CONN_MAX_AGE'] = None
+    else:
+        settings['CONN_MAX_AGE'] = 0
+        settings['OPTIONS']['pool'] = {
+            **(base['OPTIONS'].get('pool') or {}),
+            'max_size': pool_size,
+            'min_size': pool_size,
+        }
+    return settings
+
+
+def _requests(alias: str, total: int) -> List[float]:
+    """
+    Make a number of simulated requests, each with one query, timing each of them in milliseconds
+    """
+    times = []
+    try:
+        for _ in range(total):
+            start = time.perf_counter()
+            close_old_connections()
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            close_old_connections()
+            times.append((time.perf_counter() - start) * 1000)
+    finally:
+        connections[alias].close()
+    return times
+
+
+def run(command: BaseCommand, database: str, threads: int, requests: int, pool_size: int, modes: list, **options):
+    unknown = set(modes) - set(MODES)
+    if len(unknown) > 0:
+        raise CommandError(f'unknown modes: {", ".join(sorted(unknown))}')
+    modes = modes or list(MODES)
+    connection = connections[database]
+    if MODE_POOL in modes and (connection.vendor != 'postgresql' or django.VERSION < (5, 1)):
+        raise CommandError('the pool mode needs PostgreSQL and Django 5.1 or later')
+
+    # Every thread's connection shares the settings of the DB, which are restored once the modes have been compared
+    base = connections.settings[database]
+    original = copy.deepcopy(base)
+    command.stdout.write(f'{threads} threads making {requests} requests each against {database}:')
+    try:
+        for mode in modes:
+            connection.close()
+            base.clear()
+            base.update(_settings(original, mode, pool_size))
+            with ThreadPoolExecutor(threads) as executor:
+                start = time.perf_counter()
+                results = list(executor.map(_requests, [database] * threads, [requests] * threads))
+                elapsed = time.perf_counter() - start
+            if mode == MODE_POOL:
+                connection.close_pool()
+            times = [t for result in results for t in result]
+            p99 = statistics.quantiles(times, n=100)[98]
+            command.stdout.write(
+                f'  {mode:<10}  {len(times) / elapsed:8.0f} req/s  '
+                f'p50 {statistics.median(times):7.2f} ms  p99 {p99:7.2f} ms',
+            )
+    finally:
+        connection.close()
+        base.clear()
+        base.update(original)
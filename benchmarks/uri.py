@@ -0,0 +1,45 @@
+"""
+Build the URIs of a page of records with `reverse` and with the cached templates of `training.utils.uri`
+"""
+# stdlib
+import time
+from argparse import ArgumentParser
+# libs
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+# local
+from training.utils.uri import resource_uri
+
+HELP = 'Compare building resource URIs with reverse() to the cached templates, for the rows of a list page'
+NAMES = ('cls_resource', 'student_resource', 'syllabus_resource')
+
+
+def add_arguments(parser: ArgumentParser):
+    parser.add_argument('--rows', type=int, default=1000, help='The number of rows on the page')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of times to build the page, best is kept')
+
+
+def _best(build, repeat: int) -> float:
+    """
+    Time the best of a number of runs, in milliseconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def run(command: BaseCommand, rows: int, repeat: int, **options):
+    pks = range(1, rows + 1)
+    before = [reverse(name, kwargs={'pk': pk}) for pk in pks for name in NAMES]
+    after = [resource_uri(name, pk) for pk in pks for name in NAMES]
+    if before != after:
+        raise AssertionError('the templates built different URIs to reverse()')
+
+    reversed_ms = _best(lambda: [reverse(name, kwargs={'pk': pk}) for pk in pks for name in NAMES], repeat)
+    template_ms = _best(lambda: [resource_uri(name, pk) for pk in pks for name in NAMES], repeat)
+    command.stdout.write(f'{len(NAMES)} URIs for each of {rows} rows, best of {repeat}:')
+    command.stdout.write(f'  reverse()  {reversed_ms:8.1f} ms  {reversed_ms * 1000 / rows:7.1f} us/row')
+    command.stdout.write(f'  templates  {template_ms:8.1f} ms  {template_ms * 1000 / rows:7.1f} us/row')
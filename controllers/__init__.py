@@ -1,9 +1,14 @@
 from .cls import (
+    ClsBulkUpdateController,
     ClsCreateController,
     ClsListController,
     ClsUpdateController,
 )
 
+from .search import (
+    SearchListController,
+)
+
 from .syllabus import (
     SyllabusCreateController,
     SyllabusListController,
@@ -11,6 +16,9 @@ from .syllabus import (
 )
 
 from .student import (
+    StudentBulkCreateController,
+    StudentBulkItemController,
+    StudentBulkUpdateController,
     StudentCreateController,
     StudentListController,
     StudentUpdateController,
@@ -20,10 +28,15 @@ from .student import (
 __all__ = [
     # Class
 
+    'ClsBulkUpdateController',
     'ClsCreateController',
     'ClsListController',
     'ClsUpdateController',
 
+    # Search
+
+    'SearchListController',
+
     # Syllabus
 
     'SyllabusCreateController',
@@ -32,6 +45,9 @@ __all__ = [
 
     # Student
 
+    'StudentBulkCreateController',
+    'StudentBulkItemController',
+    'StudentBulkUpdateController',
     'StudentCreateController',
     'StudentListController',
     'StudentUpdateController',
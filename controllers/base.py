@@ -0,0 +1,39 @@
+# libs
+from cloudcix_rest.controllers import ControllerBase
+# local
+from training.serializers.base import LAYOUT_NESTED, LAYOUTS
+from training.utils.count import COUNT_EXACT, COUNT_MODES
+
+__all__ = [
+    'ListControllerBase',
+]
+
+
+class ListControllerBase(ControllerBase):
+    """
+    Validates the list parameters that are specific to the training application, on top of the search, exclude,
+    order, limit and page parameters validated by the ControllerBase
+    """
+
+    def is_valid(self) -> bool:
+        """
+        Extend the ControllerBase validation to also clean the training specific list parameters
+        """
+        valid = super().is_valid()
+        self.cleaned_data['cursor'] = self.request.GET.get('cursor') or None
+        # The sparse fieldset and expand are parsed by the view, using the serializer for the listed records
+        self.cleaned_data['fields'] = self.request.GET.get('fields') or None
+        # An empty expand is kept apart from a missing one, as it means that no nested objects should be expanded
+        self.cleaned_data['expand'] = self.request.GET.get('expand')
+
+        # Lists are counted exactly unless the User asks for a cheaper count. An invalid count is left out of
+        # cleaned_data so that the view can report it
+        count = self.request.GET.get('count') or COUNT_EXACT
+        if count in COUNT_MODES:
+            self.cleaned_data['count'] = count
+
+        # Lists are nested unless the User asks for them to be normalized. An invalid layout is also left out
+        layout = self.request.GET.get('layout') or LAYOUT_NESTED
+        if layout in LAYOUTS:
+            self.cleaned_data['layout'] = layout
+        return valid
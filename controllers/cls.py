@@ -4,16 +4,19 @@ from typing import Optional, cast
 # libs
 from cloudcix_rest.controllers import ControllerBase
 # local
+from training.controllers.base import ListControllerBase
 from training.models import Cls, Syllabus
+from training.utils import identity
 
 __all__ = [
+    'ClsBulkUpdateController',
     'ClsListController',
     'ClsCreateController',
     'ClsUpdateController',
 ]
 
 
-class ClsListController(ControllerBase):
+class ClsListController(ListControllerBase):
     """
     Validates User data used to list Class records
     """
@@ -95,12 +98,13 @@ class ClsCreateController(ControllerBase):
         type: integer
         """
         try:
-            syllabus = Syllabus.objects.get(id=int(cast(int, syllabus_id)))
+            syllabus = identity.get(Syllabus.objects.all(), int(cast(int, syllabus_id)))
         except (ValueError, TypeError):
             # syllabus_id was not an int
             return 'training_cls_create_104'
         except Syllabus.DoesNotExist:
             return 'training_cls_create_105'
+        self.cleaned_data['member_id'] = syllabus.member_id
         self.cleaned_data['syllabus'] = syllabus
         return None
 
@@ -120,6 +124,55 @@ class ClsCreateController(ControllerBase):
         return None
 
 
+class ClsBulkUpdateController(ControllerBase):
+    """
+    Validates User data used to update many Class records at once, which is set on every selected Class
+    """
+    class Meta(ControllerBase.Meta):
+        """
+        Overrides some of the ControllerBase.Meta fields to make them more specific
+        for this controller
+        """
+        validation_order = (
+            'finish_date',
+            'trainer',
+        )
+
+    def validate_finish_date(self, finish_date: Optional[datetime]) -> Optional[str]:
+        """
+        description: |
+            The date on which every selected Class should end, which cannot be before the start_date of any of them
+        type: string
+        required: false
+        """
+        if finish_date is None:
+            self.cleaned_data['finish_date'] = None
+            return None
+        try:
+            self.cleaned_data['finish_date'] = datetime.strptime(str(finish_date).split('T')[0], '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return 'training_cls_bulk_update_101'
+        return None
+
+    def validate_trainer(self, trainer: Optional[str]) -> Optional[str]:
+        """
+        description: The name of the trainer for every selected Class
+        type: string
+        required: false
+        """
+        if trainer is None:
+            trainer = ''
+        trainer = str(trainer).strip()
+        if len(trainer) == 0:
+            return 'training_cls_bulk_update_102'
+
+        if len(trainer) > Cls._meta.get_field('trainer').max_length:
+            return 'training_cls_bulk_update_103'
+
+        self.cleaned_data['trainer'] = trainer
+        return None
+
+
 class ClsUpdateController(ControllerBase):
     """
     Validates User data used to update a new Class record
@@ -178,13 +231,14 @@ class ClsUpdateController(ControllerBase):
         type: integer
         """
         try:
-            syllabus = Syllabus.objects.get(id=int(cast(int, syllabus_id)))
+            syllabus = identity.get(Syllabus.objects.all(), int(cast(int, syllabus_id)))
         except (ValueError, TypeError):
             # syllabus_id was not an int
             return 'training_cls_update_104'
         except Syllabus.DoesNotExist:
             return 'training_cls_update_105'
 
+        self.cleaned_data['member_id'] = syllabus.member_id
         self.cleaned_data['syllabus'] = syllabus
         return None
 
@@ -0,0 +1,45 @@
+# libs
+from cloudcix_rest.controllers import ControllerBase
+
+__all__ = [
+    'SEARCH_TYPES',
+    'SearchListController',
+]
+
+# The kinds of record that can be searched, by the name they are reported under
+SEARCH_TYPES = ('student', 'syllabus')
+
+
+class SearchListController(ControllerBase):
+    """
+    Validates User data used to search the records in a Member, on top of the limit and page parameters validated by
+    the ControllerBase
+    """
+    class Meta(ControllerBase.Meta):
+        """
+        Override some of the ControllerBase.Meta fields to make them more specific for this Controller
+        """
+        # Results are always ordered by how well they match the query, best first
+        allowed_ordering = (
+            'rank',
+        )
+        search_fields: dict = {}
+
+    def is_valid(self) -> bool:
+        """
+        Extend the ControllerBase validation to also clean the query and the types of record to search.
+        Invalid values are left out of cleaned_data so that the view can report them
+        """
+        valid = super().is_valid()
+        query = (self.request.GET.get('query') or '').strip()
+        if len(query) > 0:
+            self.cleaned_data['query'] = query
+
+        types = self.request.GET.get('types')
+        if types is None:
+            self.cleaned_data['types'] = SEARCH_TYPES
+        else:
+            types = tuple(dict.fromkeys(name.strip() for name in types.split(',')))
+            if all(name in SEARCH_TYPES for name in types):
+                self.cleaned_data['types'] = types
+        return valid
@@ -1,19 +1,27 @@
 # stdlib
-from typing import cast, Optional
+from typing import Any, cast, Dict, List, Optional
 # libs
-from cloudcix.api import Membership
 from cloudcix_rest.controllers import ControllerBase
 # local
+from training.controllers.base import ListControllerBase
 from training.models import Cls, Student
+from training.utils import identity
+from training.utils.membership import user_exists
 
 __all__ = [
+    'StudentBulkCreateController',
+    'StudentBulkItemController',
+    'StudentBulkUpdateController',
     'StudentListController',
     'StudentCreateController',
     'StudentUpdateController',
 ]
 
+# The most Students that can be created in one request
+BULK_CREATE_LIMIT = 1000
 
-class StudentListController(ControllerBase):
+
+class StudentListController(ListControllerBase):
     """
     Validates User data used to list Student records
     """
@@ -63,13 +71,14 @@ class StudentCreateController(ControllerBase):
         type: integer
         """
         try:
-            cls = Cls.objects.get(id=int(cast(int, cls_id)))
+            cls = identity.get(Cls.objects.all(), int(cast(int, cls_id)))
         except (ValueError, TypeError):
             # cls_id was not an int
             return 'training_student_create_101'
         except Cls.DoesNotExist:
             return 'training_student_create_102'
         self.cleaned_data['cls'] = cls
+        self.cleaned_data['member_id'] = cls.member_id
         return None
 
     def validate_notes(self, notes: Optional[str]) -> Optional[str]:
@@ -92,20 +101,95 @@ class StudentCreateController(ControllerBase):
                 raise ValueError
         except(TypeError, ValueError):
             return 'training_student_create_103'
-        try:
-            response = Membership.user.read(
-                token=self.request.auth,
-                pk=user_id,
-                span=self.span,
-            )
-            if response.status_code != 200:
-                raise ValueError
-        except ValueError:
+        if not user_exists(self.request, user_id, self.span):
             return 'training_student_create_104'
         self.cleaned_data['user_id'] = user_id
         return None
 
 
+class StudentBulkCreateController(ControllerBase):
+    """
+    Validates User data used to create many Student records in a Class at once.
+    Each Student in the list is validated separately by a StudentBulkItemController, once the Class and its
+    permissions have been checked.
+    """
+    class Meta(ControllerBase.Meta):
+        """
+        Override some of the ControllerBase.Meta fields to make them more specific for this controller
+        """
+        validation_order = (
+            'cls_id',
+            'students',
+        )
+
+    def validate_cls_id(self, cls_id: Optional[int]) -> Optional[str]:
+        """
+        description: The id of the Class to create every Student in
+        type: integer
+        """
+        try:
+            cls = identity.get(Cls.objects.all(), int(cast(int, cls_id)))
+        except (ValueError, TypeError):
+            # cls_id was not an int
+            return 'training_student_bulk_create_101'
+        except Cls.DoesNotExist:
+            return 'training_student_bulk_create_102'
+        self.cleaned_data['cls'] = cls
+        return None
+
+    def validate_students(self, students: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        """
+        description: |
+            The Students to create in the Class, each with the same 'user_id' and 'notes' as a single create.
+            At most 1000 Students can be sent at once.
+        type: array
+        items:
+            type: object
+        """
+        if not isinstance(students, list) or not 0 < len(students) <= BULK_CREATE_LIMIT:
+            return 'training_student_bulk_create_103'
+        if not all(isinstance(student, dict) for student in students):
+            return 'training_student_bulk_create_103'
+        self.cleaned_data['students'] = students
+        return None
+
+
+class StudentBulkItemController(StudentCreateController):
+    """
+    Validates a single Student in the list sent to create many Student records in a Class at once
+    """
+    class Meta(StudentCreateController.Meta):
+        """
+        The Class is validated once for the whole list by the StudentBulkCreateController
+        """
+        validation_order = (
+            'user_id',
+            'notes',
+        )
+
+
+class StudentBulkUpdateController(ControllerBase):
+    """
+    Validates User data used to update many Student records at once, which is set on every selected Student
+    """
+    class Meta(ControllerBase.Meta):
+        """
+        Override some of the ControllerBase.Meta fields to make them more specific for this controller
+        """
+        validation_order = (
+            'notes',
+        )
+
+    def validate_notes(self, notes: Optional[str]) -> Optional[str]:
+        """
+        description: The notes to set on every selected Student
+        type: string
+        required: false
+        """
+        self.cleaned_data['notes'] = str(notes).strip() if notes else ''
+        return None
+
+
 class StudentUpdateController(ControllerBase):
     """
     Validates User data used to update a Student record
@@ -127,13 +211,14 @@ class StudentUpdateController(ControllerBase):
         type: integer
         """
         try:
-            cls = Cls.objects.get(id=int(cast(int, cls_id)))
+            cls = identity.get(Cls.objects.all(), int(cast(int, cls_id)))
         except (ValueError, TypeError):
             # cls_id was not an int
             return 'training_student_update_101'
         except Cls.DoesNotExist:
             return 'training_student_update_102'
         self.cleaned_data['cls'] = cls
+        self.cleaned_data['member_id'] = cls.member_id
         return None
 
     def validate_notes(self, notes):
@@ -156,15 +241,8 @@ class StudentUpdateController(ControllerBase):
                 raise ValueError
         except(TypeError, ValueError):
             return 'training_student_update_103'
-        try:
-            response = Membership.user.read(
-                token=self.request.auth,
-                pk=user,
-                span=self.span,
-            )
-            if response.status_code != 200:
-                raise ValueError
-        except ValueError:
+        # The User only needs to be checked in Membership if it is being changed
+        if user != self._instance.user_id and not user_exists(self.request, user, self.span):
             return 'training_student_update_104'
         self.cleaned_data['user_id'] = user
         return None
@@ -3,10 +3,11 @@ from typing import Optional
 # libs
 from cloudcix_rest.controllers import ControllerBase
 # local
+from training.controllers.base import ListControllerBase
 from training.models import Syllabus
 
 
-class SyllabusListController(ControllerBase):
+class SyllabusListController(ListControllerBase):
     """
     Validates user data used to list Syllabus records
     """
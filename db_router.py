@@ -9,13 +9,18 @@ for various operations
 - Relations
 - Migrations
 
-This stuff could be used when it comes to sharding out the DBs too.
+The training DB can be sharded by Member, with each request routed to the shard that holds the requesting User's
+Member. Reads made while handling a request that does not write can be spread across read replicas of the shared
+training DB, which are listed in the TRAINING_READ_REPLICAS setting. See `training.utils.routing` for the rules that
+keep Users reading their own writes.
 """
 
 # stdlib
 from typing import Any, Dict, Optional, Type
 # libs
 from django.db.models import Model
+# local
+from training.utils import routing, shards
 
 
 class TrainingRouter:
@@ -31,7 +36,11 @@ class TrainingRouter:
         :return: The name of the DB to route reads to
         """
         if model._meta.app_label == 'training':
-            return 'training'
+            # Records related to an instance are read from the same DB as it, so they are as up to date as each other
+            instance = hints.get('instance')
+            if instance is not None and instance._state.db is not None:
+                return instance._state.db
+            return routing.db_for_read()
         # We don't read from any other DB during test so we can safely ignore this line from coverage
         return None  # pragma: no cover
 
@@ -43,7 +52,7 @@ class TrainingRouter:
         :return: The name of the DB to route writes to
         """
         if model._meta.app_label == 'training':
-            return 'training'
+            return routing.db_for_write()
         # We don't write to any other DB during test so we can safely ignore this line from coverage
         return None  # pragma: no cover
 
@@ -55,7 +64,11 @@ class TrainingRouter:
         :param hints: Any hints that can be given to help the decision
         :return: A flag that states whether a relation is allowed between the two supplied model classes.
         """
-        return True if model1._meta.app_label == 'training' and model2._meta.app_label == 'training' else None
+        if model1._meta.app_label != 'training' or model2._meta.app_label != 'training':
+            return None
+        # Records in different shards can never refer to each other, while the replicas are copies of their primary
+        dbs = {model1._state.db, model2._state.db}
+        return len(dbs) == 1 or not dbs <= set(shards.aliases())
 
     def allow_migrate(self, db: str, app_label: str, model_name: str = None, **hints: Dict[str, Any]) -> Optional[bool]:
         """
@@ -66,4 +79,7 @@ class TrainingRouter:
         :param hints: Any hints that can be given to help the decision
         :return: A flag that states whether the migration is allowed
         """
-        return True if app_label == 'training' and db == 'training' else None
+        if app_label != 'training':
+            return None
+        # Every shard is migrated, while the replicas are copied from their primary by the DB so are never migrated
+        return db in shards.aliases()
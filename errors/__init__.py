@@ -1,4 +1,6 @@
 # Import error codes from the files in the module
 from .cls import *
+from .job import *
+from .search import *
 from .student import *
 from .syllabus import *
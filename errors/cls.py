@@ -6,6 +6,31 @@ training_cls_list_001 = (
     'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
     'match the required patterns.'
 )
+training_cls_list_002 = (
+    'The "cursor" parameter is invalid. "cursor" must be a "next_cursor" value returned by a previous request '
+    'with the same "order".'
+)
+training_cls_list_003 = 'The "count" parameter is invalid. "count" must be one of "exact", "estimated" or "none".'
+training_cls_list_004 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of keys returned for each record, '
+    'with the keys of nested records given by their path, e.g. "id,syllabus.name".'
+)
+training_cls_list_005 = (
+    'The "expand" parameter is invalid. "expand" must be a comma separated list of the paths to nested records, '
+    'e.g. "syllabus".'
+)
+training_cls_list_006 = 'The "layout" parameter is invalid. "layout" must be one of "nested" or "normalized".'
+
+# Export
+training_cls_export_001 = (
+    'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
+    'match the required patterns.'
+)
+training_cls_export_002 = 'The "output" parameter is invalid. "output" must be one of "ndjson" or "csv".'
+training_cls_export_003 = (
+    'The "fields" or "expand" parameter is invalid. They must be comma separated lists of the keys returned for each '
+    'record and the nested records to expand, with nested keys given by their path.'
+)
 
 # Create
 training_cls_create_101 = (
@@ -28,6 +53,14 @@ training_cls_create_202 = (
 
 # Read
 training_cls_read_001 = 'The "pk" path parameter is invalid. "pk" must belong to a valid Class record.'
+training_cls_read_002 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of keys returned for the record, '
+    'with the keys of nested records given by their path, e.g. "id,syllabus.name".'
+)
+training_cls_read_003 = (
+    'The "expand" parameter is invalid. "expand" must be a comma separated list of the paths to nested records, '
+    'e.g. "syllabus".'
+)
 training_cls_read_201 = (
     'You do not have permission to execute this method. You can only read a Class in your Member.'
 )
@@ -51,9 +84,52 @@ training_cls_update_201 = (
     'You do not have permission to execute this method. You can only update a Class in your Member.'
 )
 
+# Bulk Update
+training_cls_bulk_update_001 = 'The "ids" parameter is invalid. Every id in "ids" must belong to a valid Class record.'
+training_cls_bulk_update_002 = (
+    'The "ids" parameter is invalid. "ids" must be a comma separated list of between 1 and 1000 positive integers.'
+)
+training_cls_bulk_update_003 = (
+    'No Class records were selected. Either the "ids" parameter or one or more search fields must be sent.'
+)
+training_cls_bulk_update_004 = (
+    'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
+    'match the required patterns.'
+)
+training_cls_bulk_update_005 = 'No fields were sent to update. One or both of "finish_date" and "trainer" must be sent.'
+training_cls_bulk_update_101 = 'The "finish_date" parameter is invalid. "finish_date" must be a date in ISO format.'
+training_cls_bulk_update_102 = 'The "trainer" parameter is invalid. "trainer" must be a non empty string.'
+training_cls_bulk_update_103 = 'The "trainer" parameter is invalid. "trainer" cannot be longer than 50 characters.'
+training_cls_bulk_update_104 = (
+    'The "finish_date" parameter is invalid. "finish_date" cannot be before the "start_date" of any selected Class.'
+)
+training_cls_bulk_update_201 = (
+    'You do not have permission to execute this method. You can only update Classes in your Member.'
+)
+
 # Delete
 training_cls_delete_001 = 'The "pk" path parameter is invalid. "pk" must belong to a valid Class record.'
 training_cls_delete_201 = (
     'You do not have permission to execute this method. You can only delete a Class in your Member.'
 )
 training_cls_delete_202 = 'You do not have permission to make this request. The specified Class has Students in it.'
+
+# Bulk Delete
+training_cls_bulk_delete_001 = 'The "ids" parameter is invalid. Every id in "ids" must belong to a valid Class record.'
+training_cls_bulk_delete_002 = (
+    'The "ids" parameter is invalid. "ids" must be a comma separated list of between 1 and 1000 positive integers.'
+)
+training_cls_bulk_delete_003 = (
+    'No Class records were selected. Either the "ids" parameter or one or more search fields must be sent.'
+)
+training_cls_bulk_delete_004 = (
+    'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
+    'match the required patterns.'
+)
+training_cls_bulk_delete_201 = (
+    'You do not have permission to execute this method. You can only delete Classes in your Member.'
+)
+training_cls_bulk_delete_202 = (
+    'You do not have permission to make this request. '
+    'One or more selected Classes have Students in them.'
+)
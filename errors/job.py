@@ -0,0 +1,6 @@
+"""
+Error Codes for all of the Methods in the Job Service
+"""
+# Read
+training_job_read_001 = 'The "pk" path parameter is invalid. "pk" must belong to a valid Job record.'
+training_job_read_201 = 'You do not have permission to execute this method. You can only read a Job in your Member.'
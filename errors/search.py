@@ -0,0 +1,9 @@
+"""
+Error Codes for all of the Methods in the Search Service
+"""
+# List
+training_search_list_001 = 'The "query" parameter is invalid. "query" is required and must be a non empty string.'
+training_search_list_002 = (
+    'The "types" parameter is invalid. "types" must be a comma separated list of the records to search, from '
+    '"student" and "syllabus".'
+)
@@ -6,6 +6,31 @@ training_student_list_001 = (
     'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
     'match the required patterns.'
 )
+training_student_list_002 = (
+    'The "cursor" parameter is invalid. "cursor" must be a "next_cursor" value returned by a previous request '
+    'with the same "order".'
+)
+training_student_list_003 = 'The "count" parameter is invalid. "count" must be one of "exact", "estimated" or "none".'
+training_student_list_004 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of keys returned for each record, '
+    'with the keys of nested records given by their path, e.g. "id,cls.trainer".'
+)
+training_student_list_005 = (
+    'The "expand" parameter is invalid. "expand" must be a comma separated list of the paths to nested records, '
+    'e.g. "cls,cls.syllabus".'
+)
+training_student_list_006 = 'The "layout" parameter is invalid. "layout" must be one of "nested" or "normalized".'
+
+# Export
+training_student_export_001 = (
+    'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
+    'match the required patterns.'
+)
+training_student_export_002 = 'The "output" parameter is invalid. "output" must be one of "ndjson" or "csv".'
+training_student_export_003 = (
+    'The "fields" or "expand" parameter is invalid. They must be comma separated lists of the keys returned for each '
+    'record and the nested records to expand, with nested keys given by their path.'
+)
 
 # Create
 training_student_create_101 = 'The "cls_id" parameter is invalid. "cls_id" is required and must be an integer'
@@ -17,8 +42,24 @@ training_student_create_202 = (
     'You do not have permission to execute this method. You can only create a Student in your Member.'
 )
 
+# Bulk Create
+training_student_bulk_create_101 = 'The "cls_id" parameter is invalid. "cls_id" is required and must be an integer.'
+training_student_bulk_create_102 = 'The "cls_id" parameter is invalid. "cls_id" must belong to a valid Class.'
+training_student_bulk_create_103 = (
+    'The "students" parameter is invalid. "students" is required and must be a list of between 1 and 1000 objects, '
+    'each with the same "user_id" and "notes" as a single create.'
+)
+
 # Read
 training_student_read_001 = 'The "pk" path parameter is invalid. "pk" must belong to a valid Student record.'
+training_student_read_002 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of keys returned for the record, '
+    'with the keys of nested records given by their path, e.g. "id,cls.trainer".'
+)
+training_student_read_003 = (
+    'The "expand" parameter is invalid. "expand" must be a comma separated list of the paths to nested records, '
+    'e.g. "cls,cls.syllabus".'
+)
 training_student_read_201 = (
     'You do not have permission to execute this method. You can only read a Student in your Member.'
 )
@@ -33,8 +74,47 @@ training_student_update_201 = (
     'You do not have permission to execute this method. You can only update a Student in your Member.'
 )
 
+# Bulk Update
+training_student_bulk_update_001 = (
+    'The "ids" parameter is invalid. '
+    'Every id in "ids" must belong to a valid Student record.'
+)
+training_student_bulk_update_002 = (
+    'The "ids" parameter is invalid. "ids" must be a comma separated list of between 1 and 1000 positive integers.'
+)
+training_student_bulk_update_003 = (
+    'No Student records were selected. Either the "ids" parameter or one or more search fields must be sent.'
+)
+training_student_bulk_update_004 = (
+    'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
+    'match the required patterns.'
+)
+training_student_bulk_update_005 = 'No fields were sent to update. "notes" must be sent.'
+training_student_bulk_update_201 = (
+    'You do not have permission to execute this method. You can only update Students in your Member.'
+)
+
 # Delete
 training_student_delete_001 = 'The "pk" path parameter is invalid. "pk" must belong to a valid Class record.'
 training_student_delete_201 = (
     'You do not have permission to execute this method. You can only delete a Student from a Syllabus in your Member.'
 )
+
+# Bulk Delete
+training_student_bulk_delete_001 = (
+    'The "ids" parameter is invalid. '
+    'Every id in "ids" must belong to a valid Student record.'
+)
+training_student_bulk_delete_002 = (
+    'The "ids" parameter is invalid. "ids" must be a comma separated list of between 1 and 1000 positive integers.'
+)
+training_student_bulk_delete_003 = (
+    'No Student records were selected. Either the "ids" parameter or one or more search fields must be sent.'
+)
+training_student_bulk_delete_004 = (
+    'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
+    'match the required patterns.'
+)
+training_student_bulk_delete_201 = (
+    'You do not have permission to execute this method. You can only delete Students in your Member.'
+)
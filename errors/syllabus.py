@@ -6,6 +6,28 @@ training_syllabus_list_001 = (
     'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
     'match the required patterns.'
 )
+training_syllabus_list_002 = (
+    'The "cursor" parameter is invalid. "cursor" must be a "next_cursor" value returned by a previous request '
+    'with the same "order".'
+)
+training_syllabus_list_003 = 'The "count" parameter is invalid. "count" must be one of "exact", "estimated" or "none".'
+training_syllabus_list_004 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of keys returned for each record, '
+    'e.g. "id,name".'
+)
+training_syllabus_list_005 = 'The "expand" parameter is invalid. A Syllabus has no nested records to expand.'
+training_syllabus_list_006 = 'The "layout" parameter is invalid. "layout" must be one of "nested" or "normalized".'
+
+# Export
+training_syllabus_export_001 = (
+    'One or more of the sent search fields contains invalid values. Please check the sent parameters and ensure they '
+    'match the required patterns.'
+)
+training_syllabus_export_002 = 'The "output" parameter is invalid. "output" must be one of "ndjson" or "csv".'
+training_syllabus_export_003 = (
+    'The "fields" or "expand" parameter is invalid. They must be comma separated lists of the keys returned for each '
+    'record and the nested records to expand, with nested keys given by their path.'
+)
 
 # Create
 training_syllabus_create_101 = 'The "name" parameter is invalid. "name" is required and must be a string.'
@@ -15,6 +37,11 @@ training_syllabus_create_201 = 'You do not have permission to make this request.
 
 # Read
 training_syllabus_read_001 = 'The "pk" path parameter is invalid. "pk" must belong to a valid Syllabus record.'
+training_syllabus_read_002 = (
+    'The "fields" parameter is invalid. "fields" must be a comma separated list of keys returned for the record, '
+    'e.g. "id,name".'
+)
+training_syllabus_read_003 = 'The "expand" parameter is invalid. A Syllabus has no nested records to expand.'
 training_syllabus_read_201 = (
     'You do not have permission to execute this method. You can only read a Syllabus for your Member.'
 )
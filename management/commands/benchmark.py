@@ -0,0 +1,19 @@
+# libs
+from django.core.management.base import BaseCommand
+# local
+from training.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a benchmark of one of the optimisations of the training application against the configured DB, '
+        'e.g. `python manage.py benchmark uri --rows 1000`.'
+    )
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='benchmark', required=True)
+        for name, benchmark in sorted(BENCHMARKS.items()):
+            benchmark.add_arguments(subparsers.add_parser(name, help=benchmark.HELP))
+
+    def handle(self, *args, **options):
+        BENCHMARKS[options['benchmark']].run(self, **options)
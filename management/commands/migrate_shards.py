@@ -0,0 +1,14 @@
+# libs
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+# local
+from training.utils import shards
+
+
+class Command(BaseCommand):
+    help = 'Apply the training migrations to the shared training DB and to every shard of it, one after the other.'
+
+    def handle(self, *args, **options):
+        for alias in shards.aliases():
+            self.stdout.write(f'Migrating {alias}')
+            call_command('migrate', 'training', database=alias, verbosity=options['verbosity'])
@@ -0,0 +1,41 @@
+# stdlib
+import time
+# libs
+from django.core.management.base import BaseCommand
+# local
+from training.utils import jobs, routing, shards
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the Jobs queued in a shard of the training DB. Any number of workers can be run at once, as each Job '
+        'is claimed with SELECT ... FOR UPDATE SKIP LOCKED.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            choices=shards.aliases(),
+            default=shards.DEFAULT,
+            help='The shard to run the Jobs of, which defaults to the shared training DB',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once there are no more Jobs waiting, rather than waiting for new ones',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='The number of seconds to wait before checking for new Jobs when there are none waiting',
+        )
+
+    def handle(self, *args, **options):
+        with routing.use(options['database']):
+            while True:
+                if jobs.run_next():
+                    continue
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
@@ -0,0 +1,42 @@
+# libs
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0003_django5'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('deleted', models.DateTimeField(null=True)),
+                ('extra', models.JSONField(default=dict)),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(null=True)),
+                ('finished', models.DateTimeField(null=True)),
+                ('kind', models.CharField(max_length=50)),
+                ('member_id', models.IntegerField()),
+                ('payload', models.JSONField(default=dict, encoder=DjangoJSONEncoder)),
+                ('result', models.JSONField(null=True)),
+                ('started', models.DateTimeField(null=True)),
+                ('status', models.CharField(default='queued', max_length=10)),
+            ],
+            options={
+                'db_table': 'job',
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(status__in=('queued', 'running')),
+                        fields=['id'],
+                        name='job_pending',
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# libs
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the tables against writes, which cannot be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('training', '0004_job'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='cls',
+            name='cls_id',
+        ),
+        RemoveIndexConcurrently(
+            model_name='student',
+            name='student_id',
+        ),
+        RemoveIndexConcurrently(
+            model_name='syllabus',
+            name='syllabus_id',
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(
+                fields=['cls', 'user_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_cls_user_id',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='syllabus',
+            index=models.Index(
+                fields=['member_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='syllabus_member_id',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='syllabus',
+            index=models.Index(
+                fields=['member_id', 'created', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='syllabus_member_created',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='syllabus',
+            index=models.Index(
+                fields=['member_id', 'name', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='syllabus_member_name',
+            ),
+        ),
+    ]
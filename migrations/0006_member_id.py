@@ -0,0 +1,24 @@
+# libs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0005_tenant_indexes'),
+    ]
+
+    operations = [
+        # The columns start out nullable so they can be added without rewriting the tables, and are filled in by the
+        # next migration
+        migrations.AddField(
+            model_name='cls',
+            name='member_id',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='member_id',
+            field=models.IntegerField(null=True),
+        ),
+    ]
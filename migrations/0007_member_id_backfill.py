@@ -0,0 +1,49 @@
+# libs
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery
+
+# The number of ids covered by each UPDATE, each of which is committed on its own so that no lock is held for long
+BATCH_SIZE = 10000
+
+
+def backfill(model, parent, parent_field: str, db_alias: str):
+    """
+    Copy the member_id of each record's parent onto it, in batches of consecutive ids
+    """
+    records = model._base_manager.using(db_alias)
+    member_id = Subquery(
+        parent._base_manager.using(db_alias).filter(pk=OuterRef(parent_field)).values('member_id')[:1],
+    )
+    last = records.order_by('-pk').values_list('pk', flat=True).first()
+    if last is None:
+        return
+    for start in range(0, last + 1, BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            records.filter(
+                pk__gte=start,
+                pk__lt=start + BATCH_SIZE,
+                member_id__isnull=True,
+            ).update(member_id=member_id)
+
+
+def forwards(apps, schema_editor):
+    """
+    Fill in the member_id of every Class from its Syllabus, and then of every Student from its Class, including the
+    records that have been deleted
+    """
+    db_alias = schema_editor.connection.alias
+    backfill(apps.get_model('training', 'Cls'), apps.get_model('training', 'Syllabus'), 'syllabus_id', db_alias)
+    backfill(apps.get_model('training', 'Student'), apps.get_model('training', 'Cls'), 'cls_id', db_alias)
+
+
+class Migration(migrations.Migration):
+    # Each batch is committed as it is made, rather than holding the locks on every row until the end
+    atomic = False
+
+    dependencies = [
+        ('training', '0006_member_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# libs
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the tables against writes, which cannot be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('training', '0007_member_id_backfill'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cls',
+            name='member_id',
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='member_id',
+            field=models.IntegerField(),
+        ),
+        AddIndexConcurrently(
+            model_name='cls',
+            index=models.Index(
+                fields=['member_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_id',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='cls',
+            index=models.Index(
+                fields=['member_id', 'created', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_created',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='cls',
+            index=models.Index(
+                fields=['member_id', 'finish_date', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_finish_date',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='cls',
+            index=models.Index(
+                fields=['member_id', 'start_date', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_start_date',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='cls',
+            index=models.Index(
+                fields=['member_id', 'trainer', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_trainer',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(
+                fields=['member_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_member_id',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(
+                fields=['member_id', 'created', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_member_created',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(
+                fields=['member_id', 'user_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_member_user_id',
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# libs
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently, TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the tables against writes, which cannot be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('training', '0008_member_id_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        RemoveIndexConcurrently(
+            model_name='student',
+            name='student_notes',
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=GinIndex(OpClass(Upper('notes'), name='gin_trgm_ops'), name='student_notes_upper_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='cls',
+            index=GinIndex(OpClass(Upper('trainer'), name='gin_trgm_ops'), name='cls_trainer_upper_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='syllabus',
+            index=GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='syllabus_name_upper_trgm'),
+        ),
+    ]
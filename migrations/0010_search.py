@@ -0,0 +1,46 @@
+# libs
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the tables against writes, which cannot be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('training', '0009_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=SearchVector('notes', config='english'),
+                output_field=SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='syllabus',
+            name='search',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=(
+                    SearchVector('name', config='english', weight='A') +
+                    SearchVector('description', config='english', weight='B')
+                ),
+                output_field=SearchVectorField(),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=GinIndex(fields=['search'], name='student_search'),
+        ),
+        AddIndexConcurrently(
+            model_name='syllabus',
+            index=GinIndex(fields=['search'], name='syllabus_search'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from .cls import Cls
+from .job import Job
 from .student import Student
 from .syllabus import Syllabus
 
@@ -11,4 +12,7 @@ __all__ = [
 
     # Class
     'Cls',
+
+    # Job
+    'Job',
 ]
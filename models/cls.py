@@ -1,8 +1,10 @@
 # libs
 from cloudcix_rest.models import BaseModel, BaseManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
-from django.urls import reverse
+from django.db.models.functions import Upper
 # local
+from training.utils.uri import resource_uri
 from .syllabus import Syllabus
 
 
@@ -19,6 +21,9 @@ class ClsManager(BaseManager):
         """
         return super().get_queryset().select_related(
             'syllabus',
+        ).defer(
+            # The full text search document is only read by the search view
+            'syllabus__search',
         )
 
 
@@ -27,6 +32,8 @@ class Cls(BaseModel):
     A Class record describes a Class
     """
     finish_date = models.DateTimeField(null=True)
+    # A copy of the member_id of the Syllabus, so the Classes of a Member can be filtered without a join
+    member_id = models.IntegerField()
     start_date = models.DateTimeField()
     syllabus = models.ForeignKey(Syllabus, models.CASCADE, related_name='classes')
     trainer = models.CharField(max_length=50)
@@ -36,11 +43,40 @@ class Cls(BaseModel):
     class Meta:
         db_table = 'cls'
         indexes = [
-            models.Index(fields=['id'], name='cls_id'),
             models.Index(fields=['deleted'], name='cls_deleted'),
             models.Index(fields=['finish_date'], name='cls_finish_date'),
             models.Index(fields=['start_date'], name='cls_start_date'),
             models.Index(fields=['trainer'], name='cls_trainer'),
+            # Trigram index for substring searches of the trainer. Django filters icontains on UPPER(trainer::text),
+            # which is how PostgreSQL stores the expression of this index for a varchar column
+            GinIndex(OpClass(Upper('trainer'), name='gin_trgm_ops'), name='cls_trainer_upper_trgm'),
+            # Lists are always filtered to one Member and exclude deleted records, so each order of the list that
+            # is on the Class itself has an index on the live records of a Member in that order
+            models.Index(
+                fields=['member_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_id',
+            ),
+            models.Index(
+                fields=['member_id', 'created', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_created',
+            ),
+            models.Index(
+                fields=['member_id', 'finish_date', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_finish_date',
+            ),
+            models.Index(
+                fields=['member_id', 'start_date', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_start_date',
+            ),
+            models.Index(
+                fields=['member_id', 'trainer', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='cls_member_trainer',
+            ),
         ]
 
     def get_absolute_url(self):
@@ -48,4 +84,4 @@ class Cls(BaseModel):
         Generates the absolute URL that corresponds to the ClassResource view for this Class record
         :return: A URL that corresponds to the views for this Class record
         """
-        return reverse('cls_resource', kwargs={'pk': self.pk})
+        return resource_uri('cls_resource', self.pk)
@@ -0,0 +1,50 @@
+# libs
+from cloudcix_rest.models import BaseModel
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+# local
+from training.utils.uri import resource_uri
+
+
+__all__ = [
+    'Job',
+]
+
+
+class Job(BaseModel):
+    """
+    A Job record describes an operation, such as a large cascade delete, that is run in the background by the
+    `process_jobs` command rather than while the request that started it waits
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(null=True)
+    finished = models.DateTimeField(null=True)
+    kind = models.CharField(max_length=50)
+    member_id = models.IntegerField()
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    result = models.JSONField(null=True)
+    started = models.DateTimeField(null=True)
+    status = models.CharField(max_length=10, default=QUEUED)
+
+    class Meta:
+        db_table = 'job'
+        indexes = [
+            # Workers only ever look for Jobs that are queued or running, which stay a small part of the table
+            models.Index(
+                fields=['id'],
+                condition=models.Q(status__in=('queued', 'running')),
+                name='job_pending',
+            ),
+        ]
+
+    def get_absolute_url(self):
+        """
+        Generates the absolute URL that corresponds to the JobResource view for this Job record
+        :return: A URL that corresponds to the views for this Job record
+        """
+        return resource_uri('job_resource', self.pk)
@@ -1,8 +1,11 @@
 # libs
 from cloudcix_rest.models import BaseModel, BaseManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from django.urls import reverse
+from django.db.models.functions import Upper
 # local
+from training.utils.uri import resource_uri
 from .cls import Cls
 
 
@@ -20,13 +23,25 @@ class StudentManager(BaseManager):
         return super().get_queryset().select_related(
             'cls',
             'cls__syllabus',
+        ).defer(
+            # The full text search documents are only read by the search view
+            'search',
+            'cls__syllabus__search',
         )
 
 
 class Student(BaseModel):
     """A Student record describes a Student"""
     cls = models.ForeignKey(Cls, models.CASCADE)
+    # A copy of the member_id of the Class, so the Students of a Member can be filtered without a join
+    member_id = models.IntegerField()
     notes = models.TextField(null=True)
+    # The full text search document, kept up to date by the DB on every write
+    search = models.GeneratedField(
+        expression=SearchVector('notes', config='english'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     user_id = models.IntegerField()
 
     objects = StudentManager()
@@ -34,10 +49,35 @@ class Student(BaseModel):
     class Meta:
         db_table = 'student'
         indexes = [
-            models.Index(fields=['id'], name='student_id'),
             models.Index(fields=['deleted'], name='student_deleted'),
-            models.Index(fields=['notes'], name='student_notes'),
+            # Notes are searched by substring, which a btree cannot serve and which rejects long notes. Django filters
+            # icontains on UPPER(notes::text), which is the expression of this index as notes are already text
+            GinIndex(OpClass(Upper('notes'), name='gin_trgm_ops'), name='student_notes_upper_trgm'),
+            GinIndex(fields=['search'], name='student_search'),
             models.Index(fields=['user_id'], name='student_user_id'),
+            # Lists are always filtered to one Member and exclude deleted records, so each order of the list that
+            # is on the Student itself has an index on the live records of a Member in that order
+            models.Index(
+                fields=['member_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_member_id',
+            ),
+            models.Index(
+                fields=['member_id', 'created', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_member_created',
+            ),
+            models.Index(
+                fields=['member_id', 'user_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_member_user_id',
+            ),
+            # The Students of a Class are looked up by User when they are enrolled in bulk
+            models.Index(
+                fields=['cls', 'user_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='student_cls_user_id',
+            ),
         ]
 
     def get_absolute_url(self):
@@ -45,4 +85,4 @@ class Student(BaseModel):
         Generates the absolute URL that corresponds to the StudentResource view for this Student record
         :return: A URL that corresponds to the views for this Student record
         """
-        return reverse('student_resource', kwargs={'pk': self.pk})
+        return resource_uri('student_resource', self.pk)
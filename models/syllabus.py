@@ -1,8 +1,13 @@
 # libs
-from cloudcix_rest.models import BaseModel
-from datetime import datetime
+from cloudcix_rest.models import BaseModel, BaseManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from django.urls import reverse
+from django.db.models.functions import Upper
+from django.utils import timezone
+# local
+from training.utils import cascade
+from training.utils.uri import resource_uri
 
 
 __all__ = [
@@ -10,6 +15,17 @@ __all__ = [
 ]
 
 
+class SyllabusManager(BaseManager):
+    def get_queryset(self) -> models.QuerySet:
+        """
+        Extend the BaseManager QuerySet to leave out the full text search document, which only the search view reads
+        :return: A base queryset which can be further extended but never loads the search document
+        """
+        return super().get_queryset().defer(
+            'search',
+        )
+
+
 class Syllabus(BaseModel):
     """
     A Syllabus record describes a Syllabus
@@ -17,13 +33,44 @@ class Syllabus(BaseModel):
     description = models.TextField()
     member_id = models.IntegerField()
     name = models.CharField(max_length=50)
+    # The full text search document, kept up to date by the DB on every write. Matches in the name rank higher
+    search = models.GeneratedField(
+        expression=(
+            SearchVector('name', config='english', weight='A') +
+            SearchVector('description', config='english', weight='B')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = SyllabusManager()
 
     class Meta:
         db_table = 'syllabus'
         indexes = [
-            models.Index(fields=['id'], name='syllabus_id'),
             models.Index(fields=['deleted'], name='syllabus_deleted'),
             models.Index(fields=['name'], name='syllabus_name'),
+            # Trigram index for substring searches of the name. Django filters icontains on UPPER(name::text),
+            # which is how PostgreSQL stores the expression of this index for a varchar column
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='syllabus_name_upper_trgm'),
+            GinIndex(fields=['search'], name='syllabus_search'),
+            # Lists are always filtered to one Member and exclude deleted records, so each order they allow has an
+            # index on the live records of a Member in that order
+            models.Index(
+                fields=['member_id', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='syllabus_member_id',
+            ),
+            models.Index(
+                fields=['member_id', 'created', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='syllabus_member_created',
+            ),
+            models.Index(
+                fields=['member_id', 'name', 'id'],
+                condition=models.Q(deleted__isnull=True),
+                name='syllabus_member_name',
+            ),
         ]
 
     def get_absolute_url(self):
@@ -31,17 +78,13 @@ class Syllabus(BaseModel):
         Generates the absolute URL that corresponds to the SyllabusResource view for this Syllabus record
         :return: A URL that corresponds to the views for this Syllabus record
         """
-        return reverse('syllabus_resource', kwargs={'pk': self.pk})
+        return resource_uri('syllabus_resource', self.pk)
 
     def cascade_delete(self):
         """
-        Set the deleted timestamp of this Object to the current time,
-        and call this method on all of the Child Objects belonging to this Object
+        Set the deleted timestamp of this Object to the current time, along with every Class and Student under it,
+        using the same timestamp for all of them
         """
-        self.deleted = datetime.utcnow()
-        self.save()
-
-        # Also delete Child Objects
-        for obj in self.classes.iterator():
-            obj.deleted = datetime.utcnow()
-            obj.save()
+        self.deleted = timezone.now()
+        cascade.soft_delete(Syllabus.objects.filter(pk=self.pk), self.deleted)
+        self.updated = self.deleted
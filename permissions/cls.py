@@ -5,12 +5,12 @@ These methods will raise any errors that may occurso all you have to do is
 call the method in the view
 """
 # stdlib
-from typing import Optional
+from typing import Dict, Optional
 # libs
 from cloudcix_rest.exceptions import Http403
 from rest_framework.request import Request
 # local
-from training.models import Cls, Student, Syllabus
+from training.models import Cls, Syllabus
 
 
 class Permissions:
@@ -37,7 +37,7 @@ class Permissions:
         - The request is reading a Class in the User's Member
         """
         # The request is reading a Class in the User's Member
-        if request.user.member['id'] != obj.syllabus.member_id:
+        if request.user.member['id'] != obj.member_id:
             return Http403(error_code='training_cls_read_201')
         return None
 
@@ -48,7 +48,7 @@ class Permissions:
         - The request is updating a Class in the User's Member
         """
         # The request is updating a Class in the User's Member
-        if request.user.member['id'] != obj.syllabus.member_id:
+        if request.user.member['id'] != obj.member_id:
             return Http403(error_code='training_cls_update_201')
         return None
 
@@ -58,11 +58,40 @@ class Permissions:
         The request to delete a Class record is valid if:
         - The request is deleting a Class in the User's Member
         - There are no Students in a Class
+        :param obj: The Class, annotated with whether it has Students as `has_students`
         """
         # The request is deleting a Class in the User's Member
-        if request.user.member['id'] != obj.syllabus.member_id:
+        if request.user.member['id'] != obj.member_id:
             return Http403(error_code='training_cls_delete_201')
         # There are no Students in a Class
-        if Student.objects.filter(cls=obj).exists():
+        if obj.has_students:
             return Http403(error_code='training_cls_delete_202')
         return None
+
+    @staticmethod
+    def bulk_update(request: Request, summary: Dict[str, int]) -> Optional[Http403]:
+        """
+        The request to update many Class records is valid if:
+        - Every selected Class is in the User's Member
+        :param summary: The counts of the selected records, from `training.utils.bulk.summarise`
+        """
+        # Every selected Class is in the User's Member
+        if summary['foreign'] > 0:
+            return Http403(error_code='training_cls_bulk_update_201')
+        return None
+
+    @staticmethod
+    def bulk_delete(request: Request, summary: Dict[str, int]) -> Optional[Http403]:
+        """
+        The request to delete many Class records is valid if:
+        - Every selected Class is in the User's Member
+        - There are no Students in any selected Class
+        :param summary: The counts of the selected records, from `training.utils.bulk.summarise`
+        """
+        # Every selected Class is in the User's Member
+        if summary['foreign'] > 0:
+            return Http403(error_code='training_cls_bulk_delete_201')
+        # There are no Students in any selected Class
+        if summary['with_students'] > 0:
+            return Http403(error_code='training_cls_bulk_delete_202')
+        return None
@@ -0,0 +1,26 @@
+"""
+Permissions classes will use their methods to validate permissions for a
+request.
+These methods will raise any errors that may occur so all you have to do is
+call the method in the view
+"""
+# stdlib
+from typing import Optional
+# libs
+from cloudcix_rest.exceptions import Http403
+from rest_framework.request import Request
+# local
+from training.models import Job
+
+
+class Permissions:
+    @staticmethod
+    def read(request: Request, obj: Job) -> Optional[Http403]:
+        """
+        The request to read a Job record is valid if:
+        - The request is reading a Job in the User's Member
+        """
+        # The request is reading a Job in the User's Member
+        if obj.member_id != request.user.member['id']:
+            return Http403(error_code='training_job_read_201')
+        return None
@@ -5,17 +5,17 @@ These methods will raise any errors that may occurs all you have to do is
 call the method in the view
 """
 # stdlib
-from typing import Optional
+from typing import Dict, Optional
 # libs
 from cloudcix_rest.exceptions import Http403
 from rest_framework.request import Request
 # local
-from training.models import Student, Syllabus
+from training.models import Cls, Student
 
 
 class Permissions:
     @staticmethod
-    def create(request: Request, obj: Syllabus) -> Optional[Http403]:
+    def create(request: Request, obj: Cls) -> Optional[Http403]:
         """
         The request to create a new Student record is valid if:
         - The User creating a Student is a self-managed Member
@@ -37,7 +37,7 @@ class Permissions:
         - The request is reading a Student in the User's Member
         """
         # The request is reading a Student in the User's Member
-        if obj.cls.syllabus.member_id != request.user.member['id']:
+        if obj.member_id != request.user.member['id']:
             return Http403(error_code='training_student_read_201')
         return None
 
@@ -48,7 +48,7 @@ class Permissions:
         - The request is updating a Student in the User's Member
         """
         # The request is updating a Student in the User's Member
-        if obj.cls.syllabus.member_id != request.user.member['id']:
+        if obj.member_id != request.user.member['id']:
             return Http403(error_code='training_student_update_201')
         return None
 
@@ -59,6 +59,30 @@ class Permissions:
         - The request is deleting a Student in the User's Member
         """
         # The request is deleting a Student in the User's Member
-        if obj.cls.syllabus.member_id != request.user.member['id']:
+        if obj.member_id != request.user.member['id']:
             return Http403(error_code='training_student_delete_201')
         return None
+
+    @staticmethod
+    def bulk_update(request: Request, summary: Dict[str, int]) -> Optional[Http403]:
+        """
+        The request to update many Student records is valid if:
+        - Every selected Student is in the User's Member
+        :param summary: The counts of the selected records, from `training.utils.bulk.summarise`
+        """
+        # Every selected Student is in the User's Member
+        if summary['foreign'] > 0:
+            return Http403(error_code='training_student_bulk_update_201')
+        return None
+
+    @staticmethod
+    def bulk_delete(request: Request, summary: Dict[str, int]) -> Optional[Http403]:
+        """
+        The request to delete many Student records is valid if:
+        - Every selected Student is in the User's Member
+        :param summary: The counts of the selected records, from `training.utils.bulk.summarise`
+        """
+        # Every selected Student is in the User's Member
+        if summary['foreign'] > 0:
+            return Http403(error_code='training_student_bulk_delete_201')
+        return None
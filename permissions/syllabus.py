@@ -10,7 +10,7 @@ from typing import Optional
 from cloudcix_rest.exceptions import Http403
 from rest_framework.request import Request
 # local
-from training.models import Student, Syllabus
+from training.models import Syllabus
 
 
 class Permissions:
@@ -54,11 +54,12 @@ class Permissions:
         The request to delete a Syllabus record is valid if:
         - The request is deleting a Syllabus in the User's Member
         - The specified Class relating to this Syllabus has no students
+        :param obj: The Syllabus, annotated with whether it has Students as `has_students`
         """
         # The request is deleting a Syllabus in the User's Member
         if request.user.member['id'] != obj.member_id:
             return Http403(error_code='training_syllabus_delete_201')
         # The specified Class relating to this Syllabus has no students
-        if Student.objects.filter(cls__syllabus=obj).exists():
+        if obj.has_students:
             return Http403(error_code='training_syllabus_delete_202')
         return None
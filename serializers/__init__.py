@@ -1,15 +1,22 @@
-from .cls import ClsSerializer
-from .student import StudentSerializer
-from .syllabus import SyllabusSerializer
+from .cls import ClsRowSerializer, ClsSerializer
+from .job import JobSerializer
+from .student import StudentRowSerializer, StudentSerializer
+from .syllabus import SyllabusRowSerializer, SyllabusSerializer
 
 
 __all__ = [
     # Cls
+    'ClsRowSerializer',
     'ClsSerializer',
 
+    # Job
+    'JobSerializer',
+
     # Student
+    'StudentRowSerializer',
     'StudentSerializer',
 
     # Syllabus
+    'SyllabusRowSerializer',
     'SyllabusSerializer',
 ]
@@ -0,0 +1,306 @@
+# stdlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+# local
+from training.utils.uri import resource_uri_builder
+
+
+__all__ = [
+    'Expand',
+    'Fields',
+    'ID_ONLY',
+    'Included',
+    'LAYOUT_NESTED',
+    'LAYOUT_NORMALIZED',
+    'LAYOUTS',
+    'RowSerializer',
+]
+
+Row = Dict[str, Any]
+# A sparse fieldset, mapping the requested keys to the fieldset requested for them if they are nested, or to ID_ONLY
+# if they are nested but not expanded. None means that every key is requested, with every nested object expanded
+Fields = Optional[Dict[str, Any]]
+# The nested objects to expand, mapping each of them to the nested objects to expand within it.
+# None means that every nested object is expanded
+Expand = Optional[Dict[str, Dict]]
+ID_ONLY = 'id'
+# Related records side-loaded by a normalized list, keyed by the name of their serializer and then by their id
+Included = Dict[str, Dict[Any, Dict[str, Any]]]
+
+# The layouts a list can be serialized in. Nested lists serialize related records inside every record that refers to
+# them, while normalized lists serialize them once in a separate `included` map and only refer to them by id
+LAYOUT_NESTED = 'nested'
+LAYOUT_NORMALIZED = 'normalized'
+LAYOUTS = (LAYOUT_NESTED, LAYOUT_NORMALIZED)
+
+
+def _lookup(obj: Any, path: str) -> Any:
+    """
+    Follow a lookup path such as `cls__syllabus__name` from the given object to the value it refers to
+    """
+    for attr in path.split('__'):
+        if obj is None:
+            break
+        obj = getattr(obj, attr)
+    return obj
+
+
+class RowSerializer:
+    """
+    Serializes rows fetched with `QuerySet.values` into exactly the same structure that the matching serpy Serializer
+    generates from model instances, without the cost of constructing the instances.
+    Subclasses list their output keys in `fields`, in the order the serpy Serializer outputs them. A key that is in
+    `related` is serialized by the nested RowSerializer from the columns of that relation, and the `uri` key is
+    generated from the id using the `resource` URL pattern. Every other key is copied straight from its column.
+    Related records are side-loaded under the serializer's `name` when a list is normalized.
+    Every method takes an optional sparse fieldset, as parsed by `parse_fields` and narrowed by `select`, which limits
+    both the columns fetched and the keys output.
+    """
+    fields: Tuple[str, ...] = ()
+    name: str = ''
+    related: Dict[str, Type['RowSerializer']] = {}
+    resource: str = ''
+
+    @classmethod
+    def parse_fields(cls, fields: Optional[str]) -> Fields:
+        """
+        Parse the `fields` parameter sent by a User into a sparse fieldset.
+        Keys are separated by commas, and keys of nested objects are given by their path, e.g. `id,cls.trainer`.
+        :param fields: The `fields` parameter, if one was sent
+        :return: The sparse fieldset, or None if every key should be serialized
+        :raises ValueError: If any of the keys do not exist
+        """
+        parsed: Dict[str, Any] = {}
+        for path in (fields or '').split(','):
+            path = path.strip()
+            if len(path) > 0:
+                cls._add_field(parsed, path.split('.'))
+        return parsed or None
+
+    @classmethod
+    def _add_field(cls, parsed: Dict[str, Any], keys: List[str]):
+        """
+        Add the path to a key to a sparse fieldset
+        """
+        key, *nested = keys
+        if key not in cls.fields:
+            raise ValueError(f'{key} is not a valid field')
+        if len(nested) == 0:
+            parsed[key] = None
+            return
+        if key not in cls.related:
+            raise ValueError(f'{key} is not a nested object')
+        if key in parsed and parsed[key] is None:
+            # The whole nested object has already been requested
+            return
+        cls.related[key]._add_field(parsed.setdefault(key, {}), nested)
+
+    @classmethod
+    def parse_expand(cls, expand: Optional[str]) -> Expand:
+        """
+        Parse the `expand` parameter sent by a User into the nested objects to expand.
+        Nested objects are separated by commas and given by their path, e.g. `cls,cls.syllabus`. Expanding a nested
+        object within another one also expands the outer one.
+        :param expand: The `expand` parameter, which is None if it was not sent
+        :return: The nested objects to expand, or None if every nested object should be expanded
+        :raises ValueError: If any of the nested objects do not exist
+        """
+        if expand is None:
+            return None
+        parsed: Dict[str, Dict] = {}
+        for path in expand.split(','):
+            path = path.strip()
+            if len(path) > 0:
+                cls._add_expand(parsed, path.split('.'))
+        return parsed
+
+    @classmethod
+    def _add_expand(cls, parsed: Dict[str, Dict], keys: List[str]):
+        """
+        Add the path to a nested object to the nested objects to expand
+        """
+        key, *nested = keys
+        if key not in cls.related:
+            raise ValueError(f'{key} is not a nested object')
+        expand = parsed.setdefault(key, {})
+        if len(nested) > 0:
+            cls.related[key]._add_expand(expand, nested)
+
+    @classmethod
+    def select(cls, fields: Fields, expand: Expand) -> Fields:
+        """
+        Narrow a sparse fieldset so that the nested objects which are not expanded only output their id
+        :param fields: The sparse fieldset, as parsed by `parse_fields`
+        :param expand: The nested objects to expand, as parsed by `parse_expand`
+        :return: The sparse fieldset to pass to the other methods
+        """
+        if expand is None:
+            return fields
+        selected: Dict[str, Any] = {}
+        for key, nested in cls._keys(fields):
+            if key not in cls.related:
+                selected[key] = nested
+            elif key in expand:
+                selected[key] = cls.related[key].select(nested, expand[key])
+            else:
+                selected[key] = ID_ONLY
+        return selected
+
+    @classmethod
+    def _keys(cls, fields: Fields) -> Iterable[Tuple[str, Fields]]:
+        """
+        Iterate over the output keys in the sparse fieldset, along with the fieldset for each of them
+        """
+        for key in cls.fields:
+            if fields is None:
+                yield key, None
+            elif key in fields:
+                yield key, fields[key]
+
+    @classmethod
+    def flat_keys(cls, prefix: str = '', fields: Fields = None) -> List[str]:
+        """
+        List the output keys with the keys of nested records flattened into their path, e.g. `cls.syllabus.name`
+        :param prefix: The path from the listed record to the record of this serializer, e.g. `cls.`
+        :param fields: The sparse fieldset to list the keys for
+        """
+        keys = []
+        for key, nested in cls._keys(fields):
+            if key in cls.related and nested != ID_ONLY:
+                keys.extend(cls.related[key].flat_keys(f'{prefix}{key}.', nested))
+            else:
+                keys.append(f'{prefix}{key}')
+        return keys
+
+    @classmethod
+    def columns(cls, prefix: str = '', fields: Fields = None) -> List[str]:
+        """
+        List the columns that need to be passed to `QuerySet.values` to fetch the rows for this serializer
+        :param prefix: The lookup path from the listed model to the model of this serializer, e.g. `cls__`
+        :param fields: The sparse fieldset to fetch the columns for
+        """
+        columns = [f'{prefix}id']
+        for key, nested in cls._keys(fields):
+            if nested == ID_ONLY:
+                columns.append(f'{prefix}{key}__id')
+            elif key in cls.related:
+                columns.extend(cls.related[key].columns(f'{prefix}{key}__', nested))
+            elif key not in ('id', 'uri'):
+                columns.append(f'{prefix}{key}')
+        return columns
+
+    @classmethod
+    def relations(cls, prefix: str = '', fields: Fields = None) -> List[str]:
+        """
+        List the lookup paths to the nested records in the sparse fieldset, which need to be passed to
+        `QuerySet.select_related` along with the `columns` passed to `QuerySet.only` to fetch a single instance
+        :param prefix: The lookup path from the fetched model to the model of this serializer, e.g. `cls__`
+        :param fields: The sparse fieldset to list the nested records for
+        """
+        relations = []
+        for key, nested in cls._keys(fields):
+            if key in cls.related:
+                relations.append(f'{prefix}{key}')
+                if nested != ID_ONLY:
+                    relations.extend(cls.related[key].relations(f'{prefix}{key}__', nested))
+        return relations
+
+    @classmethod
+    def version_columns(cls, prefix: str = '', fields: Fields = None) -> List[str]:
+        """
+        List the `updated` columns of the record and of every nested record that is expanded, one of which changes
+        whenever the serialized data changes
+        :param prefix: The lookup path from the listed model to the model of this serializer, e.g. `cls__`
+        :param fields: The sparse fieldset being serialized
+        """
+        columns = [f'{prefix}updated']
+        for key, nested in cls._keys(fields):
+            if key in cls.related and nested != ID_ONLY:
+                columns.extend(cls.related[key].version_columns(f'{prefix}{key}__', nested))
+        return columns
+
+    @classmethod
+    def version(cls, obj: Any, fields: Fields = None) -> Tuple[Any, ...]:
+        """
+        Read the columns listed by `version_columns` from a single model instance
+        :param obj: The model instance being serialized
+        :param fields: The sparse fieldset being serialized
+        """
+        return tuple(_lookup(obj, column) for column in cls.version_columns(fields=fields))
+
+    @classmethod
+    def builder(
+        cls,
+        prefix: str = '',
+        fields: Fields = None,
+        included: Optional[Included] = None,
+    ) -> Callable[[Row], Dict[str, Any]]:
+        """
+        Generate the function that serializes a single row. The uri templates are resolved here, once per list.
+        :param prefix: The lookup path from the listed model to the model of this serializer, e.g. `cls__`
+        :param fields: The sparse fieldset to serialize
+        :param included: If given, related records are added to this map the first time they are seen and only
+                         referred to by id in the row
+        """
+        uri = resource_uri_builder(cls.resource)
+        getters: List[Tuple[str, Callable[[Row], Any]]] = []
+        for key, nested in cls._keys(fields):
+            if nested == ID_ONLY:
+                getters.append((key, lambda row, column=f'{prefix}{key}__id': row[column]))
+            elif key in cls.related and included is not None:
+                related = cls.related[key]
+                getters.append((key, cls._include(
+                    related.builder(f'{prefix}{key}__', nested, included),
+                    included.setdefault(related.name, {}),
+                    f'{prefix}{key}__id',
+                )))
+            elif key in cls.related:
+                getters.append((key, cls.related[key].builder(f'{prefix}{key}__', nested)))
+            elif key == 'uri':
+                getters.append((key, lambda row, column=f'{prefix}id': uri(row[column])))
+            else:
+                getters.append((key, lambda row, column=f'{prefix}{key}': row[column]))
+        return lambda row: {key: get(row) for key, get in getters}
+
+    @staticmethod
+    def _include(
+        build: Callable[[Row], Dict[str, Any]],
+        records: Dict[Any, Dict[str, Any]],
+        column: str,
+    ) -> Callable[[Row], Any]:
+        """
+        Generate the function that side-loads the related record in a row, returning its id
+        """
+        def include(row: Row) -> Any:
+            pk = row[column]
+            if pk is not None and pk not in records:
+                records[pk] = build(row)
+            return pk
+        return include
+
+    @classmethod
+    def serialize(
+        cls,
+        rows: Iterable[Row],
+        fields: Fields = None,
+        included: Optional[Included] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Serialize a list of rows
+        :param rows: Rows fetched from `QuerySet.values` with at least the columns listed by `columns`
+        :param fields: The sparse fieldset to serialize
+        :param included: If given, the list is normalized and the related records are side-loaded into this map
+        :return: The serialized data, the same as the serpy Serializer's `data` for `many=True` unless normalized
+        """
+        build = cls.builder(fields=fields, included=included)
+        return [build(row) for row in rows]
+
+    @classmethod
+    def serialize_instance(cls, obj: Any, fields: Fields = None) -> Dict[str, Any]:
+        """
+        Serialize a single model instance, which only needs to have the columns listed by `columns` loaded
+        :param obj: The model instance to serialize
+        :param fields: The sparse fieldset to serialize
+        :return: The serialized data, the same as the serpy Serializer's `data`
+        """
+        row = {column: _lookup(obj, column) for column in cls.columns(fields=fields)}
+        return cls.builder(fields=fields)(row)
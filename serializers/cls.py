@@ -1,7 +1,8 @@
 # libs
 import serpy
 # local
-from .syllabus import SyllabusSerializer
+from .base import RowSerializer
+from .syllabus import SyllabusRowSerializer, SyllabusSerializer
 
 
 class ClsSerializer(serpy.Serializer):
@@ -31,3 +32,13 @@ class ClsSerializer(serpy.Serializer):
     syllabus = SyllabusSerializer(required=False)
     trainer = serpy.Field()
     uri = serpy.Field(attr='get_absolute_url', call=True)
+
+
+class ClsRowSerializer(RowSerializer):
+    """
+    Serializes Class rows from `QuerySet.values` into the same structure as the ClsSerializer
+    """
+    fields = ('finish_date', 'id', 'start_date', 'syllabus', 'trainer', 'uri')
+    name = 'cls'
+    related = {'syllabus': SyllabusRowSerializer}
+    resource = 'cls_resource'
@@ -0,0 +1,43 @@
+# libs
+import serpy
+
+
+class JobSerializer(serpy.Serializer):
+    """
+    created:
+        description: The time the Job was queued
+        type: string
+    error:
+        description: The reason the Job failed, if it did
+        type: string
+    finished:
+        description: The time the Job finished running, if it has
+        type: string
+    id:
+        description: The id of the Job
+        type: integer
+    kind:
+        description: The kind of operation the Job runs
+        type: string
+    result:
+        description: The result of the Job once it has succeeded, such as the number of records changed of each type
+        type: object
+    started:
+        description: The time the Job last started running, if it has
+        type: string
+    status:
+        description: The status of the Job, one of 'queued', 'running', 'succeeded' or 'failed'
+        type: string
+    uri:
+        description: The absolute URL of the Job that can be polled until it has finished
+        type: string
+    """
+    created = serpy.Field()
+    error = serpy.Field()
+    finished = serpy.Field()
+    id = serpy.Field()
+    kind = serpy.Field()
+    result = serpy.Field()
+    started = serpy.Field()
+    status = serpy.Field()
+    uri = serpy.Field(attr='get_absolute_url', call=True)
@@ -1,7 +1,8 @@
 # libs
 import serpy
 # local
-from .cls import ClsSerializer
+from .base import RowSerializer
+from .cls import ClsRowSerializer, ClsSerializer
 
 
 class StudentSerializer(serpy.Serializer):
@@ -27,3 +28,13 @@ class StudentSerializer(serpy.Serializer):
     notes = serpy.Field()
     uri = serpy.Field(attr='get_absolute_url', call=True)
     user_id = serpy.Field()
+
+
+class StudentRowSerializer(RowSerializer):
+    """
+    Serializes Student rows from `QuerySet.values` into the same structure as the StudentSerializer
+    """
+    fields = ('cls', 'id', 'notes', 'uri', 'user_id')
+    name = 'student'
+    related = {'cls': ClsRowSerializer}
+    resource = 'student_resource'
@@ -1,5 +1,7 @@
 # libs
 import serpy
+# local
+from .base import RowSerializer
 
 
 class SyllabusSerializer(serpy.Serializer):
@@ -26,3 +28,12 @@ class SyllabusSerializer(serpy.Serializer):
     member_id = serpy.Field()
     name = serpy.Field()
     uri = serpy.Field(attr='get_absolute_url', call=True)
+
+
+class SyllabusRowSerializer(RowSerializer):
+    """
+    Serializes Syllabus rows from `QuerySet.values` into the same structure as the SyllabusSerializer
+    """
+    fields = ('description', 'id', 'member_id', 'name', 'uri')
+    name = 'syllabus'
+    resource = 'syllabus_resource'
@@ -1,6 +1,9 @@
 # Local settings that change on a per application / per environment basis
+import copy
 import os
 
+import django
+
 PGSQLAPI_PASSWORD = os.getenv('PGSQLAPI_PASSWORD', 'pw')
 PGSQLAPI_USER = os.getenv('PGSQLAPI_USER', 'postgres')
 PGSQLAPI_HOST = os.getenv('PGSQLAPI_HOST', 'pgsqlapi')
@@ -27,6 +30,10 @@ DATABASES = {
         'PASSWORD': PGSQLAPI_PASSWORD,
         'HOST': PGSQLAPI_HOST,
         'PORT': '5432',
+        # Connections are checked before they are reused, so one that the server has dropped is replaced rather than
+        # failing the request
+        'CONN_HEALTH_CHECKS': True,
+        'CONN_MAX_AGE': int(os.getenv('TRAINING_DB_CONN_MAX_AGE', '60')),
     },
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -38,6 +45,56 @@ DATABASES = {
     },
 }
 
+# Connections to the training DBs can instead be shared by the threads of each worker from a psycopg pool, which needs
+# Django 5.1 or later. The pool is opened in each worker on its first query, so it is not shared across the fork of
+# `gunicorn --preload`. Connections are checked as they are taken from the pool, as CONN_HEALTH_CHECKS is on
+TRAINING_DB_POOL = os.getenv('TRAINING_DB_POOL', 'false').lower() == 'true' and django.VERSION >= (5, 1)
+if TRAINING_DB_POOL:
+    DATABASES['training']['CONN_MAX_AGE'] = 0
+    DATABASES['training']['OPTIONS'] = {
+        'pool': {
+            'max_idle': float(os.getenv('TRAINING_DB_POOL_MAX_IDLE', '300')),
+            'max_size': int(os.getenv('TRAINING_DB_POOL_MAX_SIZE', '10')),
+            'min_size': int(os.getenv('TRAINING_DB_POOL_MIN_SIZE', '2')),
+            # The seconds a request waits for a free connection before it fails
+            'timeout': float(os.getenv('TRAINING_DB_POOL_TIMEOUT', '10')),
+        },
+    }
+
+# Shards of the training DB for Members that have been moved off the shared DB, given as comma separated alias=host
+# pairs, e.g. 'training_eu=pgsqlapi-eu'. Each shard holds a DB named training and is migrated along with the shared DB
+PGSQLAPI_SHARD_HOSTS = {
+    alias.strip(): host.strip()
+    for alias, host in (pair.split('=', 1) for pair in filter(None, os.getenv('PGSQLAPI_SHARD_HOSTS', '').split(',')))
+}
+TRAINING_SHARDS = list(PGSQLAPI_SHARD_HOSTS)
+DATABASES.update({
+    alias: {**copy.deepcopy(DATABASES['training']), 'HOST': host}
+    for alias, host in PGSQLAPI_SHARD_HOSTS.items()
+})
+# The shard that holds the records of each Member that has been moved, given as comma separated member_id=alias pairs.
+# Members that are not listed stay in the shared training DB
+TRAINING_SHARD_MAP = {
+    int(member_id): alias.strip()
+    for member_id, alias in (
+        pair.split('=', 1) for pair in filter(None, os.getenv('TRAINING_SHARD_MAP', '').split(','))
+    )
+}
+
+# Read replicas of the shared training DB, given as a comma separated list of hosts. Reads from requests that do not
+# write are spread across them by the TRAINING_REPLICA_STRATEGY, either 'round_robin' or 'least_lag'
+PGSQLAPI_REPLICA_HOSTS = [host.strip() for host in os.getenv('PGSQLAPI_REPLICA_HOSTS', '').split(',') if host.strip()]
+TRAINING_READ_REPLICAS = [f'training_replica_{index}' for index in range(len(PGSQLAPI_REPLICA_HOSTS))]
+DATABASES.update({
+    alias: {**copy.deepcopy(DATABASES['training']), 'HOST': host, 'TEST': {'MIRROR': 'training'}}
+    for alias, host in zip(TRAINING_READ_REPLICAS, PGSQLAPI_REPLICA_HOSTS)
+})
+TRAINING_REPLICA_STRATEGY = os.getenv('TRAINING_REPLICA_STRATEGY', 'round_robin')
+# The seconds a replica can fall behind the primary before the 'least_lag' strategy stops reading from it
+TRAINING_REPLICA_MAX_LAG = float(os.getenv('TRAINING_REPLICA_MAX_LAG', '5'))
+# The seconds a User's reads stay on the primary after they write, so they always read their own writes
+TRAINING_PRIMARY_STICKINESS = float(os.getenv('TRAINING_PRIMARY_STICKINESS', '5'))
+
 DATABASE_ROUTERS = [
     'training.db_router.TrainingRouter',
 ]
@@ -52,3 +109,6 @@ USE_L10N = False
 CLOUDCIX_INFLUX_TAGS = {
     'service_name': APPLICATION_NAME,
 }
+
+# Serve the async variants of the views, which is set by the ASGI entry point in training.asgi
+TRAINING_ASYNC_VIEWS = os.getenv('TRAINING_ASYNC_VIEWS', 'false').lower() == 'true'
@@ -0,0 +1,3 @@
+"""
+Tests for the training application, run with `python manage.py test training`
+"""
@@ -0,0 +1,68 @@
+# stdlib
+from datetime import datetime, timezone
+# libs
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase
+# local
+from training.models import Cls, Student, Syllabus
+from training.utils import bulk
+
+
+class ParseIdsTests(SimpleTestCase):
+
+    def test_no_ids(self):
+        self.assertIsNone(bulk.parse_ids(None))
+
+    def test_ids_are_distinct_and_ordered(self):
+        self.assertEqual(bulk.parse_ids('3,1,3,2'), [3, 1, 2])
+
+    def test_invalid_ids(self):
+        too_many = ','.join(str(pk) for pk in range(1, bulk.MAX_IDS + 2))
+        for ids in ('', 'a', '1,b', '0', '-1', '1,,2', too_many):
+            with self.subTest(ids=ids[:20]), self.assertRaises(ValueError):
+                bulk.parse_ids(ids)
+
+
+class SelectionTests(TestCase):
+    databases = {'default', 'training'}
+
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        cls.students = {}
+        for member_id in (1, 2):
+            syllabus = Syllabus.objects.create(name='syllabus', description='', member_id=member_id)
+            cls_ = Cls.objects.create(syllabus=syllabus, member_id=member_id, trainer='trainer', start_date=start)
+            cls.students[member_id] = [
+                Student.objects.create(cls=cls_, member_id=member_id, user_id=user_id, notes=f'notes {user_id % 2}')
+                for user_id in range(4)
+            ]
+
+    def select(self, ids=None, search=None, exclude=None):
+        return bulk.select(Student.objects.all(), ids, 'member_id', 1, search or {}, exclude or {})
+
+    def test_select_by_filter_is_scoped_to_member(self):
+        objs = self.select(search={'notes': 'notes 1'})
+        self.assertEqual(
+            sorted(objs.values_list('pk', flat=True)),
+            [obj.pk for obj in self.students[1] if obj.notes == 'notes 1'],
+        )
+        self.assertEqual(bulk.summarise(objs, 'member_id', 1), {'found': 2, 'foreign': 0})
+
+    def test_select_by_filter_with_exclude(self):
+        objs = self.select(search={'user_id__in': [0, 1, 2]}, exclude={'notes': 'notes 0'})
+        self.assertEqual(list(objs.values_list('user_id', flat=True)), [1])
+
+    def test_select_by_ids_reports_foreign_records(self):
+        ids = [self.students[1][0].pk, self.students[2][0].pk, self.students[2][1].pk]
+        objs = self.select(ids=ids)
+        self.assertEqual(bulk.summarise(objs, 'member_id', 1), {'found': 3, 'foreign': 2})
+
+    def test_select_by_ids_reports_missing_records(self):
+        objs = self.select(ids=[self.students[1][0].pk, 999999])
+        self.assertEqual(bulk.summarise(objs, 'member_id', 1)['found'], 1)
+
+    def test_summary_counts_conditions(self):
+        objs = self.select(search={'user_id__in': [0, 1, 2, 3]})
+        summary = bulk.summarise(objs, 'member_id', 1, with_notes_1=Q(notes='notes 1'))
+        self.assertEqual(summary, {'found': 4, 'foreign': 0, 'with_notes_1': 2})
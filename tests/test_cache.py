@@ -0,0 +1,57 @@
+# stdlib
+from unittest import mock
+# libs
+from django.test import SimpleTestCase
+# local
+from training.utils.cache import TTLCache
+
+
+class TTLCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('training.utils.cache.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_and_set(self):
+        cache = TTLCache(10, 60)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_entries_expire(self):
+        cache = TTLCache(10, 60)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=5)
+        self.now += 5
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.now += 55
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(2, 60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_contains_is_not_counted(self):
+        cache = TTLCache(10, 60)
+        cache.set('a', 1)
+        self.assertTrue(cache.contains('a'))
+        self.assertFalse(cache.contains('b'))
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0, 'size': 1})
+
+    def test_clear_keeps_counts(self):
+        cache = TTLCache(10, 60)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 0, 'size': 0})
@@ -0,0 +1,57 @@
+# stdlib
+from datetime import datetime, timezone
+# libs
+from django.test import TestCase
+# local
+from training.models import Cls, Student, Syllabus
+from training.utils import cascade
+
+
+class CascadeTests(TestCase):
+    databases = {'default', 'training'}
+
+    def setUp(self):
+        start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        self.syllabuses = [Syllabus.objects.create(name=f's{i}', description='', member_id=1) for i in range(2)]
+        self.classes = [
+            Cls.objects.create(syllabus=syllabus, member_id=1, trainer='trainer', start_date=start)
+            for syllabus in self.syllabuses
+            for _ in range(2)
+        ]
+        self.students = [
+            Student.objects.create(cls=cls, member_id=1, user_id=user_id, notes='')
+            for cls in self.classes
+            for user_id in range(3)
+        ]
+
+    def test_count(self):
+        # A Syllabus, its 2 Classes and their 6 Students
+        self.assertEqual(cascade.count(Syllabus.objects.filter(pk=self.syllabuses[0].pk)), 9)
+        self.assertEqual(cascade.count(Syllabus.objects.all()), 18)
+        self.assertEqual(cascade.count(Cls.objects.filter(pk=self.classes[0].pk)), 4)
+
+    def test_exceeds(self):
+        objs = Syllabus.objects.filter(pk=self.syllabuses[0].pk)
+        self.assertFalse(cascade.exceeds(objs, 9))
+        self.assertTrue(cascade.exceeds(objs, 8))
+        # The Students are never counted once the Syllabus and its Classes have crossed the limit
+        with self.assertNumQueries(2, using='training'):
+            self.assertTrue(cascade.exceeds(objs, 2))
+
+    def test_soft_delete_cascades_with_one_timestamp(self):
+        now = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        deleted = cascade.soft_delete(Syllabus.objects.filter(pk=self.syllabuses[0].pk), now)
+        self.assertEqual(deleted, {'training.Syllabus': 1, 'training.Cls': 2, 'training.Student': 6})
+        for model in (Syllabus, Cls, Student):
+            with self.subTest(model=model.__name__):
+                stamps = set(model._base_manager.filter(deleted__isnull=False).values_list('deleted', flat=True))
+                self.assertEqual(stamps, {now})
+        # The other Syllabus and everything below it is untouched
+        self.assertEqual(cascade.count(Syllabus.objects.all()), 9)
+
+    def test_deleted_records_are_not_deleted_again(self):
+        first = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        cascade.soft_delete(Cls.objects.filter(pk=self.classes[0].pk), first)
+        deleted = cascade.soft_delete(Syllabus.objects.filter(pk=self.syllabuses[0].pk))
+        self.assertEqual(deleted, {'training.Syllabus': 1, 'training.Cls': 1, 'training.Student': 3})
+        self.assertEqual(Cls._base_manager.get(pk=self.classes[0].pk).deleted, first)
@@ -0,0 +1,58 @@
+# stdlib
+from datetime import datetime, timedelta, timezone
+# libs
+from django.test import SimpleTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+# local
+from training.models import Cls, Syllabus
+from training.serializers import ClsRowSerializer
+from training.utils import etag
+
+
+def _request(**headers) -> Request:
+    return Request(APIRequestFactory().get('/class/1/', **headers))
+
+
+class ETagTests(SimpleTestCase):
+
+    def setUp(self):
+        updated = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        syllabus = Syllabus(pk=1, name='syllabus', description='', member_id=1, updated=updated)
+        self.obj = Cls(pk=1, syllabus=syllabus, member_id=1, trainer='trainer', updated=updated)
+
+    def test_generate_is_stable_and_quoted(self):
+        self.assertEqual(etag.generate('a', 1), etag.generate('a', 1))
+        self.assertNotEqual(etag.generate('a', 1), etag.generate('a', 2))
+        self.assertRegex(etag.generate('a', 1), r'^"[0-9a-f]{32}"$')
+
+    def test_record_tag_changes_with_nested_record(self):
+        tag = etag.for_record(None, self.obj, ClsRowSerializer)
+        self.obj.syllabus.updated += timedelta(seconds=1)
+        self.assertNotEqual(etag.for_record(None, self.obj, ClsRowSerializer), tag)
+
+    def test_record_tag_ignores_nested_record_that_is_not_expanded(self):
+        fields = ClsRowSerializer.select(None, {})
+        tag = etag.for_record(None, self.obj, ClsRowSerializer, fields)
+        self.obj.syllabus.updated += timedelta(seconds=1)
+        self.assertEqual(etag.for_record(None, self.obj, ClsRowSerializer, fields), tag)
+
+    def test_if_none_match(self):
+        tag = etag.generate('a')
+        self.assertFalse(etag.if_none_match(_request(), tag))
+        self.assertFalse(etag.if_none_match(_request(HTTP_IF_NONE_MATCH=tag), None))
+        self.assertFalse(etag.if_none_match(_request(HTTP_IF_NONE_MATCH=etag.generate('b')), tag))
+        self.assertTrue(etag.if_none_match(_request(HTTP_IF_NONE_MATCH=tag), tag))
+        # The weak comparison is used, and any of a list of tags can match
+        self.assertTrue(etag.if_none_match(_request(HTTP_IF_NONE_MATCH=f'W/{tag}'), tag))
+        self.assertTrue(etag.if_none_match(_request(HTTP_IF_NONE_MATCH=f'"x", {tag}'), tag))
+        self.assertTrue(etag.if_none_match(_request(HTTP_IF_NONE_MATCH='*'), tag))
+
+    def test_if_match(self):
+        tag = etag.generate('a')
+        self.assertTrue(etag.if_match(_request(), tag))
+        self.assertTrue(etag.if_match(_request(HTTP_IF_MATCH=tag), tag))
+        self.assertTrue(etag.if_match(_request(HTTP_IF_MATCH='*'), tag))
+        self.assertFalse(etag.if_match(_request(HTTP_IF_MATCH=etag.generate('b')), tag))
+        # The strong comparison is used, so a weak tag never matches
+        self.assertFalse(etag.if_match(_request(HTTP_IF_MATCH=f'W/{tag}'), tag))
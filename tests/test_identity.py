@@ -0,0 +1,77 @@
+# stdlib
+from datetime import datetime, timezone
+# libs
+from django.test import TestCase
+# local
+from training.models import Cls, Syllabus
+from training.utils import identity
+
+
+class IdentityTests(TestCase):
+    databases = {'default', 'training'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.syllabus = Syllabus.objects.create(name='syllabus', description='', member_id=1)
+        cls.cls = Cls.objects.create(
+            syllabus=cls.syllabus,
+            member_id=1,
+            trainer='trainer',
+            start_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+        )
+
+    def setUp(self):
+        token = identity.start()
+        self.addCleanup(identity.finish, token)
+
+    def test_get_fetches_each_record_once(self):
+        with self.assertNumQueries(1, using='training'):
+            obj = identity.get(Syllabus.objects.all(), self.syllabus.pk)
+            self.assertIs(identity.get(Syllabus.objects.all(), self.syllabus.pk), obj)
+
+    def test_missing_record_does_not_exist(self):
+        with self.assertRaises(Syllabus.DoesNotExist):
+            identity.get(Syllabus.objects.all(), self.syllabus.pk + 1)
+
+    def test_related_records_are_added(self):
+        obj = Cls.objects.select_related('syllabus').get(pk=self.cls.pk)
+        identity.add(obj)
+        with self.assertNumQueries(0, using='training'):
+            self.assertIs(identity.get(Cls.objects.all(), self.cls.pk), obj)
+            self.assertIs(identity.get(Syllabus.objects.all(), self.syllabus.pk), obj.syllabus)
+
+    def test_records_with_deferred_fields_are_not_added(self):
+        identity.add(Syllabus.objects.only('id', 'member_id').get(pk=self.syllabus.pk))
+        with self.assertNumQueries(1, using='training'):
+            self.assertEqual(identity.get(Syllabus.objects.all(), self.syllabus.pk).description, '')
+
+    def test_records_only_missing_the_search_document_are_added(self):
+        obj = Syllabus.objects.get(pk=self.syllabus.pk)
+        self.assertEqual(obj.get_deferred_fields(), {'search'})
+        identity.add(obj)
+        with self.assertNumQueries(0, using='training'):
+            self.assertIs(identity.get(Syllabus.objects.all(), self.syllabus.pk), obj)
+
+    def test_unsaved_records_are_not_added(self):
+        identity.add(Syllabus(member_id=1))
+        self.assertEqual(identity._records.get(), {})
+
+    def test_finish_restores_the_previous_map(self):
+        obj = identity.get(Syllabus.objects.all(), self.syllabus.pk)
+        token = identity.start()
+        with self.assertNumQueries(1, using='training'):
+            self.assertIsNot(identity.get(Syllabus.objects.all(), self.syllabus.pk), obj)
+        identity.finish(token)
+        with self.assertNumQueries(0, using='training'):
+            self.assertIs(identity.get(Syllabus.objects.all(), self.syllabus.pk), obj)
+
+
+class NoRequestTests(TestCase):
+    databases = {'default', 'training'}
+
+    def test_nothing_is_mapped_outside_a_request(self):
+        syllabus = Syllabus.objects.create(name='syllabus', description='', member_id=1)
+        identity.add(syllabus)
+        with self.assertNumQueries(2, using='training'):
+            first = identity.get(Syllabus.objects.all(), syllabus.pk)
+            self.assertIsNot(identity.get(Syllabus.objects.all(), syllabus.pk), first)
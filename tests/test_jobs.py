@@ -0,0 +1,161 @@
+# stdlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+# libs
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone as django_timezone
+# local
+from training.models import Cls, Job, Student, Syllabus
+from training.utils import jobs
+
+
+class JobTests(TestCase):
+    databases = {'default', 'training'}
+
+    def setUp(self):
+        start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        syllabus = Syllabus.objects.create(name='syllabus', description='', member_id=1)
+        self.classes = [
+            Cls.objects.create(syllabus=syllabus, member_id=member_id, trainer=trainer, start_date=start)
+            for member_id, trainer in ((1, 'alice'), (1, 'bob'), (2, 'alice'))
+        ]
+        for cls in self.classes:
+            Student.objects.create(cls=cls, member_id=cls.member_id, user_id=1, notes='')
+
+    def test_enqueue_stores_the_selection(self):
+        job = jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, search={'trainer': 'alice'})
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.member_id, 1)
+        self.assertEqual(job.payload['search'], {'trainer': 'alice'})
+        self.assertIsNone(job.payload['ids'])
+
+    def test_run_soft_delete_stays_in_the_member(self):
+        job = jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, search={'trainer': 'alice'})
+        self.assertTrue(jobs.run_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {'training.Cls': 1, 'training.Student': 1})
+        self.assertEqual(set(Cls.objects.values_list('pk', flat=True)), {self.classes[1].pk, self.classes[2].pk})
+
+    def test_run_update_by_ids_stays_in_the_member(self):
+        ids = [cls.pk for cls in self.classes]
+        job = jobs.enqueue(jobs.JOB_UPDATE, Cls, 'member_id', 1, ids, values={'trainer': 'carol'})
+        self.assertTrue(jobs.run_next())
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'training.Cls': 2})
+        self.assertEqual(Cls.objects.get(pk=self.classes[2].pk).trainer, 'alice')
+
+    def test_run_records_failures(self):
+        job = jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, search={'unknown': 1})
+        with mock.patch.object(jobs.logger, 'exception'):
+            self.assertTrue(jobs.run_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNotNone(job.error)
+
+    def test_claim_takes_the_oldest_job(self):
+        first = jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, [self.classes[0].pk])
+        jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, [self.classes[1].pk])
+        job = jobs.claim()
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        # A running Job is not claimed again until it is stale
+        self.assertNotEqual(jobs.claim().pk, first.pk)
+        self.assertIsNone(jobs.claim())
+        self.assertFalse(jobs.run_next())
+
+    def test_claim_retries_stale_jobs(self):
+        job = jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, [self.classes[0].pk])
+        stale = django_timezone.now() - jobs.STALE_AFTER * 2
+        Job.objects.filter(pk=job.pk).update(status=Job.RUNNING, updated=stale, attempts=1)
+        self.assertEqual(jobs.claim().attempts, 2)
+
+    def test_claim_fails_jobs_out_of_attempts(self):
+        job = jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, [self.classes[0].pk])
+        stale = django_timezone.now() - jobs.STALE_AFTER * 2
+        Job.objects.filter(pk=job.pk).update(status=Job.RUNNING, updated=stale, attempts=jobs.MAX_ATTEMPTS)
+        self.assertIsNone(jobs.claim())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_heartbeat_keeps_a_long_job_from_being_claimed_again(self):
+        jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, [self.classes[0].pk])
+        job = jobs.claim()
+        stale = django_timezone.now() - jobs.STALE_AFTER * 2
+        Job.objects.filter(pk=job.pk).update(started=stale, updated=stale)
+        self.assertTrue(jobs._beat(job))
+        self.assertIsNone(jobs.claim())
+
+    def test_run_does_not_overwrite_a_newer_attempt(self):
+        jobs.enqueue(jobs.JOB_SOFT_DELETE, Cls, 'member_id', 1, [self.classes[0].pk])
+        job = jobs.claim()
+        # Another worker claims the Job again while this one is still running it
+        Job.objects.filter(pk=job.pk).update(attempts=job.attempts + 1)
+        self.assertFalse(jobs._beat(job))
+        with mock.patch.object(jobs.logger, 'warning') as warning:
+            jobs.run(job)
+        warning.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertIsNone(job.result)
+        self.assertIsNone(job.finished)
+
+
+class SkipLockedTests(TransactionTestCase):
+    databases = {'default', 'training'}
+
+    @skipUnlessDBFeature('has_select_for_update_skip_locked')
+    def test_claim_skips_jobs_locked_by_other_workers(self):
+        first = Job.objects.create(kind=jobs.JOB_SOFT_DELETE, member_id=1)
+        second = Job.objects.create(kind=jobs.JOB_SOFT_DELETE, member_id=1)
+        locked = threading.Event()
+        release = threading.Event()
+
+        def worker():
+            # Another worker holds the lock on the oldest Job
+            try:
+                with transaction.atomic(using='training'):
+                    Job.objects.select_for_update().get(pk=first.pk)
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            self.assertEqual(jobs.claim().pk, second.pk)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(jobs.claim().pk, first.pk)
+
+
+class HeartbeatTests(TransactionTestCase):
+    databases = {'default', 'training'}
+
+    def test_heartbeats_are_sent_while_a_job_runs(self):
+        Job.objects.create(kind=jobs.JOB_SOFT_DELETE, member_id=1)
+        job = jobs.claim()
+        claimed = Job.objects.get(pk=job.pk).updated
+        beats = []
+
+        def handler(payload):
+            # Wait for a heartbeat from the other connection to be committed
+            for _ in range(100):
+                beats.append(Job.objects.get(pk=job.pk).updated)
+                if beats[-1] > claimed:
+                    break
+                time.sleep(0.02)
+            return {}
+
+        with mock.patch.object(jobs, 'HEARTBEAT_INTERVAL', timedelta(milliseconds=10)):
+            with mock.patch.dict(jobs.HANDLERS, {jobs.JOB_SOFT_DELETE: handler}):
+                jobs.run(job)
+        self.assertGreater(beats[-1], claimed)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.SUCCEEDED)
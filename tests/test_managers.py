@@ -0,0 +1,35 @@
+# stdlib
+from datetime import datetime, timezone
+# libs
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+# local
+from training.models import Cls, Student, Syllabus
+
+
+class SearchDeferredTests(TestCase):
+    databases = {'default', 'training'}
+
+    @classmethod
+    def setUpTestData(cls):
+        syllabus = Syllabus.objects.create(name='syllabus', description='', member_id=1)
+        klass = Cls.objects.create(
+            syllabus=syllabus,
+            member_id=1,
+            trainer='trainer',
+            start_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+        )
+        Student.objects.create(cls=klass, member_id=1, user_id=1, notes='notes')
+
+    def test_search_documents_are_not_selected(self):
+        for model in (Cls, Student, Syllabus):
+            with self.subTest(model=model.__name__):
+                with CaptureQueriesContext(connections['training']) as queries:
+                    obj = model.objects.get()
+                self.assertNotIn('search', queries[0]['sql'].split(' FROM ')[0])
+                self.assertTrue(obj.get_deferred_fields() <= {'search'})
+
+    def test_search_documents_can_still_be_filtered_on(self):
+        self.assertEqual(Syllabus.objects.filter(search__isnull=False).count(), 1)
+        self.assertEqual(Student.objects.filter(cls__syllabus__search__isnull=False).count(), 1)
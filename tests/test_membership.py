@@ -0,0 +1,63 @@
+# stdlib
+from types import SimpleNamespace
+from unittest import mock
+# libs
+from django.test import SimpleTestCase
+# local
+from training.utils import membership
+
+
+def _request(member_id: int = 1):
+    return SimpleNamespace(auth='token', user=SimpleNamespace(member={'id': member_id}))
+
+
+class UserExistsTests(SimpleTestCase):
+
+    def setUp(self):
+        membership.user_cache.clear()
+        self.addCleanup(membership.user_cache.clear)
+        patcher = mock.patch('training.utils.membership.Membership')
+        self.Membership = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.span = mock.Mock()
+
+    def respond(self, status_code: int):
+        self.Membership.user.read.return_value = SimpleNamespace(status_code=status_code)
+
+    def test_found_user_is_cached(self):
+        self.respond(200)
+        self.assertTrue(membership.user_exists(_request(), 5, self.span))
+        self.assertTrue(membership.user_exists(_request(), 5, self.span))
+        self.assertEqual(self.Membership.user.read.call_count, 1)
+        self.span.set_tag.assert_called_with('membership_user_cache', 'hit')
+
+    def test_cache_is_per_member(self):
+        self.respond(200)
+        membership.user_exists(_request(1), 5, self.span)
+        membership.user_exists(_request(2), 5, self.span)
+        self.assertEqual(self.Membership.user.read.call_count, 2)
+
+    def test_missing_user_is_cached_briefly(self):
+        self.respond(404)
+        self.assertFalse(membership.user_exists(_request(), 5, self.span))
+        self.assertFalse(membership.user_exists(_request(), 5, self.span))
+        self.assertEqual(self.Membership.user.read.call_count, 1)
+
+    def test_failed_read_is_not_cached(self):
+        self.respond(500)
+        self.assertFalse(membership.user_exists(_request(), 5, self.span))
+        self.assertFalse(membership.user_exists(_request(), 5, self.span))
+        self.assertEqual(self.Membership.user.read.call_count, 2)
+
+    def test_prefetch_fills_cache(self):
+        self.Membership.user.list.return_value = SimpleNamespace(
+            status_code=200,
+            json=lambda: {'content': [{'id': 5}, {'id': 6}]},
+        )
+        membership.prefetch_users(_request(), [5, 6, 7, 5], self.span)
+        self.assertEqual(self.Membership.user.list.call_count, 1)
+        self.respond(404)
+        self.assertTrue(membership.user_exists(_request(), 5, self.span))
+        self.assertTrue(membership.user_exists(_request(), 6, self.span))
+        self.assertFalse(membership.user_exists(_request(), 7, self.span))
+        self.assertEqual(self.Membership.user.read.call_count, 1)
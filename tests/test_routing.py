@@ -0,0 +1,136 @@
+# stdlib
+import threading
+from types import SimpleNamespace
+from unittest import mock
+# libs
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+# local
+from training.utils import routing, shards
+
+
+def request(method='GET', member_id=1, user_id=2):
+    return SimpleNamespace(method=method, user=SimpleNamespace(id=user_id, member={'id': member_id}))
+
+
+@override_settings(TRAINING_READ_REPLICAS=('replica_1', 'replica_2'), TRAINING_REPLICA_STRATEGY='round_robin')
+class RoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_outside_requests_use_the_shared_primary(self):
+        self.assertEqual(routing.db_for_read(), shards.DEFAULT)
+        self.assertEqual(routing.db_for_write(), shards.DEFAULT)
+
+    def test_reads_are_spread_across_the_replicas(self):
+        token = routing.start(request())
+        try:
+            self.assertEqual({routing.db_for_read() for _ in range(4)}, {'replica_1', 'replica_2'})
+            self.assertEqual(routing.primary(), shards.DEFAULT)
+        finally:
+            routing.finish(token)
+
+    def test_writes_pin_reads_to_the_primary(self):
+        token = routing.start(request('POST'))
+        try:
+            self.assertEqual(routing.db_for_read(), shards.DEFAULT)
+        finally:
+            routing.finish(token)
+
+        token = routing.start(request())
+        try:
+            self.assertEqual(routing.db_for_write(), shards.DEFAULT)
+            self.assertEqual(routing.db_for_read(), shards.DEFAULT)
+        finally:
+            routing.finish(token)
+
+    def test_users_who_wrote_read_from_the_primary_for_a_while(self):
+        token = routing.start(request('POST'))
+        routing.db_for_write()
+        routing.finish(token)
+        token = routing.start(request())
+        try:
+            self.assertEqual(routing.db_for_read(), shards.DEFAULT)
+        finally:
+            routing.finish(token)
+        # Other Users of the Member still read from the replicas
+        token = routing.start(request(user_id=3))
+        try:
+            self.assertIn(routing.db_for_read(), ('replica_1', 'replica_2'))
+        finally:
+            routing.finish(token)
+
+    def test_finish_restores_the_routing_from_before(self):
+        with routing.use('shard_1'):
+            token = routing.start(request())
+            self.assertIn(routing.db_for_read(), ('replica_1', 'replica_2'))
+            routing.finish(token)
+            self.assertEqual(routing.db_for_read(), 'shard_1')
+        self.assertEqual(routing.primary(), shards.DEFAULT)
+
+    @override_settings(TRAINING_SHARDS=('shard_1',), TRAINING_SHARD_MAP={1: 'shard_1'})
+    def test_sharded_members_use_their_shard(self):
+        token = routing.start(request())
+        try:
+            # Only the shared DB has replicas
+            self.assertEqual(routing.db_for_read(), 'shard_1')
+            self.assertEqual(routing.db_for_write(), 'shard_1')
+        finally:
+            routing.finish(token)
+
+    def test_async_start_and_finish(self):
+        async def handle():
+            token = await routing.astart(request('PATCH'))
+            try:
+                routing.db_for_write()
+                return routing.db_for_read()
+            finally:
+                await routing.afinish(token)
+
+        self.assertEqual(async_to_sync(handle)(), shards.DEFAULT)
+        self.assertEqual(routing.primary(), shards.DEFAULT)
+        token = routing.start(request())
+        try:
+            self.assertEqual(routing.db_for_read(), shards.DEFAULT)
+        finally:
+            routing.finish(token)
+
+
+@override_settings(TRAINING_READ_REPLICAS=('replica_1', 'replica_2'), TRAINING_REPLICA_STRATEGY='least_lag')
+class LeastLagTests(SimpleTestCase):
+
+    def setUp(self):
+        routing._lags, routing._lags_checked = {}, 0.0
+
+    def test_least_lagged_replica_is_chosen(self):
+        lags = {'replica_1': 3.0, 'replica_2': 0.5}
+        with mock.patch.object(routing, '_measure', side_effect=lags.get):
+            self.assertEqual(routing._least_lagged(('replica_1', 'replica_2')), 'replica_2')
+
+    def test_primary_is_chosen_when_every_replica_is_down(self):
+        with mock.patch.object(routing, '_measure', return_value=None):
+            self.assertEqual(routing._least_lagged(('replica_1', 'replica_2')), shards.DEFAULT)
+
+    def test_slow_measurements_do_not_block_other_threads(self):
+        measuring = threading.Event()
+        release = threading.Event()
+
+        def measure(alias):
+            measuring.set()
+            release.wait(10)
+            return 0.0
+
+        with mock.patch.object(routing, '_measure', side_effect=measure):
+            thread = threading.Thread(target=routing._least_lagged, args=(('replica_1', 'replica_2'),))
+            thread.start()
+            try:
+                self.assertTrue(measuring.wait(10))
+                # Other threads read from the primary until the first measurements are in, and can still take turns
+                self.assertEqual(routing._least_lagged(('replica_1', 'replica_2')), shards.DEFAULT)
+                self.assertIn(routing._next_in_turn(('replica_1', 'replica_2')), ('replica_1', 'replica_2'))
+            finally:
+                release.set()
+                thread.join()
+        self.assertEqual(routing._lags, {'replica_1': 0.0, 'replica_2': 0.0})
@@ -0,0 +1,88 @@
+# stdlib
+from datetime import datetime, timezone
+# libs
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+# local
+from training.models import Cls, Student, Syllabus
+from training.serializers import ClsRowSerializer, SyllabusRowSerializer
+from training.utils import identity, scoped
+
+
+class ScopedTests(TestCase):
+    databases = {'default', 'training'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.syllabus = Syllabus.objects.create(name='syllabus', description='', member_id=1)
+        cls.cls = Cls.objects.create(
+            syllabus=cls.syllabus,
+            member_id=1,
+            trainer='trainer',
+            start_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+        )
+        cls.other = Syllabus.objects.create(name='other', description='', member_id=2)
+
+    def setUp(self):
+        token = identity.start()
+        self.addCleanup(identity.finish, token)
+
+    def test_record_in_member_is_fetched_and_mapped(self):
+        with CaptureQueriesContext(connections['training']) as queries:
+            obj = scoped.get(Cls.objects.all(), self.cls.pk, 1)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(obj, self.cls)
+        # The record and its Syllabus are reused by anything else that looks them up
+        with self.assertNumQueries(0, using='training'):
+            self.assertIs(identity.get(Cls.objects.all(), self.cls.pk), obj)
+            self.assertIs(identity.get(Syllabus.objects.all(), self.syllabus.pk), obj.syllabus)
+
+    def test_record_in_other_member_is_a_stand_in(self):
+        with CaptureQueriesContext(connections['training']) as queries:
+            obj = scoped.get(Syllabus.objects.all(), self.other.pk, 1)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual((obj.pk, obj.member_id), (self.other.pk, 2))
+        self.assertEqual(obj.name, '')
+        self.assertTrue(obj._state.adding)
+        # The stand-in is never mapped in place of the record
+        with self.assertNumQueries(1, using='training'):
+            self.assertEqual(identity.get(Syllabus.objects.all(), self.other.pk).name, 'other')
+
+    def test_missing_record_does_not_exist(self):
+        with self.assertRaises(Syllabus.DoesNotExist):
+            scoped.get(Syllabus.objects.all(), self.other.pk + 1, 1)
+
+    def test_deleted_record_does_not_exist(self):
+        deleted = Student.objects.create(cls=self.cls, member_id=1, user_id=1, deleted=datetime.now(timezone.utc))
+        with self.assertRaises(Student.DoesNotExist):
+            scoped.get(Student.objects.all(), deleted.pk, 1)
+
+    def test_aget(self):
+        obj = async_to_sync(scoped.aget)(Cls.objects.all(), self.cls.pk, 1)
+        self.assertEqual(obj, self.cls)
+        stand_in = async_to_sync(scoped.aget)(Syllabus.objects.all(), self.other.pk, 1)
+        self.assertEqual((stand_in.pk, stand_in.member_id), (self.other.pk, 2))
+        with self.assertRaises(Syllabus.DoesNotExist):
+            async_to_sync(scoped.aget)(Syllabus.objects.all(), self.other.pk + 1, 1)
+
+    def test_sparse_only_follows_requested_relations(self):
+        fields = ClsRowSerializer.parse_fields('id')
+        with CaptureQueriesContext(connections['training']) as queries:
+            obj = scoped.get(scoped.sparse(Cls.objects.all(), ClsRowSerializer, fields), self.cls.pk, 1)
+        self.assertNotIn('"syllabus"', queries[0]['sql'])
+        self.assertEqual(obj.get_deferred_fields() & {'id', 'member_id', 'updated'}, set())
+
+        fields = ClsRowSerializer.parse_fields('id,syllabus.name')
+        with CaptureQueriesContext(connections['training']) as queries:
+            obj = scoped.get(scoped.sparse(Cls.objects.all(), ClsRowSerializer, fields), self.cls.pk, 1)
+        self.assertIn('"syllabus"', queries[0]['sql'])
+        self.assertNotIn('description', queries[0]['sql'])
+        self.assertEqual(obj.syllabus.name, 'syllabus')
+
+    def test_sparse_without_relations(self):
+        fields = SyllabusRowSerializer.parse_fields('name')
+        obj = scoped.get(scoped.sparse(Syllabus.objects.all(), SyllabusRowSerializer, fields), self.syllabus.pk, 1)
+        self.assertIn('description', obj.get_deferred_fields())
+        self.assertEqual(obj.name, 'syllabus')
@@ -0,0 +1,49 @@
+# libs
+from django.test import SimpleTestCase, override_settings
+# local
+from training.db_router import TrainingRouter
+from training.models import Syllabus
+from training.utils import routing, shards
+
+
+@override_settings(
+    TRAINING_READ_REPLICAS=('training_replica_0',),
+    TRAINING_SHARDS=('training_eu', 'training'),
+    TRAINING_SHARD_MAP={5: 'training_eu'},
+)
+class ShardTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = TrainingRouter()
+
+    def test_aliases_start_with_the_shared_db(self):
+        self.assertEqual(shards.aliases(), ('training', 'training_eu'))
+
+    def test_members_are_placed_by_the_shard_map(self):
+        self.assertEqual(shards.for_member(5), 'training_eu')
+        self.assertEqual(shards.for_member(6), shards.DEFAULT)
+
+    def test_every_shard_is_migrated_but_not_the_replicas(self):
+        self.assertTrue(self.router.allow_migrate('training', 'training'))
+        self.assertTrue(self.router.allow_migrate('training_eu', 'training'))
+        self.assertFalse(self.router.allow_migrate('training_replica_0', 'training'))
+        self.assertFalse(self.router.allow_migrate('default', 'training'))
+        self.assertIsNone(self.router.allow_migrate('default', 'auth'))
+
+    def test_relations_never_cross_shards(self):
+        eu, shared, replica = Syllabus(), Syllabus(), Syllabus()
+        eu._state.db, shared._state.db, replica._state.db = 'training_eu', 'training', 'training_replica_0'
+        self.assertFalse(self.router.allow_relation(eu, shared))
+        self.assertTrue(self.router.allow_relation(eu, eu))
+        self.assertTrue(self.router.allow_relation(shared, replica))
+
+    def test_queries_follow_the_shard_in_use(self):
+        with routing.use('training_eu'):
+            self.assertEqual(self.router.db_for_read(Syllabus), 'training_eu')
+            self.assertEqual(self.router.db_for_write(Syllabus), 'training_eu')
+        self.assertEqual(self.router.db_for_read(Syllabus), shards.DEFAULT)
+
+    def test_related_records_are_read_from_the_db_of_the_instance(self):
+        instance = Syllabus()
+        instance._state.db = 'training_replica_0'
+        self.assertEqual(self.router.db_for_read(Syllabus, instance=instance), 'training_replica_0')
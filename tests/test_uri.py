@@ -0,0 +1,15 @@
+# libs
+from django.test import SimpleTestCase
+from django.urls import reverse
+# local
+from training.utils.uri import resource_uri, resource_uri_builder
+
+
+class ResourceURITests(SimpleTestCase):
+
+    def test_matches_reverse(self):
+        for name in ('cls_resource', 'job_resource', 'student_resource', 'syllabus_resource'):
+            for pk in (1, 42, 918273645546372818):
+                with self.subTest(name=name, pk=pk):
+                    self.assertEqual(resource_uri(name, pk), reverse(name, kwargs={'pk': pk}))
+                    self.assertEqual(resource_uri_builder(name)(pk), reverse(name, kwargs={'pk': pk}))
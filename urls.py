@@ -1,45 +1,101 @@
 # libs
+from django.conf import settings
 from django.urls import path
 # local
 from . import views
 
+# Under ASGI, the Collection and Resource views are served by their async variants, which wait on the DB and Membership
+# without holding a thread
+if getattr(settings, 'TRAINING_ASYNC_VIEWS', False):
+    ClsCollection, ClsResource = views.AsyncClsCollection, views.AsyncClsResource
+    StudentCollection, StudentResource = views.AsyncStudentCollection, views.AsyncStudentResource
+    SyllabusCollection, SyllabusResource = views.AsyncSyllabusCollection, views.AsyncSyllabusResource
+else:
+    ClsCollection, ClsResource = views.ClsCollection, views.ClsResource
+    StudentCollection, StudentResource = views.StudentCollection, views.StudentResource
+    SyllabusCollection, SyllabusResource = views.SyllabusCollection, views.SyllabusResource
+
 urlpatterns = [
     # Class
     path(
         'class/',
-        views.ClsCollection.as_view(),
+        ClsCollection.as_view(),
         name='cls_collection',
     ),
 
+    path(
+        'class/bulk/',
+        views.ClsBulk.as_view(),
+        name='cls_bulk',
+    ),
+
+    path(
+        'class/export/',
+        views.ClsExport.as_view(),
+        name='cls_export',
+    ),
+
     path(
         'class/<int:pk>/',
-        views.ClsResource.as_view(),
+        ClsResource.as_view(),
         name='cls_resource',
     ),
 
+    # Job
+    path(
+        'job/<int:pk>/',
+        views.JobResource.as_view(),
+        name='job_resource',
+    ),
+
+    # Search
+    path(
+        'search/',
+        views.Search.as_view(),
+        name='search',
+    ),
+
     # Student
     path(
         'student/',
-        views.StudentCollection.as_view(),
+        StudentCollection.as_view(),
         name='student_collection',
     ),
 
+    path(
+        'student/bulk/',
+        views.StudentBulk.as_view(),
+        name='student_bulk',
+    ),
+
+    path(
+        'student/export/',
+        views.StudentExport.as_view(),
+        name='student_export',
+    ),
+
     path(
         'student/<int:pk>/',
-        views.StudentResource.as_view(),
+        StudentResource.as_view(),
         name='student_resource',
     ),
 
     # Syllabus
     path(
         'syllabus/',
-        views.SyllabusCollection.as_view(),
+        SyllabusCollection.as_view(),
         name='syllabus_collection',
     ),
 
+    path(
+        'syllabus/export/',
+        views.SyllabusExport.as_view(),
+        name='syllabus_export',
+    ),
+
     path(
         'syllabus/<int:pk>/',
-        views.SyllabusResource.as_view(),
+        SyllabusResource.as_view(),
         name='syllabus_resource',
     ),
 ]
@@ -0,0 +1,3 @@
+"""
+Helpers that are shared between the views, controllers and serializers of the training application
+"""
@@ -0,0 +1,80 @@
+"""
+Selection of the records changed by the bulk update and delete views.
+
+Records are selected either by the ids sent in the `ids` parameter, or by the same search and exclude parameters as
+the list, which are scoped to the requesting User's Member. The selection is summarised for the permission checks in
+one aggregate query, and then written with a single set-based UPDATE however many records it holds.
+"""
+# stdlib
+from typing import Any, Dict, List, Optional
+# libs
+from django.db.models import Count, Q, QuerySet
+
+__all__ = [
+    'MAX_IDS',
+    'parse_ids',
+    'select',
+    'summarise',
+]
+
+# The most records that can be selected by id in one request
+MAX_IDS = 1000
+
+
+def parse_ids(ids: Optional[str]) -> Optional[List[int]]:
+    """
+    Parse the `ids` parameter sent by a User, a comma separated list of ids
+    :param ids: The `ids` parameter, if one was sent
+    :return: The distinct ids in the order they were sent, or None if no ids were sent
+    :raises ValueError: If any of the ids are not positive integers, or too many were sent
+    """
+    if ids is None:
+        return None
+    parsed = list(dict.fromkeys(int(pk) for pk in ids.split(',')))
+    if not 0 < len(parsed) <= MAX_IDS or min(parsed) <= 0:
+        raise ValueError('ids must be a list of between 1 and 1000 positive integers')
+    return parsed
+
+
+def select(
+    objs: QuerySet,
+    ids: Optional[List[int]],
+    member_path: str,
+    member_id: int,
+    search: Dict[str, Any],
+    exclude: Dict[str, Any],
+) -> QuerySet:
+    """
+    Select the records to change, by id if ids were sent or otherwise by the search and exclude filters.
+    Records selected by id are not scoped to the Member here, so that records in other Members can be reported as
+    forbidden rather than as missing by `summarise`.
+    :param objs: The QuerySet of all records of the Model being changed
+    :param ids: The parsed `ids` parameter
+    :param member_path: The lookup path from the Model to the id of the Member it belongs to
+    :param member_id: The id of the requesting User's Member
+    :param search: The search filters cleaned by a List Controller
+    :param exclude: The exclude filters cleaned by a List Controller
+    :return: The selected records
+    :raises ValueError, ValidationError: If the filters contain invalid values
+    """
+    if ids is not None:
+        return objs.filter(id__in=ids)
+    return objs.filter(**{member_path: member_id}, **search).exclude(**exclude)
+
+
+def summarise(objs: QuerySet, member_path: str, member_id: int, **conditions: Any) -> Dict[str, int]:
+    """
+    Count the selected records, along with the number of them outside the requesting User's Member and the number of
+    them that meet each of the given conditions, in one aggregate query
+    :param objs: The selected records
+    :param member_path: The lookup path from the Model to the id of the Member it belongs to
+    :param member_id: The id of the requesting User's Member
+    :param conditions: Q objects or boolean expressions to count the records that meet, keyed by the name to report
+                       the count under
+    :return: The counts, under `found`, `foreign` and the names of the conditions
+    """
+    return objs.order_by().aggregate(
+        found=Count('pk'),
+        foreign=Count('pk', filter=~Q(**{member_path: member_id})),
+        **{name: Count('pk', filter=condition) for name, condition in conditions.items()},
+    )
@@ -0,0 +1,89 @@
+"""
+A small in-process cache for the results of remote lookups.
+
+Entries expire after a time to live and the least recently used entry is evicted once the cache is full, so memory
+use is bounded no matter how many keys are looked up. Hits and misses are counted so the cache can be tuned.
+"""
+# stdlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+__all__ = [
+    'TTLCache',
+]
+
+
+class TTLCache:
+    """
+    A thread safe LRU cache whose entries expire after a time to live.
+    None is used to report a miss, so it cannot be cached as a value.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        :param maxsize: The maximum number of entries to keep
+        :param ttl: The default number of seconds an entry is kept for
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get the value cached for a key, marking it as recently used
+        :param key: The key to look up
+        :return: The cached value, or None if the key is not cached or has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def contains(self, key: Hashable) -> bool:
+        """
+        Check if an unexpired value is cached for a key, without counting a hit or miss or marking it as used
+        :param key: The key to look up
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Cache a value for a key, evicting the least recently used entry if the cache is full
+        :param key: The key to cache the value under
+        :param value: The value to cache
+        :param ttl: The number of seconds to keep the value for, if it differs from the default
+        """
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove every entry from the cache, keeping the hit and miss counts
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the hit and miss counts along with the current number of entries
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
@@ -0,0 +1,96 @@
+"""
+Set-based cascading soft deletes.
+
+Soft deleting a record also soft deletes every record below it, following each foreign key within the application
+that cascades on delete, e.g. Syllabus -> Class -> Student. Each level of the tree is marked deleted with a single
+UPDATE whose rows are selected by a subquery on the level above, so a cascade costs a fixed number of statements no
+matter how many records it reaches. Every record in a cascade is given the same deleted timestamp, and the whole
+cascade is applied in one transaction.
+"""
+# stdlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+# libs
+from django.db import router, transaction
+from django.db.models import CASCADE, Model, QuerySet
+from django.utils import timezone
+
+__all__ = [
+    'count',
+    'exceeds',
+    'soft_delete',
+]
+
+
+def _children(model: Type[Model]) -> List[Tuple[Type[Model], str]]:
+    """
+    List the Models in the same application that cascade from the given Model, along with the name of the foreign key
+    that refers to it
+    """
+    return [
+        (rel.related_model, rel.field.name)
+        for rel in model._meta.related_objects
+        if rel.on_delete is CASCADE and rel.related_model._meta.app_label == model._meta.app_label
+    ]
+
+
+def _levels(objs: QuerySet) -> List[Tuple[Type[Model], QuerySet]]:
+    """
+    List the records reached by a cascade, level by level from the top, as QuerySets that select each level by a
+    subquery on the level above. Only records that have not already been deleted are selected, at every level.
+    """
+    levels = [(objs.model, objs)]
+    for model, parents in levels:
+        for child, field in _children(model):
+            levels.append((child, child.objects.filter(**{f'{field}__in': parents.values('pk')})))
+    return levels
+
+
+def count(objs: QuerySet) -> int:
+    """
+    Count the records that soft deleting the selected records would delete, with one query for each level of the tree
+    :param objs: The records to delete
+    :return: The total number of records in the cascade
+    """
+    return sum(records.count() for _, records in _levels(objs))
+
+
+def exceeds(objs: QuerySet, limit: int) -> bool:
+    """
+    Check whether soft deleting the selected records would delete more than the given number of records.
+    Each level is counted only up to the number of records left before the limit is crossed, and the levels below are
+    not counted at all once it has been, so the check costs the same however big the cascade is.
+    :param objs: The records to delete
+    :param limit: The most records the cascade can hold
+    :return: True if the cascade holds more than `limit` records
+    """
+    remaining = limit
+    for _, records in _levels(objs):
+        remaining -= records.order_by()[:remaining + 1].count()
+        if remaining < 0:
+            return True
+    return False
+
+
+def soft_delete(objs: QuerySet, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Soft delete the selected records along with every record below them.
+    The records that have children are locked from the top down first, which also blocks any new children from being
+    created under them until the cascade is committed. The levels are then deleted from the bottom up, so each level
+    is still selected by the records above it, which have not been deleted yet.
+    :param objs: The records to delete
+    :param now: The deleted timestamp to set, which defaults to the current time
+    :return: The number of records deleted, keyed by the label of their Model, e.g. `training.Cls`
+    """
+    now = now or timezone.now()
+    levels = _levels(objs)
+    deleted: Dict[str, int] = {}
+    with transaction.atomic(using=router.db_for_write(objs.model)):
+        for model, records in levels:
+            if len(_children(model)) > 0:
+                # Fetching the rows takes their locks
+                for _ in records.select_for_update(of=('self',)).values_list('pk', flat=True).iterator():
+                    pass
+        for model, records in reversed(levels):
+            deleted[model._meta.label] = deleted.get(model._meta.label, 0) + records.update(deleted=now, updated=now)
+    return deleted
@@ -0,0 +1,69 @@
+"""
+Counting the total number of records in a list.
+
+Lists can be counted in one of three ways, chosen by the User with the `count` parameter
+- exact: The list is counted by the DB, in the same statement that fetches the page. The latest update to the records
+  is found in the same pass, which is used to version the list
+- estimated: The row estimate from the PostgreSQL planner is used, which does not scan the table
+- none: The list is not counted at all
+"""
+# stdlib
+import json
+from typing import Sequence
+# libs
+from django.db.models import F, JSONField, QuerySet, Subquery
+
+__all__ = [
+    'COUNT_ESTIMATED',
+    'COUNT_EXACT',
+    'COUNT_MODES',
+    'COUNT_NONE',
+    'aestimate_count',
+    'estimate_count',
+    'summary_subquery',
+]
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATED = 'estimated'
+COUNT_NONE = 'none'
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE)
+
+
+def summary_subquery(objs: QuerySet, versions: Sequence[str] = ()) -> Subquery:
+    """
+    Generate the expression that counts every record in a list and finds the latest of the given timestamps across
+    them, returned together as the JSON array `[count, latest]` so that the list is only scanned once.
+    It does not reference the outer query, so PostgreSQL evaluates it once as an InitPlan no matter how many rows are
+    selected, and annotating it onto a page returns the page and the summary in a single statement.
+    :param objs: The filtered QuerySet for the list, before any pagination is applied
+    :param versions: The lookup paths of the timestamps that change whenever a listed record changes, e.g. `updated`
+                     and `cls__updated`. The latest is null if none are given
+    :return: An expression that can be annotated onto the list
+    """
+    latest = 'NULL'
+    if len(versions) > 0:
+        latest = 'GREATEST({})'.format(', '.join(f'MAX("version_{i}")' for i in range(len(versions))))
+    return Subquery(
+        objs.order_by().values('pk', **{f'version_{i}': F(version) for i, version in enumerate(versions)}),
+        output_field=JSONField(),
+        template=f'(SELECT jsonb_build_array(COUNT(*), {latest}) FROM (%(subquery)s) "summary")',
+    )
+
+
+def estimate_count(objs: QuerySet) -> int:
+    """
+    Estimate the number of records in a list from the statistics the PostgreSQL planner keeps for each table.
+    Only the plan is generated, the query itself is never run.
+    :param objs: The filtered QuerySet for the list, before any pagination is applied
+    :return: The number of rows the planner expects the list to contain
+    """
+    plan = json.loads(objs.order_by().values('pk').explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+async def aestimate_count(objs: QuerySet) -> int:
+    """
+    Estimate the number of records in a list as `estimate_count` does, for the async views
+    """
+    plan = json.loads(await objs.order_by().values('pk').aexplain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
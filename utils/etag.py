@@ -0,0 +1,98 @@
+"""
+Entity tags for conditional requests.
+
+Every representation is tagged with a hash of everything it is generated from. A client polling with the tag it last
+received in `If-None-Match` is sent an empty 304 while nothing has changed, and a client updating with the tag in
+`If-Match` only overwrites the version of the record that it last read.
+"""
+# stdlib
+import hashlib
+from typing import Any, Optional, Type
+# libs
+from django.db.models import Model
+from django.utils.http import parse_etags
+from rest_framework.request import Request
+# local
+from training.serializers.base import Fields, RowSerializer
+from .pagination import Page
+
+__all__ = [
+    'for_page',
+    'for_record',
+    'generate',
+    'if_match',
+    'if_none_match',
+]
+
+
+def generate(*parts: Any) -> str:
+    """
+    Generate a strong entity tag from the values that determine a representation
+    :param parts: The values, which must have a stable repr
+    :return: The quoted entity tag
+    """
+    return f'"{hashlib.sha256(repr(parts).encode()).hexdigest()[:32]}"'
+
+
+def for_record(request: Optional[Request], obj: Model, serializer: Type[RowSerializer], fields: Fields = None) -> str:
+    """
+    Generate the entity tag for a single record from the `updated` timestamps of the record and the nested records
+    that are serialized with it
+    :param request: The request the record was read for, whose `fields` and `expand` parameters shape the data. None
+                    for the full representation, which is the one sent by updates and checked by `If-Match`
+    :param obj: The model instance being serialized, with the columns listed by `serializer.version_columns` loaded
+    :param serializer: The RowSerializer for the record
+    :param fields: The sparse fieldset being serialized
+    :return: The quoted entity tag
+    """
+    params = (None, None)
+    if request is not None:
+        params = (request.GET.get('fields'), request.GET.get('expand'))
+    return generate(obj._meta.label, obj.pk, params, serializer.version(obj, fields))
+
+
+def for_page(request: Request, page: Page) -> Optional[str]:
+    """
+    Generate the entity tag for a page of a list from the total number of records in the list and the latest update
+    to any of them, which changes whenever a record is added, updated or removed
+    :param request: The request for the list, whose parameters all shape the page
+    :param page: The Page of the list
+    :return: The quoted entity tag, or None if the list was not versioned
+    """
+    if page.version is None:
+        return None
+    return generate(
+        request.path,
+        request.user.member['id'],
+        sorted(request.GET.lists()),
+        page.total_records,
+        page.version,
+    )
+
+
+def if_none_match(request: Request, etag: Optional[str]) -> bool:
+    """
+    Check the `If-None-Match` header of a GET against the current entity tag, using the weak comparison
+    :param request: The request to check
+    :param etag: The current entity tag, if there is one
+    :return: True if the client's copy is still current, in which case a 304 should be sent
+    """
+    header = request.headers.get('If-None-Match')
+    if header is None or etag is None:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in (tag.removeprefix('W/') for tag in etags)
+
+
+def if_match(request: Request, etag: str) -> bool:
+    """
+    Check the `If-Match` header of an update against the current entity tag, using the strong comparison
+    :param request: The request to check
+    :param etag: The current entity tag
+    :return: False if the header was sent and the record has changed since, in which case a 412 should be sent
+    """
+    header = request.headers.get('If-Match')
+    if header is None:
+        return True
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags
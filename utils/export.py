@@ -0,0 +1,118 @@
+"""
+Streaming exports of lists.
+
+Rows are read from the DB through a server-side cursor, a chunk at a time, and each chunk is written to the response as
+soon as it is serialized. Nothing is kept between chunks, so memory use stays flat no matter how big the export is.
+"""
+# stdlib
+import csv
+import io
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Type
+# libs
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+# local
+from training.serializers.base import Fields, RowSerializer
+
+__all__ = [
+    'EXPORT_CSV',
+    'EXPORT_NDJSON',
+    'EXPORT_OUTPUTS',
+    'stream',
+]
+
+EXPORT_CSV = 'csv'
+EXPORT_NDJSON = 'ndjson'
+EXPORT_OUTPUTS = (EXPORT_NDJSON, EXPORT_CSV)
+
+CONTENT_TYPES = {
+    EXPORT_CSV: 'text/csv',
+    EXPORT_NDJSON: 'application/x-ndjson',
+}
+# The number of rows fetched from the server-side cursor, and written to the response, at a time
+CHUNK_SIZE = 2000
+
+Build = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Split the rows into lists of CHUNK_SIZE rows
+    """
+    rows = iter(rows)
+    chunk = list(islice(rows, CHUNK_SIZE))
+    while len(chunk) > 0:
+        yield chunk
+        chunk = list(islice(rows, CHUNK_SIZE))
+
+
+def _flatten(data: Dict[str, Any], prefix: str = '') -> Iterator[Any]:
+    """
+    Flatten serialized data into (key, value) pairs, where the keys of nested records are given by their path
+    """
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f'{prefix}{key}.')
+        elif isinstance(value, (date, datetime)):
+            yield f'{prefix}{key}', value.isoformat()
+        else:
+            yield f'{prefix}{key}', value
+
+
+def _ndjson(rows: Iterable[Dict[str, Any]], build: Build) -> Iterator[str]:
+    """
+    Write each record as a line of JSON, encoded the same way as the API responses
+    """
+    encoder = JSONEncoder()
+    for chunk in _chunks(rows):
+        yield ''.join(f'{encoder.encode(build(row))}\n' for row in chunk)
+
+
+def _csv(rows: Iterable[Dict[str, Any]], build: Build, headers: List[str]) -> Iterator[str]:
+    """
+    Write a header line followed by a line for each record, with a column for each flattened key
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=headers)
+    writer.writeheader()
+    for chunk in _chunks(rows):
+        writer.writerows(dict(_flatten(build(row))) for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Send the header even when there are no records
+    if buffer.tell() > 0:
+        yield buffer.getvalue()
+
+
+def stream(
+    objs: QuerySet,
+    serializer: Type[RowSerializer],
+    fields: Fields,
+    output: str,
+    filename: str,
+) -> StreamingHttpResponse:
+    """
+    Generate a response that streams every record in a list
+    :param objs: The filtered and ordered QuerySet for the list
+    :param serializer: The RowSerializer for the listed records
+    :param fields: The sparse fieldset to export
+    :param output: The output format, one of EXPORT_OUTPUTS
+    :param filename: The name of the downloaded file, without the extension
+    :return: A response that fetches, serializes and sends the records as it is streamed
+    """
+    # The rows are only read once the response is streamed, after the request's routing has been finished, so the DB
+    # to read them from is chosen now
+    rows = objs.using(objs.db).values(*serializer.columns(fields=fields)).iterator(chunk_size=CHUNK_SIZE)
+    # The builder is generated now, as the uri templates depend on the request
+    build = serializer.builder(fields=fields)
+    if output == EXPORT_CSV:
+        content = _csv(rows, build, serializer.flat_keys(fields=fields))
+    else:
+        content = _ndjson(rows, build)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
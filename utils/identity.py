@@ -0,0 +1,79 @@
+"""
+An identity map of the records loaded while handling a request.
+
+Each record is loaded from the DB at most once per request, however many of the view, its Controller, its
+Permissions and its serializer need it. The records fetched by the resource views are added to the map along with
+the related records that were fetched with them, and the Controllers look up the records that are referred to by id
+through it, e.g. an update that sends the unchanged `syllabus_id` of a Class uses the Syllabus fetched with the Class.
+Each request starts with an empty map, and outside of requests nothing is mapped, so records are never shared between
+requests.
+"""
+# stdlib
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional, Tuple
+# libs
+from django.db.models import Model, QuerySet
+
+__all__ = [
+    'add',
+    'finish',
+    'get',
+    'start',
+]
+
+# The fields that are deferred by the managers of the Models, which records are complete without
+ALWAYS_DEFERRED = frozenset(('search',))
+# None when not handling a request
+_records: ContextVar[Optional[Dict[Tuple[str, Any], Model]]] = ContextVar('training_identity_map', default=None)
+
+
+def start() -> Token:
+    """
+    Start an empty map for the request being handled
+    :return: The token to pass to `finish` once the request has been handled
+    """
+    return _records.set({})
+
+
+def finish(token: Token):
+    """
+    Drop the map of the request that has been handled
+    :param token: The token returned by `start`
+    """
+    _records.reset(token)
+
+
+def add(obj: Model):
+    """
+    Add a record to the map, along with every related record that was fetched with it by `select_related`.
+    Records with deferred fields are left out, as they cannot stand in for a fully loaded record, apart from the full
+    text search document that the managers always defer
+    :param obj: The record
+    """
+    records = _records.get()
+    if records is None:
+        return
+    pending = [obj]
+    while len(pending) > 0:
+        obj = pending.pop()
+        if obj.pk is None or len(obj.get_deferred_fields() - ALWAYS_DEFERRED) > 0:
+            continue
+        records.setdefault((obj._meta.label, obj.pk), obj)
+        pending.extend(related for related in obj._state.fields_cache.values() if isinstance(related, Model))
+
+
+def get(objs: QuerySet, pk: int) -> Model:
+    """
+    Get a record by id from the map, fetching it and adding it to the map if it has not been loaded yet
+    :param objs: The records to fetch from
+    :param pk: The id of the record
+    :return: The record
+    :raises DoesNotExist: If there is no record with the id
+    """
+    records = _records.get()
+    key = (objs.model._meta.label, pk)
+    if records is not None and key in records:
+        return records[key]
+    obj = objs.get(pk=pk)
+    add(obj)
+    return obj
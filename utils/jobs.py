@@ -0,0 +1,251 @@
+"""
+A local queue of Jobs, for operations that are too big to run while a request waits.
+
+Jobs are stored in the `job` table of the training DB and run by workers started with the `process_jobs` management
+command. Each worker claims the oldest waiting Job with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of workers
+can run side by side without claiming the same Job twice or waiting on each other's locks. While a Job runs, its
+worker bumps its `updated` time every HEARTBEAT_INTERVAL, and a Job whose worker died is claimed again once it has gone
+STALE_AFTER without a heartbeat, up to MAX_ATTEMPTS times. A worker only records the result of a Job that has not been
+claimed again or failed since it claimed it.
+Views decide between running an operation inline and queueing it by comparing its size against INLINE_LIMIT.
+A Job stores how its records were selected rather than the records themselves, so queueing one costs the same however
+many records it changes. The selection is made again when the Job is run, scoped to the Member.
+"""
+# stdlib
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Type
+# libs
+from django.apps import apps
+from django.db import connections, router, transaction
+from django.db.models import Model, Q, QuerySet
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+# local
+from training.models import Job
+from training.serializers import JobSerializer
+from . import bulk, cascade
+
+__all__ = [
+    'INLINE_LIMIT',
+    'JOB_SOFT_DELETE',
+    'JOB_UPDATE',
+    'accepted',
+    'claim',
+    'enqueue',
+    'run',
+    'run_next',
+]
+
+# The most records an operation can change before it is run in the background
+INLINE_LIMIT = 1000
+STALE_AFTER = timedelta(minutes=30)
+# How often a running Job records that its worker is still alive, which must be well within STALE_AFTER
+HEARTBEAT_INTERVAL = timedelta(minutes=5)
+MAX_ATTEMPTS = 3
+
+JOB_SOFT_DELETE = 'soft_delete'
+JOB_UPDATE = 'update'
+
+logger = logging.getLogger(__name__)
+
+
+def _select(payload: Dict[str, Any]) -> QuerySet:
+    """
+    Select the records a Job changes, scoped to the Member again in case any of them have moved since it was queued
+    """
+    model = apps.get_model(payload['model'])
+    return bulk.select(
+        model.objects.all(),
+        payload['ids'],
+        payload['member_path'],
+        payload['member_id'],
+        # Jobs queued before selections were stored hold only ids
+        payload.get('search', {}),
+        payload.get('exclude', {}),
+    ).filter(**{payload['member_path']: payload['member_id']})
+
+
+def _soft_delete(payload: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Soft delete the selected records, along with every record below them
+    """
+    return cascade.soft_delete(_select(payload))
+
+
+def _update(payload: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Set the same values on every selected record, converting them back from JSON with their Fields
+    """
+    model = apps.get_model(payload['model'])
+    values = {name: model._meta.get_field(name).to_python(value) for name, value in payload['values'].items()}
+    return {model._meta.label: _select(payload).update(**values, updated=timezone.now())}
+
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, int]]] = {
+    JOB_SOFT_DELETE: _soft_delete,
+    JOB_UPDATE: _update,
+}
+
+
+def enqueue(
+    kind: str,
+    model: Type[Model],
+    member_path: str,
+    member_id: int,
+    ids: Optional[List[int]] = None,
+    search: Optional[Dict[str, Any]] = None,
+    exclude: Optional[Dict[str, Any]] = None,
+    values: Optional[Dict[str, Any]] = None,
+) -> Job:
+    """
+    Queue a Job that changes the records selected in the same way as `bulk.select`
+    :param kind: The kind of Job, one of JOB_SOFT_DELETE or JOB_UPDATE
+    :param model: The Model of the records to change
+    :param member_path: The lookup path from the Model to the id of the Member it belongs to
+    :param member_id: The id of the requesting User's Member, which the Job belongs to
+    :param ids: The ids of the records to change, which are bounded by `bulk.MAX_IDS`
+    :param search: The search filters that select the records to change, if no ids are given
+    :param exclude: The exclude filters that select the records to change, if no ids are given
+    :param values: The values to set, for JOB_UPDATE
+    :return: The queued Job
+    """
+    payload = {
+        'exclude': exclude or {},
+        'ids': ids,
+        'member_id': member_id,
+        'member_path': member_path,
+        'model': model._meta.label,
+        'search': search or {},
+        'values': values or {},
+    }
+    return Job.objects.create(kind=kind, member_id=member_id, payload=payload)
+
+
+def accepted(job: Job) -> Response:
+    """
+    Generate the response for a request whose operation has been queued, pointing the User at the Job to poll
+    :param job: The queued Job
+    """
+    data = JobSerializer(instance=job).data
+    return Response({'content': data}, status=status.HTTP_202_ACCEPTED, headers={'Location': data['uri']})
+
+
+def claim() -> Optional[Job]:
+    """
+    Claim the oldest Job that is waiting to be run, skipping any that are locked by other workers.
+    Running Jobs whose worker has not sent a heartbeat for STALE_AFTER are claimed again, unless they have run out of
+    attempts in which case they are failed.
+    :return: The claimed Job, marked as running, or None if there are no Jobs to run
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic(using=router.db_for_write(Job)):
+            job = Job.objects.select_for_update(skip_locked=True).filter(
+                Q(status=Job.QUEUED) | Q(status=Job.RUNNING, updated__lt=now - STALE_AFTER),
+            ).order_by('id').first()
+            if job is None:
+                return None
+            if job.attempts >= MAX_ATTEMPTS:
+                job.status = Job.FAILED
+                job.error = 'The Job was stopped before it finished too many times.'
+                job.finished = now
+                job.save(update_fields=['error', 'finished', 'status', 'updated'])
+                continue
+            job.attempts += 1
+            job.started = now
+            job.status = Job.RUNNING
+            job.save(update_fields=['attempts', 'started', 'status', 'updated'])
+            return job
+
+
+def _owned(job: Job) -> QuerySet:
+    """
+    Select a claimed Job, as long as it has not been claimed again or failed since
+    """
+    return Job.objects.filter(pk=job.pk, attempts=job.attempts, status=Job.RUNNING)
+
+
+def _beat(job: Job) -> bool:
+    """
+    Record that the worker running a Job is still alive, so that it is not claimed again while it runs
+    :param job: The claimed Job
+    :return: True if the worker still owns the Job
+    """
+    return _owned(job).update(updated=timezone.now()) > 0
+
+
+@contextmanager
+def _heartbeat(job: Job):
+    """
+    Send heartbeats for a Job every HEARTBEAT_INTERVAL while the block runs.
+    The heartbeats are sent from a thread with a connection of its own, as the handlers make their changes in
+    transactions that would hide a heartbeat sent from the worker's connection until they are committed. The thread
+    runs in a copy of the worker's context, so it writes to the same shard
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_INTERVAL.total_seconds()) and _beat(job):
+                pass
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(beat,),
+        name=f'training_job_{job.pk}_heartbeat',
+        daemon=True,
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run(job: Job):
+    """
+    Run a claimed Job, recording its result or the reason it failed.
+    The result is not recorded if the Job was claimed again or failed while it ran, so that it never overwrites the
+    outcome of a newer attempt
+    :param job: The Job to run
+    """
+    try:
+        with _heartbeat(job):
+            job.result = HANDLERS[job.kind](job.payload)
+        job.status = Job.SUCCEEDED
+    except Exception as err:
+        logger.exception(f'Job {job.pk} failed')
+        job.error = str(err)
+        job.status = Job.FAILED
+    job.finished = timezone.now()
+    recorded = _owned(job).update(
+        error=job.error,
+        finished=job.finished,
+        result=job.result,
+        status=job.status,
+        updated=job.finished,
+    )
+    if recorded == 0:
+        logger.warning(
+            f'Job {job.pk} was claimed again or failed while attempt {job.attempts} ran, so its result was not kept',
+        )
+
+
+def run_next() -> bool:
+    """
+    Claim and run the oldest Job that is waiting to be run
+    :return: True if a Job was run, or False if there were none waiting
+    """
+    job = claim()
+    if job is None:
+        return False
+    run(job)
+    return True
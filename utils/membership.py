@@ -0,0 +1,135 @@
+"""
+Lookups of Users in the CloudCIX Membership API.
+
+Every Student refers to a User in Membership, which is checked over the network whenever a Student is written. The
+result of each check is cached for the requesting User's Member, so writing the Students of a Class only reads each
+User once. Users that cannot be read are only cached briefly, so a User that is created just after a failed write can
+be used straight away.
+Many Users can be looked up together in one batch, to fill the cache before they are checked one by one. The async
+views look Users up without holding the thread that handles the request, so its worker can serve other requests while
+Membership responds.
+"""
+# stdlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, List
+# libs
+from asgiref.sync import sync_to_async
+from cloudcix.api import Membership
+from rest_framework.request import Request
+# local
+from .cache import TTLCache
+
+__all__ = [
+    'aprefetch_users',
+    'prefetch_users',
+    'user_cache',
+    'user_exists',
+]
+
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL = 300
+USER_CACHE_NEGATIVE_TTL = 10
+# The number of Users to list from Membership in each request of a batch lookup
+USER_LIST_LIMIT = 100
+# Responses that mean the User cannot be read by the Member, rather than that the read failed
+NEGATIVE_STATUSES = (403, 404)
+# The most reads from Membership that the async views of a worker can have in flight at once. The threads only wait on
+# the network, so this can be far more than the threads a worker handles requests with
+MEMBERSHIP_THREADS = 64
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+_executor = ThreadPoolExecutor(MEMBERSHIP_THREADS, thread_name_prefix='training_membership')
+
+
+def user_exists(request: Request, user_id: int, span) -> bool:
+    """
+    Check that the requesting User can read a User from Membership, using the cached result if there is one
+    :param request: The request being handled, whose token is used for the read
+    :param user_id: The id of the User to read
+    :param span: The span to trace the read under, which is tagged with whether the cache was hit
+    :return: True if the User could be read
+    """
+    key = (request.user.member['id'], user_id)
+    exists = user_cache.get(key)
+    span.set_tag('membership_user_cache', 'miss' if exists is None else 'hit')
+    if exists is not None:
+        return exists
+    return _read(request, user_id, span)
+
+
+def _read(request: Request, user_id: int, span) -> bool:
+    """
+    Read a User from Membership and cache the result
+    """
+    key = (request.user.member['id'], user_id)
+    response = Membership.user.read(
+        token=request.auth,
+        pk=user_id,
+        span=span,
+    )
+    exists = response.status_code == 200
+    if exists:
+        user_cache.set(key, True)
+    elif response.status_code in NEGATIVE_STATUSES:
+        user_cache.set(key, False, USER_CACHE_NEGATIVE_TTL)
+    return exists
+
+
+def prefetch_users(request: Request, user_ids: Iterable[int], span):
+    """
+    Look up many Users in Membership at once, listing the ones that are not already cached in pages of
+    USER_LIST_LIMIT, so that the checks by `user_exists` that follow are hits.
+    Only the Users that are found are cached. Any others are left to be read one by one, as a User missing from the
+    list may still be readable, and a failed list only means that every User is read one by one.
+    :param request: The request being handled, whose token is used for the lookup
+    :param user_ids: The ids of the Users to look up
+    :param span: The span to trace the lookup under
+    """
+    member_id = request.user.member['id']
+    missing = [pk for pk in dict.fromkeys(user_ids) if not user_cache.contains((member_id, pk))]
+    span.set_tag('membership_user_prefetch', len(missing))
+    for start in range(0, len(missing), USER_LIST_LIMIT):
+        batch = missing[start:start + USER_LIST_LIMIT]
+        response = Membership.user.list(
+            token=request.auth,
+            params={'search[id__in]': batch, 'limit': len(batch)},
+            span=span,
+        )
+        if response.status_code != 200:
+            continue
+        for user in response.json()['content']:
+            user_cache.set((member_id, user['id']), True)
+
+
+def _valid_ids(user_ids: Iterable[Any]) -> List[int]:
+    """
+    Keep the distinct ids that are positive integers, leaving any others for the Controllers to reject
+    """
+    valid = []
+    for pk in user_ids:
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            continue
+        if pk > 0:
+            valid.append(pk)
+    return list(dict.fromkeys(valid))
+
+
+async def aprefetch_users(request: Request, user_ids: Iterable[Any], span):
+    """
+    Read the Users that are not already cached from Membership concurrently, caching the results as `user_exists`
+    does so that the checks by the Controllers that follow are hits.
+    The Membership client is synchronous, so each read is made in a thread from a pool of MEMBERSHIP_THREADS rather
+    than in the thread that the request's DB queries are made in, and the event loop serves other requests until they
+    finish.
+    :param request: The request being handled, whose token is used for the reads
+    :param user_ids: The ids sent by the User, which have not been validated yet
+    :param span: The span to trace the reads under
+    """
+    member_id = request.user.member['id']
+    missing = [pk for pk in _valid_ids(user_ids) if not user_cache.contains((member_id, pk))]
+    span.set_tag('membership_user_prefetch', len(missing))
+    read = sync_to_async(_read, thread_sensitive=False, executor=_executor)
+    await asyncio.gather(*(read(request, pk, span) for pk in missing))
@@ -0,0 +1,272 @@
+"""
+Keyset (cursor) pagination for the list views.
+
+A cursor is an opaque token that holds the order of the list along with the ordering value and id of the last record
+on a page. The next page is fetched by filtering on those values rather than slicing with an OFFSET, so the DB can
+seek straight to the start of the page using an index and every page costs the same no matter how deep it is.
+"""
+# stdlib
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Type
+# libs
+from django.db.models import Field, Model, Q, QuerySet
+# local
+from .count import COUNT_EXACT, COUNT_NONE, aestimate_count, estimate_count, summary_subquery
+
+__all__ = [
+    'cursor_filter',
+    'encode_cursor',
+    'Page',
+    'aget_page',
+    'get_page',
+    'ordering',
+]
+
+
+def _split(order: str) -> Tuple[str, bool]:
+    """
+    Split an order string into the field name and a flag stating if the order is descending
+    """
+    return order.lstrip('-'), order.startswith('-')
+
+
+def _get_field(model: Type[Model], path: str) -> Field:
+    """
+    Follow a lookup path such as `cls__syllabus__name` from the given model to the Field it refers to
+    """
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _get_value(obj: Any, path: str) -> Any:
+    """
+    Follow a lookup path such as `cls__syllabus__name` from the given object, or row from `QuerySet.values`, to the
+    value it refers to
+    """
+    if isinstance(obj, dict):
+        return obj[path]
+    for attr in path.split('__'):
+        if obj is None:
+            break
+        obj = getattr(obj, attr)
+    return obj
+
+
+def ordering(order: str) -> Tuple[str, ...]:
+    """
+    Generate the order_by arguments for a list, adding the id as a tie breaker so that the order is total and a
+    cursor always points at exactly one position in it
+    :param order: The order requested by the User, as cleaned by a List Controller
+    :return: The arguments to pass to QuerySet.order_by
+    """
+    name, descending = _split(order)
+    if name == 'id':
+        return (order,)
+    return order, '-id' if descending else 'id'
+
+
+def encode_cursor(order: str, obj: Any) -> str:
+    """
+    Generate the cursor that points at the records following the given object in a list
+    :param order: The order of the list
+    :param obj: The last object, or row from `QuerySet.values`, on the current page
+    :return: An opaque, url safe cursor string
+    """
+    name, _ = _split(order)
+    value = _get_value(obj, name)
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    pk = _get_value(obj, 'id')
+    payload = json.dumps([order, value, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def cursor_filter(cursor: str, order: str, model: Type[Model]) -> Q:
+    """
+    Decode a cursor into the filter that selects the records after it in the given order.
+    PostgreSQL places NULLs last in ascending order and first in descending order, which is taken into account for
+    nullable fields.
+    :param cursor: The cursor sent by the User
+    :param order: The order of the list, which must match the order the cursor was generated with
+    :param model: The Model class being listed
+    :return: A Q object that can be applied to the list's QuerySet
+    :raises ValueError: If the cursor is malformed or was generated for a different order
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_order, raw_value, pk = json.loads(payload)
+        pk = int(pk)
+    except (TypeError, ValueError):
+        raise ValueError('cursor is malformed')
+    if cursor_order != order:
+        raise ValueError('cursor was generated for a different order')
+
+    name, descending = _split(order)
+    op = 'lt' if descending else 'gt'
+    if name == 'id':
+        return Q(**{f'id__{op}': pk})
+
+    field = _get_field(model, name)
+    try:
+        value = None if raw_value is None else field.to_python(raw_value)
+    except Exception:
+        raise ValueError('cursor is malformed')
+
+    if value is None:
+        after = Q(**{f'{name}__isnull': True, f'id__{op}': pk})
+        if descending:
+            after |= Q(**{f'{name}__isnull': False})
+        return after
+
+    after = Q(**{f'{name}__{op}': value}) | Q(**{name: value, f'id__{op}': pk})
+    if field.null and not descending:
+        after |= Q(**{f'{name}__isnull': True})
+    return after
+
+
+class Page(NamedTuple):
+    """
+    A single page of a list
+    """
+    # Model instances, or rows from `QuerySet.values` when the page was fetched with columns
+    records: List[Any]
+    # The cursor for the following page, which is None on the last page
+    next_cursor: Optional[str]
+    # The total number of records in the list, which is None when the list was not counted
+    total_records: Optional[int]
+    # The kind of count that total_records holds
+    count: str
+    # The latest of the version timestamps across the whole list, which is only found when the list is counted exactly
+    # and the page is not empty
+    version: Optional[str] = None
+
+
+def _page_query(
+    objs: QuerySet,
+    order: str,
+    limit: int,
+    page: int,
+    after: Optional[Q],
+    count: str,
+    columns: Optional[Sequence[str]],
+    versions: Sequence[str],
+) -> Tuple[QuerySet, int]:
+    """
+    Build the query that fetches a page of a list, along with the offset of its first record in the list
+    """
+    page_objs = objs
+    if count == COUNT_EXACT:
+        page_objs = page_objs.annotate(list_summary=summary_subquery(objs, versions))
+    if columns is not None:
+        # The order value is needed to generate the next cursor
+        extra = [_split(order)[0]]
+        if count == COUNT_EXACT:
+            extra.append('list_summary')
+        page_objs = page_objs.values(*columns, *(column for column in extra if column not in columns))
+    if after is not None:
+        return page_objs.filter(after)[:limit + 1], 0
+    return page_objs[page * limit:(page + 1) * limit + 1], page * limit
+
+
+def _paginate(
+    records: List[Any],
+    order: str,
+    limit: int,
+    page: int,
+    offset: int,
+    after: Optional[Q],
+    count: str,
+) -> Tuple[Page, Optional[str]]:
+    """
+    Build a Page from the records fetched by its query, along with the kind of count that still has to be made to
+    find the total number of records in the list, if any. When a count is still needed, the Page holds the fewest
+    records that the list is known to contain as its total
+    """
+    # The total and the version of the list, as annotated onto every record
+    summary = [None, None]
+    if count == COUNT_EXACT and len(records) > 0:
+        summary = _get_value(records[0], 'list_summary')
+
+    next_cursor = None
+    has_next = len(records) > limit
+    if has_next:
+        records = records[:limit]
+        next_cursor = encode_cursor(order, records[-1])
+
+    total_records = None
+    pending = None
+    if count == COUNT_NONE:
+        pass
+    elif after is None and not has_next and (len(records) > 0 or page == 0):
+        total_records = offset + len(records)
+        count = COUNT_EXACT
+    elif count == COUNT_EXACT and len(records) > 0:
+        total_records = summary[0]
+    else:
+        total_records = offset + len(records) + int(has_next)
+        pending = count
+    return Page(records, next_cursor, total_records, count, summary[1]), pending
+
+
+def get_page(
+    objs: QuerySet,
+    order: str,
+    limit: int,
+    page: int,
+    after: Optional[Q] = None,
+    count: str = COUNT_EXACT,
+    columns: Optional[Sequence[str]] = None,
+    versions: Sequence[str] = (),
+) -> Page:
+    """
+    Fetch a single page of a list, either by cursor or by page number for backwards compatibility, along with the
+    total number of records in the list.
+    An exact total, along with the version of the list, is annotated onto the page so they come back in one statement,
+    and one extra record is requested to find out whether there is a following page. When the last page is fetched by
+    number the total is known without counting at all, in which case it is reported as exact whichever count was
+    requested.
+    :param objs: The filtered and ordered QuerySet for the list
+    :param order: The order of the list
+    :param limit: The number of records per page
+    :param page: The page number, used when no cursor was sent
+    :param after: The filter decoded from the User's cursor, if one was sent
+    :param count: The kind of count to generate for the list, one of COUNT_MODES
+    :param columns: If given, the page is fetched as rows from `QuerySet.values` with these columns instead of as
+                    model instances
+    :param versions: The lookup paths of the timestamps to find the latest of to version the list, e.g. `updated`
+    :return: The requested Page of the list
+    """
+    page_objs, offset = _page_query(objs, order, limit, page, after, count, columns, versions)
+    result, pending = _paginate(list(page_objs), order, limit, page, offset, after, count)
+    if pending == COUNT_EXACT:
+        result = result._replace(total_records=objs.count())
+    elif pending is not None:
+        # The estimate can never be lower than the number of records that are known to exist
+        result = result._replace(total_records=max(estimate_count(objs), result.total_records))
+    return result
+
+
+async def aget_page(
+    objs: QuerySet,
+    order: str,
+    limit: int,
+    page: int,
+    after: Optional[Q] = None,
+    count: str = COUNT_EXACT,
+    columns: Optional[Sequence[str]] = None,
+    versions: Sequence[str] = (),
+) -> Page:
+    """
+    Fetch a single page of a list as `get_page` does, for the async views
+    """
+    page_objs, offset = _page_query(objs, order, limit, page, after, count, columns, versions)
+    result, pending = _paginate([record async for record in page_objs], order, limit, page, offset, after, count)
+    if pending == COUNT_EXACT:
+        result = result._replace(total_records=await objs.acount())
+    elif pending is not None:
+        result = result._replace(total_records=max(await aestimate_count(objs), result.total_records))
+    return result
@@ -0,0 +1,37 @@
+"""
+Metrics for the pools of connections to the training DBs.
+
+When the TRAINING_DB_POOL setting is on, each worker shares a psycopg pool of connections to each DB between its
+threads. A request that finds every connection in use waits for one to be returned, so the time requests spend
+waiting and the share of the pool in use show when the pool is too small for the load.
+"""
+# stdlib
+from typing import Dict, Optional
+# libs
+from django.db import connections
+
+__all__ = [
+    'stats',
+]
+
+
+def stats(alias: str) -> Optional[Dict[str, float]]:
+    """
+    Report the state of the connection pool of a DB, and the waits for connections since it was last reported
+    :param alias: The alias of the DB
+    :return: The utilisation of the pool as the fraction of its maximum size in use, the number of requests waiting
+             for a connection now, and the number of requests that waited and the total milliseconds they waited since
+             the last report. None if the DB is not pooled, or its pool has not been opened yet
+    """
+    # The pools are created by the connections of each thread as they are first used, and kept by the backend class
+    pool = getattr(connections[alias], '_connection_pools', {}).get(alias)
+    if pool is None:
+        return None
+    # pop_stats also resets the counters, so each report only covers the requests since the one before
+    counters = pool.pop_stats()
+    return {
+        'utilisation': (counters['pool_size'] - counters['pool_available']) / counters['pool_max'],
+        'requests_waiting': counters['requests_waiting'],
+        'requests_queued': counters.get('requests_queued', 0),
+        'requests_wait_ms': counters.get('requests_wait_ms', 0),
+    }
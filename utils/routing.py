@@ -0,0 +1,263 @@
+"""
+Routing of the DB queries made while handling a request.
+
+Each request is routed to the shard that holds the requesting User's Member, as chosen by `training.utils.shards`.
+Work that is not handling a request, such as the Job workers, picks its shard with `use`.
+
+Reads from the shared training DB that are made while handling a GET, HEAD or OPTIONS request are spread across the
+replicas listed in the TRAINING_READ_REPLICAS setting, either in turn or to the one that is furthest caught up with
+the primary. Everything else reads from the primary:
+- Requests that write, so that the records they validate against and update are never stale
+- Requests from a User who has written within the last TRAINING_PRIMARY_STICKINESS seconds, so that they always read
+  their own writes. The time of the last write is shared between workers through the Django cache
+- Anything that is not handling a request, such as migrations and the Job workers
+"""
+# stdlib
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+# libs
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+# local
+from . import shards
+
+__all__ = [
+    'afinish',
+    'astart',
+    'db_for_read',
+    'db_for_write',
+    'finish',
+    'primary',
+    'start',
+    'use',
+]
+
+STRATEGY_LEAST_LAG = 'least_lag'
+STRATEGY_ROUND_ROBIN = 'round_robin'
+# How often the lag of each replica is measured by the least_lag strategy, in seconds
+LAG_CHECK_INTERVAL = 1.0
+# The most seconds that measuring the lag of a replica waits to connect to it, and then for it to answer
+LAG_CHECK_TIMEOUT = 1
+# The number of seconds a replica can fall behind the primary before the least_lag strategy stops reading from it
+DEFAULT_MAX_LAG = 5.0
+DEFAULT_STICKINESS = 5.0
+
+# The seconds since the last transaction replayed on a replica, or 0 if it has replayed everything it received
+LAG_SQL = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+@dataclass
+class State:
+    """
+    The routing state of the request being handled
+    """
+    # The alias of the shard that holds the records of the request's Member
+    primary: str
+    # The cache key that records when the requesting User last wrote, or None if reads are not being spread
+    key: Optional[str]
+    # Whether every read must go to the primary
+    pinned: bool
+    # Whether the request has written to the primary
+    wrote: bool = False
+
+
+# None when not handling a request, in which case everything goes to the primary of the shared DB
+_state: ContextVar[Optional[State]] = ContextVar('training_replica_state', default=None)
+
+_lock = threading.Lock()
+_cycle: Optional[Tuple[Tuple[str, ...], Iterator[str]]] = None
+_lags: Dict[str, Optional[float]] = {}
+_lags_checked = 0.0
+# Whether a thread is measuring the lags of the replicas
+_measuring = False
+
+
+def _replicas() -> Tuple[str, ...]:
+    return tuple(getattr(settings, 'TRAINING_READ_REPLICAS', ()))
+
+
+def _next_in_turn(replicas: Tuple[str, ...]) -> str:
+    """
+    Choose the replicas in turn, restarting the cycle if the replicas have been reconfigured
+    """
+    global _cycle
+    with _lock:
+        if _cycle is None or _cycle[0] != replicas:
+            _cycle = (replicas, itertools.cycle(replicas))
+        return next(_cycle[1])
+
+
+def _measure(alias: str) -> Optional[float]:
+    """
+    Measure the lag of a replica in seconds, or None if it cannot be reached in time.
+    The lag is read over a connection of its own with short connect and statement timeouts, so a replica that is down
+    or overloaded holds up the measurement for at most LAG_CHECK_TIMEOUT and never touches the requests' connections
+    """
+    connection = connections[alias]
+    params = connection.get_connection_params()
+    params['connect_timeout'] = LAG_CHECK_TIMEOUT
+    params['options'] = f'{params.get("options", "")} -c statement_timeout={LAG_CHECK_TIMEOUT * 1000}'.strip()
+    try:
+        probe = connection.Database.connect(**params)
+    except connection.Database.Error:
+        return None
+    try:
+        with probe.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+    except connection.Database.Error:
+        return None
+    finally:
+        probe.close()
+
+
+def _least_lagged(replicas: Tuple[str, ...]) -> str:
+    """
+    Choose the replica that is furthest caught up with the primary, measuring them at most once every
+    LAG_CHECK_INTERVAL. The primary is chosen if every replica is down or too far behind.
+    The replicas are measured by one thread at a time without holding the lock, while the other threads keep choosing
+    from the last measurements, or the primary until the first ones are in
+    """
+    global _lags, _lags_checked, _measuring
+    now = time.monotonic()
+    with _lock:
+        due = now - _lags_checked >= LAG_CHECK_INTERVAL or set(_lags) != set(replicas)
+        measure = due and not _measuring
+        if measure:
+            _measuring = True
+        lags = _lags
+    if measure:
+        try:
+            lags = {alias: _measure(alias) for alias in replicas}
+        finally:
+            with _lock:
+                _lags, _lags_checked, _measuring = lags, time.monotonic(), False
+    max_lag = getattr(settings, 'TRAINING_REPLICA_MAX_LAG', DEFAULT_MAX_LAG)
+    healthy = [(lag, alias) for alias, lag in lags.items() if lag is not None and lag <= max_lag]
+    if len(healthy) == 0:
+        return shards.DEFAULT
+    return min(healthy)[1]
+
+
+def _key(request: Request, primary: str) -> Optional[str]:
+    """
+    The cache key that records when the requesting User last wrote, or None if the request's reads are not spread
+    """
+    # Only the shared DB has replicas
+    if primary != shards.DEFAULT or len(_replicas()) == 0:
+        return None
+    return f'training_primary_{request.user.member["id"]}_{request.user.id}'
+
+
+def start(request: Request) -> Token:
+    """
+    Set up the routing for a request, once the requesting User has been authenticated
+    :param request: The request being handled
+    :return: The token to pass to `finish` once the request has been handled
+    """
+    primary = shards.for_member(request.user.member['id'])
+    key = _key(request, primary)
+    pinned = key is None or request.method not in SAFE_METHODS or cache.get(key) is not None
+    return _state.set(State(primary, key, pinned))
+
+
+async def astart(request: Request) -> Token:
+    """
+    Set up the routing for a request as `start` does, for the async views
+    """
+    primary = shards.for_member(request.user.member['id'])
+    key = _key(request, primary)
+    pinned = key is None or request.method not in SAFE_METHODS or await cache.aget(key) is not None
+    return _state.set(State(primary, key, pinned))
+
+
+def _stickiness() -> float:
+    return getattr(settings, 'TRAINING_PRIMARY_STICKINESS', DEFAULT_STICKINESS)
+
+
+def finish(token: Token):
+    """
+    Keep the requesting User's reads on the primary for TRAINING_PRIMARY_STICKINESS seconds if the request wrote, and
+    restore the routing that was in place before the request
+    :param token: The token returned by `start`
+    """
+    state = _state.get()
+    try:
+        if state is not None and state.wrote and state.key is not None:
+            cache.set(state.key, True, _stickiness())
+    finally:
+        _state.reset(token)
+
+
+async def afinish(token: Token):
+    """
+    Finish the routing for a request as `finish` does, for the async views
+    """
+    state = _state.get()
+    try:
+        if state is not None and state.wrote and state.key is not None:
+            await cache.aset(state.key, True, _stickiness())
+    finally:
+        _state.reset(token)
+
+
+def primary() -> str:
+    """
+    :return: The alias of the primary of the shard that the request being handled is routed to
+    """
+    state = _state.get()
+    return shards.DEFAULT if state is None else state.primary
+
+
+@contextmanager
+def use(alias: str):
+    """
+    Route every query made within the block to the primary of the given shard, for work that is not handling a request
+    :param alias: The alias of the shard
+    """
+    token = _state.set(State(alias, None, True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def db_for_write() -> str:
+    """
+    Choose the DB to write to for the request being handled, recording that it has written
+    :return: The alias of the primary of the request's shard
+    """
+    state = _state.get()
+    if state is None:
+        return shards.DEFAULT
+    state.wrote = True
+    return state.primary
+
+
+def db_for_read() -> str:
+    """
+    Choose the DB to read from for the request being handled
+    :return: The alias of a replica, or of the primary
+    """
+    state = _state.get()
+    if state is None:
+        return shards.DEFAULT
+    if state.pinned or state.wrote:
+        return state.primary
+    replicas = _replicas()
+    if len(replicas) == 0:
+        return state.primary
+    if getattr(settings, 'TRAINING_REPLICA_STRATEGY', STRATEGY_ROUND_ROBIN) == STRATEGY_LEAST_LAG:
+        return _least_lagged(replicas)
+    return _next_in_turn(replicas)
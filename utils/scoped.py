@@ -0,0 +1,86 @@
+"""
+Lookups of single records that are scoped to the requesting User's Member.
+
+A resource view fetches its record with the Member filter in the same query, along with everything it needs to check
+permissions and serialize the record, so reading a record from the Member costs one query and a record from another
+Member is never loaded. Only when no record is found in the Member is a second query made, which reads nothing but the
+Member that the record belongs to, so that it can still be reported as forbidden rather than as missing.
+Records that are found are added to the request's identity map, so the Controllers reuse them and their related
+records.
+"""
+# stdlib
+from typing import Optional, Type
+# libs
+from django.db.models import Model, QuerySet
+# local
+from training.serializers.base import Fields, RowSerializer
+from . import identity
+
+__all__ = [
+    'aget',
+    'get',
+    'sparse',
+]
+
+
+def _stand_in(objs: QuerySet, pk: int, member_id: Optional[int]) -> Model:
+    """
+    Stand in for a record outside the requesting User's Member, with only the fields that Permissions check
+    """
+    if member_id is None:
+        raise objs.model.DoesNotExist
+    return objs.model(pk=pk, member_id=member_id)
+
+
+def sparse(objs: QuerySet, serializer: Type[RowSerializer], fields: Fields) -> QuerySet:
+    """
+    Limit the records to the columns and nested records of a sparse fieldset, along with the ones needed to check
+    permissions and version the record
+    :param objs: The records to fetch from
+    :param serializer: The serializer of the record
+    :param fields: The sparse fieldset that the record is serialized with
+    """
+    objs = objs.select_related(None)
+    relations = serializer.relations(fields=fields)
+    # select_related() with no lookups would follow every relation instead of none
+    if len(relations) > 0:
+        objs = objs.select_related(*relations)
+    return objs.only(
+        *serializer.columns(fields=fields),
+        *serializer.version_columns(fields=fields),
+        'member_id',
+    )
+
+
+def get(objs: QuerySet, pk: int, member_id: int) -> Model:
+    """
+    Fetch a record by id from the requesting User's Member
+    :param objs: The records to fetch from, with the columns, related records and annotations that the view needs
+    :param pk: The id of the record
+    :param member_id: The id of the requesting User's Member
+    :return: The record, or if it belongs to another Member, an unsaved instance with only its id and member_id, for
+             the Permissions of the view to reject
+    :raises DoesNotExist: If there is no record with the id in any Member
+    """
+    try:
+        obj = objs.get(pk=pk, member_id=member_id)
+    except objs.model.DoesNotExist:
+        pass
+    else:
+        identity.add(obj)
+        return obj
+    return _stand_in(objs, pk, objs.model.objects.filter(pk=pk).values_list('member_id', flat=True).first())
+
+
+async def aget(objs: QuerySet, pk: int, member_id: int) -> Model:
+    """
+    Fetch a record by id from the requesting User's Member, as `get` does, for the async views
+    """
+    try:
+        obj = await objs.aget(pk=pk, member_id=member_id)
+    except objs.model.DoesNotExist:
+        pass
+    else:
+        identity.add(obj)
+        return obj
+    return _stand_in(objs, pk, await objs.model.objects.filter(pk=pk).values_list('member_id', flat=True).afirst())
@@ -0,0 +1,37 @@
+"""
+Sharding of the training DB by Member.
+
+Every Member's records live in a single DB. Members are placed in a shard by the TRAINING_SHARD_MAP setting, which maps
+the id of a Member to one of the DB aliases listed in TRAINING_SHARDS, and every other Member stays in the shared
+training DB. Moving a Member to its own shard changes nothing about the API, as each request is routed to the shard of
+the requesting User's Member.
+"""
+# stdlib
+from typing import Tuple
+# libs
+from django.conf import settings
+
+__all__ = [
+    'DEFAULT',
+    'aliases',
+    'for_member',
+]
+
+# The shared DB, which holds every Member that has not been moved to a shard of its own
+DEFAULT = 'training'
+
+
+def aliases() -> Tuple[str, ...]:
+    """
+    List every DB that holds training records, starting with the shared DB
+    """
+    return (DEFAULT, *(alias for alias in getattr(settings, 'TRAINING_SHARDS', ()) if alias != DEFAULT))
+
+
+def for_member(member_id: int) -> str:
+    """
+    Find the DB that holds the records of a Member
+    :param member_id: The id of the Member
+    :return: The alias of the Member's shard, or of the shared DB
+    """
+    return getattr(settings, 'TRAINING_SHARD_MAP', {}).get(member_id, DEFAULT)
@@ -0,0 +1,50 @@
+"""
+Generation of the absolute URLs for records.
+
+Running `reverse` for every record on a list page is expensive, as it resolves the URL pattern each time. Instead each
+pattern is reversed once into a template, and then only the pk is filled in for each record.
+"""
+# stdlib
+from functools import lru_cache
+from typing import Any, Callable, Tuple
+# libs
+from django.urls import get_script_prefix, reverse
+
+__all__ = [
+    'resource_uri',
+    'resource_uri_builder',
+]
+
+# A pk that is only used to find where the pk goes in a reversed URL
+PK_PLACEHOLDER = 918273645546372819
+
+
+@lru_cache(maxsize=None)
+def _template(name: str, prefix: str) -> Tuple[str, str]:
+    """
+    Reverse a URL pattern that takes a pk into the parts of the URL that come before and after the pk.
+    The script prefix is part of the cache key as it is used by `reverse`.
+    """
+    head, tail = reverse(name, kwargs={'pk': PK_PLACEHOLDER}).split(str(PK_PLACEHOLDER))
+    return head, tail
+
+
+def resource_uri_builder(name: str) -> Callable[[Any], str]:
+    """
+    Generate a function that builds the absolute URL of a record from its pk, for use when building many URLs at once
+    :param name: The name of the resource URL pattern, e.g. `cls_resource`
+    :return: A function that takes a pk and returns the same URL that `reverse(name, kwargs={'pk': pk})` would
+    """
+    head, tail = _template(name, get_script_prefix())
+    return lambda pk: f'{head}{pk}{tail}'
+
+
+def resource_uri(name: str, pk: int) -> str:
+    """
+    Generate the absolute URL of the record with the given pk
+    :param name: The name of the resource URL pattern, e.g. `cls_resource`
+    :param pk: The pk of the record
+    :return: The same URL that `reverse(name, kwargs={'pk': pk})` would generate
+    """
+    head, tail = _template(name, get_script_prefix())
+    return f'{head}{pk}{tail}'
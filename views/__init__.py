@@ -1,17 +1,49 @@
-from .cls import ClsCollection, ClsResource
-from .syllabus import SyllabusCollection, SyllabusResource
-from .student import StudentCollection, StudentResource
+from .cls import AsyncClsCollection, AsyncClsResource, ClsBulk, ClsCollection, ClsExport, ClsResource
+from .job import JobResource
+from .search import Search
+from .syllabus import (
+    AsyncSyllabusCollection,
+    AsyncSyllabusResource,
+    SyllabusCollection,
+    SyllabusExport,
+    SyllabusResource,
+)
+from .student import (
+    AsyncStudentCollection,
+    AsyncStudentResource,
+    StudentBulk,
+    StudentCollection,
+    StudentExport,
+    StudentResource,
+)
 
 __all__ = [
     # Class
+    'AsyncClsCollection',
+    'AsyncClsResource',
+    'ClsBulk',
     'ClsCollection',
+    'ClsExport',
     'ClsResource',
 
+    # Job
+    'JobResource',
+
+    # Search
+    'Search',
+
     # Student
+    'AsyncStudentCollection',
+    'AsyncStudentResource',
+    'StudentBulk',
     'StudentCollection',
+    'StudentExport',
     'StudentResource',
 
     # Syllabus
+    'AsyncSyllabusCollection',
+    'AsyncSyllabusResource',
     'SyllabusCollection',
+    'SyllabusExport',
     'SyllabusResource',
 ]
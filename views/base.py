@@ -0,0 +1,281 @@
+# stdlib
+from contextvars import Token
+from dataclasses import dataclass
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Coroutine, Dict, Optional, Type, Union
+# libs
+from asgiref.sync import sync_to_async
+from cloudcix_rest.exceptions import Http400
+from cloudcix_rest.views import APIView
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+# local
+from training.controllers.base import ListControllerBase
+from training.serializers.base import LAYOUT_NORMALIZED, Fields, Included, RowSerializer
+from training.utils import etag, identity, membership, pagination, pool, routing
+
+__all__ = [
+    'AsyncTrainingAPIView',
+    'ListMixin',
+    'TrainingAPIView',
+    'sync_handler',
+]
+
+
+class TrainingAPIView(APIView):
+    """
+    Extends the CloudCIX APIView to route the DB queries of each request, once the requesting User is known, and to
+    give each request its own identity map of the records it loads
+    """
+
+    # The tokens that restore the DB routing and identity map from before the request, once it has been handled
+    routing_token: Optional[Token] = None
+    identity_token: Optional[Token] = None
+
+    def initial(self, request: Request, *args, **kwargs):
+        """
+        Set up the DB routing and identity map for the request after it has been authenticated
+        """
+        super().initial(request, *args, **kwargs)
+        self.routing_token = routing.start(request)
+        self.identity_token = identity.start()
+
+    def finalize_response(self, request: Request, response: Response, *args, **kwargs) -> Response:
+        """
+        Tag the request's span with the state of the primary DB's connection pool and of the Membership User cache,
+        then finish the DB routing, which keeps the requesting User reading from the primary DB for a while if the
+        request wrote to it, and drop the identity map
+        """
+        span = getattr(request, 'span', None)
+        try:
+            if span is not None:
+                for name, value in (pool.stats(routing.primary()) or {}).items():
+                    span.set_tag(f'db_pool_{name}', value)
+                for name, value in membership.user_cache.stats().items():
+                    span.set_tag(f'membership_user_cache_{name}', value)
+        finally:
+            if self.identity_token is not None:
+                identity.finish(self.identity_token)
+                self.identity_token = None
+            if self.routing_token is not None:
+                routing.finish(self.routing_token)
+                self.routing_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class AsyncTrainingAPIView(TrainingAPIView):
+    """
+    A TrainingAPIView whose handlers are coroutines, for serving under ASGI.
+    The request is authenticated and checked exactly as it is by the sync views, in the thread that the request's DB
+    queries are made in, so the handlers only need to await the DB and remote services. The DB routing and identity
+    map are set up and finished in the request's own context rather than in those threads, which each run in a copy
+    of it, so that they are restored by the same context that set them
+    """
+
+    def initial(self, request: Request, *args, **kwargs):
+        """
+        Authenticate and check the request, leaving the DB routing and identity map to `dispatch`
+        """
+        super(TrainingAPIView, self).initial(request, *args, **kwargs)
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> Response:
+        """
+        Handle a request as `APIView.dispatch` does, awaiting the handler for its method
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        routing_token = identity_token = None
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            routing_token = await routing.astart(request)
+            identity_token = identity.start()
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                # OPTIONS, and methods that are not allowed, are handled by the sync handlers of the APIView
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        try:
+            self.response = await sync_to_async(self.finalize_response)(request, response, *args, **kwargs)
+        finally:
+            if identity_token is not None:
+                identity.finish(identity_token)
+            if routing_token is not None:
+                await routing.afinish(routing_token)
+        return self.response
+
+
+def sync_handler(handler: Callable[..., Response]) -> Callable[..., Coroutine[Any, Any, Response]]:
+    """
+    Serve a handler of a sync view from its async variant, for handlers that would gain nothing from awaiting the DB
+    themselves. The handler runs in the thread that the request's DB queries are made in, with the request's DB
+    routing and identity map, and keeps its docstring for the API docs
+    :param handler: The handler of the sync view, e.g. `ClsResource.get`
+    :return: The handler for the async view
+    """
+    @wraps(handler)
+    async def handle(self, request: Request, *args, **kwargs) -> Response:
+        return await sync_to_async(handler)(self, request, *args, **kwargs)
+
+    return handle
+
+
+@dataclass
+class ListQuery:
+    """
+    A list requested by a User, once their parameters have been validated
+    """
+    controller: ListControllerBase
+    fields: Fields
+    objs: QuerySet
+    order: str
+    # The filter decoded from the User's cursor, if one was sent
+    after: Optional[Q]
+
+    def page_args(self, serializer: Type[RowSerializer]) -> Dict[str, Any]:
+        """
+        :return: The arguments to fetch the requested page with, from `pagination.get_page` or `aget_page`
+        """
+        return {
+            'after': self.after,
+            'columns': serializer.columns(fields=self.fields),
+            'count': self.controller.cleaned_data['count'],
+            'limit': self.controller.cleaned_data['limit'],
+            'objs': self.objs,
+            'order': self.order,
+            'page': self.controller.cleaned_data['page'],
+            'versions': serializer.version_columns(fields=self.fields),
+        }
+
+
+class ListMixin:
+    """
+    Lists the records of a Model in the requesting User's Member for a Collection view, with the same parameters,
+    pagination, entity tags and layouts for every Model. The sync views call `list` and the async views call `alist`,
+    which only differ in how they wait for the DB
+    """
+    list_controller: Type[ListControllerBase]
+    list_model: Type[Model]
+    list_serializer: Type[RowSerializer]
+    # The prefix of the error codes of the list, e.g. `training_student_list`
+    list_error_code: str
+
+    def _list_query(self, request: Request) -> Union[ListQuery, Response]:
+        """
+        Validate the User's parameters and build the filtered and ordered QuerySet for the list
+        :return: The validated list, or the response for invalid parameters
+        """
+        tracer = settings.TRACER
+        serializer = self.list_serializer
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = self.list_controller(data=request.GET, request=request, span=span)
+            controller.is_valid()
+            if 'count' not in controller.cleaned_data:
+                return Http400(error_code=f'{self.list_error_code}_003')
+            if 'layout' not in controller.cleaned_data:
+                return Http400(error_code=f'{self.list_error_code}_006')
+            try:
+                fields = serializer.parse_fields(controller.cleaned_data['fields'])
+            except ValueError:
+                return Http400(error_code=f'{self.list_error_code}_004')
+            try:
+                fields = serializer.select(fields, serializer.parse_expand(controller.cleaned_data['expand']))
+            except ValueError:
+                return Http400(error_code=f'{self.list_error_code}_005')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            order = controller.cleaned_data['order']
+            try:
+                objs = self.list_model.objects.filter(
+                    member_id=request.user.member['id'],
+                    **controller.cleaned_data['search'],
+                ).exclude(
+                    **controller.cleaned_data['exclude'],
+                ).order_by(
+                    *pagination.ordering(order),
+                )
+            except (ValueError, ValidationError):
+                return Http400(error_code=f'{self.list_error_code}_001')
+
+            cursor = controller.cleaned_data['cursor']
+            try:
+                after = pagination.cursor_filter(cursor, order, self.list_model) if cursor is not None else None
+            except ValueError:
+                return Http400(error_code=f'{self.list_error_code}_002')
+
+        return ListQuery(controller, fields, objs, order, after)
+
+    def _list_response(self, request: Request, query: ListQuery, result: pagination.Page) -> Response:
+        """
+        Generate the response for a fetched page of the list
+        """
+        tracer = settings.TRACER
+        controller = query.controller
+        metadata = {
+            'count': result.count,
+            'cursor': controller.cleaned_data['cursor'],
+            'limit': controller.cleaned_data['limit'],
+            'next_cursor': result.next_cursor,
+            'order': query.order,
+            'page': controller.cleaned_data['page'],
+            'total_records': result.total_records,
+            'warnings': controller.warnings,
+        }
+
+        # Clients polling the list are only sent it again once a record in it has been added, changed or removed
+        tag = etag.for_page(request, result)
+        if etag.if_none_match(request, tag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': tag})
+        headers = None if tag is None else {'ETag': tag}
+
+        with tracer.start_span('serializing_data', child_of=request.span) as span:
+            span.set_tag('num_objects', len(result.records))
+            # Normalized lists side-load their related records into a separate map
+            included: Optional[Included] = None
+            if controller.cleaned_data['layout'] == LAYOUT_NORMALIZED:
+                included = {}
+            data = self.list_serializer.serialize(result.records, query.fields, included)
+
+        if included is not None:
+            return Response({'content': data, 'included': included, '_metadata': metadata}, headers=headers)
+        return Response({'content': data, '_metadata': metadata}, headers=headers)
+
+    def list(self, request: Request) -> Response:
+        """
+        List the records, handling pagination, seeking past the cursor if one was sent, and counting the list as
+        requested
+        """
+        query = self._list_query(request)
+        if not isinstance(query, ListQuery):
+            return query
+        with settings.TRACER.start_span('generating_metadata', child_of=request.span):
+            result = pagination.get_page(**query.page_args(self.list_serializer))
+        return self._list_response(request, query, result)
+
+    async def alist(self, request: Request) -> Response:
+        """
+        List the records as `list` does, awaiting the DB. The page is fetched as rows, so serializing it never loads
+        anything from the DB
+        """
+        query = self._list_query(request)
+        if not isinstance(query, ListQuery):
+            return query
+        with settings.TRACER.start_span('generating_metadata', child_of=request.span):
+            result = await pagination.aget_page(**query.page_args(self.list_serializer))
+        return self._list_response(request, query, result)
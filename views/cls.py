@@ -3,85 +3,243 @@ Management of Classes
 """
 # libs
 from cloudcix_rest.exceptions import Http400, Http404
-from cloudcix_rest.views import APIView
-from datetime import datetime
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 # local
 from training.controllers import (
+    ClsBulkUpdateController,
     ClsCreateController,
     ClsListController,
     ClsUpdateController,
 )
-from training.models import Cls
+from training.models import Cls, Student
 from training.permissions.cls import Permissions
-from training.serializers import ClsSerializer
+from training.serializers import ClsRowSerializer, ClsSerializer
+from training.utils import bulk, cascade, etag, export, jobs, pagination, scoped
+from .base import AsyncTrainingAPIView, ListMixin, sync_handler, TrainingAPIView
 
 __all__ = [
+    'AsyncClsCollection',
+    'AsyncClsResource',
+    'ClsBulk',
     'ClsCollection',
+    'ClsExport',
     'ClsResource',
 ]
 
 
-class ClsCollection(APIView):
+class ClsBulk(TrainingAPIView):
     """
-    Handles methods regarding Class records that don't require an id to be specified
+    Handles methods regarding many Class records at once, i.e. bulk update, delete
     """
-    def get(self, request: Request) -> Response:
+    def patch(self, request: Request) -> Response:
         """
-        summary: Retrieve a list of Class records
+        summary: Update many Class records
 
         description: |
-            Retrieve a list of Class records for the requesting User's Member.
+            Update every selected Class record in the requesting User's Member with the sent 'finish_date' and
+            'trainer'. Classes are selected either by the comma separated 'ids' parameter, returning a 404 if any of
+            them do not exist, or by the same search and exclude parameters as the list. The permissions for every
+            selected Class are checked in one query, and they are all updated in a single statement. If more than
+            1000 Classes are selected, they are updated in the background and a 202 is returned with a Job that can
+            be polled until they have been updated.
 
         responses:
             200:
-                description: A list of Class records are produced.
+                description: The selected Class records were updated successfully
+            202:
+                description: The selected Class records will be updated by the returned Job
             400: {}
+            403: {}
+            404: {}
         """
         tracer = settings.TRACER
+        member_id = request.user.member['id']
 
         with tracer.start_span('validating_controller', child_of=request.span) as span:
-            controller = ClsListController(data=request.GET, request=request, span=span)
-            controller.is_valid()
+            selection = ClsListController(data=request.GET, request=request, span=span)
+            selection.is_valid()
+            try:
+                ids = bulk.parse_ids(request.GET.get('ids'))
+            except ValueError:
+                return Http400(error_code='training_cls_bulk_update_002')
+            if ids is None and len(selection.cleaned_data['search']) == 0:
+                return Http400(error_code='training_cls_bulk_update_003')
+            controller = ClsBulkUpdateController(data=request.data, request=request, span=span, partial=True)
+            if not controller.is_valid():
+                return Http400(errors=controller.errors)
+            if len(controller.cleaned_data) == 0:
+                return Http400(error_code='training_cls_bulk_update_005')
 
         with tracer.start_span('get_objects', child_of=request.span):
             try:
-                objs = Cls.objects.filter(
-                    syllabus__member_id=request.user.member['id'],
-                    **controller.cleaned_data['search'],
-                ).exclude(
-                    **controller.cleaned_data['exclude'],
-                ).order_by(
-                    controller.cleaned_data['order'],
+                objs = bulk.select(
+                    Cls.objects.all(),
+                    ids,
+                    'member_id',
+                    member_id,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                )
+                # A finish_date cannot be before the start_date of any of the selected Classes
+                conditions = {}
+                if controller.cleaned_data.get('finish_date') is not None:
+                    conditions['early'] = Q(start_date__gt=controller.cleaned_data['finish_date'])
+                summary = bulk.summarise(objs, 'member_id', member_id, **conditions)
+            except (ValueError, ValidationError):
+                return Http400(error_code='training_cls_bulk_update_004')
+            if ids is not None and summary['found'] < len(ids):
+                return Http404(error_code='training_cls_bulk_update_001')
+            if summary.get('early', 0) > 0:
+                return Http400(error_code='training_cls_bulk_update_104')
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.bulk_update(request, summary)
+            if err is not None:
+                return err
+
+        with tracer.start_span('saving_objects', child_of=request.span):
+            # The Member is checked again by the UPDATE itself, in case any of the selected Classes have since moved
+            objs = objs.filter(member_id=member_id)
+            # Updates that are too big to make while the request waits are made in the background
+            if summary['found'] > jobs.INLINE_LIMIT:
+                return jobs.accepted(jobs.enqueue(
+                    jobs.JOB_UPDATE,
+                    Cls,
+                    'member_id',
+                    member_id,
+                    ids,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                    controller.cleaned_data,
+                ))
+            total_records = objs.update(**controller.cleaned_data, updated=timezone.now())
+
+        return Response({'_metadata': {'total_records': total_records}}, status=status.HTTP_200_OK)
+
+    def delete(self, request: Request) -> Response:
+        """
+        summary: Delete many Class records
+
+        description: |
+            Delete every selected Class record in the requesting User's Member.
+            Classes are selected either by the comma separated 'ids' parameter, returning a 404 if any of them do
+            not exist, or by the same search and exclude parameters as the list. The permissions for every selected
+            Class are checked in one query, and they are all deleted in a single statement. If more than 1000
+            Classes are selected, they are deleted in the background and a 202 is returned with a Job that can be
+            polled until they have been deleted.
+            A 403 is returned if any of them have Students in them.
+
+        responses:
+            200:
+                description: The selected Class records were deleted successfully
+            202:
+                description: The selected Class records will be deleted by the returned Job
+            400: {}
+            403: {}
+            404: {}
+        """
+        tracer = settings.TRACER
+        member_id = request.user.member['id']
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            selection = ClsListController(data=request.GET, request=request, span=span)
+            selection.is_valid()
+            try:
+                ids = bulk.parse_ids(request.GET.get('ids'))
+            except ValueError:
+                return Http400(error_code='training_cls_bulk_delete_002')
+            if ids is None and len(selection.cleaned_data['search']) == 0:
+                return Http400(error_code='training_cls_bulk_delete_003')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            try:
+                objs = bulk.select(
+                    Cls.objects.all(),
+                    ids,
+                    'member_id',
+                    member_id,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                )
+                summary = bulk.summarise(
+                    objs,
+                    'member_id',
+                    member_id,
+                    with_students=Exists(Student.objects.filter(cls=OuterRef('pk'))),
                 )
             except (ValueError, ValidationError):
-                return Http400(error_code='training_cls_list_001')
-
-        with tracer.start_span('generating_metadata', child_of=request.span):
-            limit = controller.cleaned_data['limit']
-            order = controller.cleaned_data['order']
-            page = controller.cleaned_data['page']
-            total_records = objs.count()
-            warnings = controller.warnings
-            metadata = {
-                'limit': limit,
-                'order': order,
-                'page': page,
-                'total_records': total_records,
-                'warnings': warnings,
-            }
-            # Handle pagination
-            objs = objs[page * limit:(page + 1) * limit]
-
-        with tracer.start_span('serializing_data', child_of=request.span) as span:
-            span.set_tag('num_objects', objs.count())
-            data = ClsSerializer(instance=objs, many=True).data
-
-        return Response({'content': data, '_metadata': metadata})
+                return Http400(error_code='training_cls_bulk_delete_004')
+            if ids is not None and summary['found'] < len(ids):
+                return Http404(error_code='training_cls_bulk_delete_001')
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.bulk_delete(request, summary)
+            if err is not None:
+                return err
+
+        with tracer.start_span('saving_objects', child_of=request.span):
+            # The Member is checked again by the UPDATE itself, in case any of the selected Classes have since moved
+            objs = objs.filter(member_id=member_id)
+            # Deletes that are too big to make while the request waits are made in the background
+            if summary['found'] > jobs.INLINE_LIMIT:
+                return jobs.accepted(jobs.enqueue(
+                    jobs.JOB_SOFT_DELETE,
+                    Cls,
+                    'member_id',
+                    member_id,
+                    ids,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                ))
+            deleted = cascade.soft_delete(objs)
+            total_records = deleted[Cls._meta.label]
+
+        return Response({'_metadata': {'total_records': total_records}}, status=status.HTTP_200_OK)
+
+
+class ClsCollection(ListMixin, TrainingAPIView):
+    """
+    Handles methods regarding Class records that don't require an id to be specified
+    """
+    list_controller = ClsListController
+    list_error_code = 'training_cls_list'
+    list_model = Cls
+    list_serializer = ClsRowSerializer
+
+    def get(self, request: Request) -> Response:
+        """
+        summary: Retrieve a list of Class records
+
+        description: |
+            Retrieve a list of Class records for the requesting User's Member.
+            Pages can be requested by number with 'page', or walked in constant time by sending the 'next_cursor'
+            from the '_metadata' of the previous page as the 'cursor' parameter.
+            The 'count' parameter chooses how 'total_records' is generated; 'exact' (the default), 'estimated' from
+            the DB statistics, or 'none' to skip counting. The '_metadata' reports the kind of count returned.
+            The 'fields' parameter limits each record to the given comma separated keys, e.g. 'id,syllabus.name'.
+            Nested records are expanded by default. When the 'expand' parameter is sent, only the nested records
+            it lists, e.g. 'syllabus', are expanded and every other nested record is replaced by its id.
+            With 'layout' set to 'normalized', nested records are replaced by their id and each distinct one is
+            serialized once in the 'included' map of the response, keyed by type and id.
+            Lists counted exactly are sent with an 'ETag' header. Sending it back in 'If-None-Match' returns a 304
+            with no body until a record in the list has been added, changed or removed.
+
+        responses:
+            200:
+                description: A list of Class records are produced.
+            304:
+                description: The list has not changed since the ETag sent in 'If-None-Match'
+            400: {}
+        """
+        return self.list(request)
 
     def post(self, request: Request) -> Response:
         """
@@ -117,7 +275,59 @@ class ClsCollection(APIView):
         return Response({'content': data}, status=status.HTTP_201_CREATED)
 
 
-class ClsResource(APIView):
+class ClsExport(TrainingAPIView):
+    """
+    Handles streaming every Class record in a list, for exports that are too big to page through
+    """
+    def get(self, request: Request) -> StreamingHttpResponse:
+        """
+        summary: Export a list of Class records
+
+        description: |
+            Stream every Class record for the requesting User's Member that matches the sent search, exclude and
+            order parameters, without pagination. Records are sent as newline delimited JSON by default, or as CSV
+            when the 'output' parameter is set to 'csv'. The 'fields' and 'expand' parameters can be used in the same
+            way as for the list.
+
+        responses:
+            200:
+                description: The Class records are streamed
+            400: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = ClsListController(data=request.GET, request=request, span=span)
+            controller.is_valid()
+            output = request.GET.get('output') or export.EXPORT_NDJSON
+            if output not in export.EXPORT_OUTPUTS:
+                return Http400(error_code='training_cls_export_002')
+            try:
+                fields = ClsRowSerializer.select(
+                    ClsRowSerializer.parse_fields(controller.cleaned_data['fields']),
+                    ClsRowSerializer.parse_expand(controller.cleaned_data['expand']),
+                )
+            except ValueError:
+                return Http400(error_code='training_cls_export_003')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            try:
+                objs = Cls.objects.filter(
+                    member_id=request.user.member['id'],
+                    **controller.cleaned_data['search'],
+                ).exclude(
+                    **controller.cleaned_data['exclude'],
+                ).order_by(
+                    *pagination.ordering(controller.cleaned_data['order']),
+                )
+            except (ValueError, ValidationError):
+                return Http400(error_code='training_cls_export_001')
+
+        # The records are fetched and serialized as the response is streamed
+        return export.stream(objs, ClsRowSerializer, fields, output, 'classes')
+
+
+class ClsResource(TrainingAPIView):
     """
     Handles methods regarding Class records that do require an id to be specified, i.e. read, update, delete
     """
@@ -128,6 +338,11 @@ class ClsResource(APIView):
         description: |
             Attempt to read a Class record in the requesting User's Member by the given 'pk', returning a 404 if
             it does not exist
+            The 'fields' parameter limits the record to the given comma separated keys, e.g. 'id,syllabus.name'.
+            Nested records are expanded by default. When the 'expand' parameter is sent, only the nested records
+            it lists, e.g. 'syllabus', are expanded and every other nested record is replaced by its id.
+            The record is sent with an 'ETag' header. Sending it back in 'If-None-Match' returns a 304 with no body
+            until the record has changed.
 
         path_params:
             pk:
@@ -137,6 +352,9 @@ class ClsResource(APIView):
         responses:
             200:
                 description: Class record was read successfully
+            304:
+                description: Class record has not changed since the ETag sent in 'If-None-Match'
+            400: {}
             403: {}
             404: {}
         """
@@ -144,7 +362,22 @@ class ClsResource(APIView):
 
         with tracer.start_span('retrieving_cls_object', child_of=request.span):
             try:
-                obj = Cls.objects.get(pk=pk)
+                fields = ClsRowSerializer.parse_fields(request.GET.get('fields'))
+            except ValueError:
+                return Http400(error_code='training_cls_read_002')
+            try:
+                fields = ClsRowSerializer.select(
+                    fields,
+                    ClsRowSerializer.parse_expand(request.GET.get('expand')),
+                )
+            except ValueError:
+                return Http400(error_code='training_cls_read_003')
+            objs = Cls.objects.all()
+            if fields is not None:
+                # Only load the requested columns and nested records
+                objs = scoped.sparse(objs, ClsRowSerializer, fields)
+            try:
+                obj = scoped.get(objs, pk, request.user.member['id'])
             except Cls.DoesNotExist:
                 return Http404(error_code='training_cls_read_001')
 
@@ -153,10 +386,18 @@ class ClsResource(APIView):
             if err is not None:
                 return err
 
+        # Clients polling the record are only sent it again once it has changed
+        tag = etag.for_record(request, obj, ClsRowSerializer, fields)
+        if etag.if_none_match(request, tag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': tag})
+
         with tracer.start_span('serializing_data', child_of=request.span):
-            data = ClsSerializer(instance=obj).data
+            if fields is None:
+                data = ClsSerializer(instance=obj).data
+            else:
+                data = ClsRowSerializer.serialize_instance(obj, fields)
 
-        return Response({'content': data}, status=status.HTTP_200_OK)
+        return Response({'content': data}, status=status.HTTP_200_OK, headers={'ETag': tag})
 
     def put(self, request: Request, pk: int, partial: bool = False) -> Response:
         """
@@ -165,6 +406,8 @@ class ClsResource(APIView):
         description: |
             Attempt to update a Class record in the requesting User's Member by the given 'pk', returning a 404 if
             it does not exist
+            Sending the 'ETag' of the record in 'If-Match' makes the update conditional, returning a 412 if the
+            record has changed since.
 
         path_params:
             pk:
@@ -177,12 +420,14 @@ class ClsResource(APIView):
             400: {}
             403: {}
             404: {}
+            412:
+                description: Class record has changed since the ETag sent in 'If-Match'
         """
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_cls_object', child_of=request.span):
             try:
-                obj = Cls.objects.get(pk=pk)
+                obj = scoped.get(Cls.objects.all(), pk, request.user.member['id'])
             except Cls.DoesNotExist:
                 return Http404(error_code='training_cls_update_001')
 
@@ -191,6 +436,12 @@ class ClsResource(APIView):
             if err is not None:
                 return err
 
+        # Only update the record if it has not changed since the client last read it, when they ask for that
+        tag = etag.for_record(None, obj, ClsRowSerializer)
+        if not etag.if_match(request, tag):
+            return Response(status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': tag})
+
+        member_id = obj.member_id
         with tracer.start_span('validating_controller', child_of=request.span) as span:
             controller = ClsUpdateController(
                 data=request.data,
@@ -203,12 +454,20 @@ class ClsResource(APIView):
                 return Http400(errors=controller.errors)
 
         with tracer.start_span('saving_object', child_of=request.span):
-            controller.instance.save()
+            with transaction.atomic(using=router.db_for_write(Cls)):
+                controller.instance.save()
+                # The Students of a Class that moves to a Syllabus in another Member move to that Member with it,
+                # including any that have been deleted
+                if controller.instance.member_id != member_id:
+                    Student._base_manager.filter(cls=controller.instance).update(
+                        member_id=controller.instance.member_id,
+                    )
 
         with tracer.start_span('serializing_data', child_of=request.span):
             data = ClsSerializer(instance=controller.instance).data
 
-        return Response({'content': data}, status=status.HTTP_200_OK)
+        tag = etag.for_record(None, controller.instance, ClsRowSerializer)
+        return Response({'content': data}, status=status.HTTP_200_OK, headers={'ETag': tag})
 
     def patch(self, request: Request, pk: int) -> Response:
         """
@@ -238,8 +497,10 @@ class ClsResource(APIView):
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_cls_object', child_of=request.span):
+            # Whether the Class has Students is fetched with it, for the permission check
+            objs = Cls.objects.annotate(has_students=Exists(Student.objects.filter(cls=OuterRef('pk'))))
             try:
-                obj = Cls.objects.get(pk=pk)
+                obj = scoped.get(objs, pk, request.user.member['id'])
             except Cls.DoesNotExist:
                 return Http404(error_code='training_cls_delete_001')
 
@@ -249,7 +510,34 @@ class ClsResource(APIView):
                 return err
 
         with tracer.start_span('saving_object', child_of=request.span):
-            obj.deleted = datetime.now()
-            obj.save()
+            cascade.soft_delete(Cls.objects.filter(pk=obj.pk))
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncClsCollection(AsyncTrainingAPIView, ClsCollection):
+    """
+    The async variant of ClsCollection, served under ASGI
+    """
+    async def get(self, request: Request) -> Response:
+        """
+        Retrieve a list of Class records, as `ClsCollection.get` does
+        """
+        return await self.alist(request)
+
+    post = sync_handler(ClsCollection.post)
+
+
+class AsyncClsResource(AsyncTrainingAPIView, ClsResource):
+    """
+    The async variant of ClsResource, served under ASGI
+    """
+    get = sync_handler(ClsResource.get)
+    put = sync_handler(ClsResource.put)
+    delete = sync_handler(ClsResource.delete)
+
+    async def patch(self, request: Request, pk: int) -> Response:
+        """
+        Attempt to partially update Class record
+        """
+        return await self.put(request, pk, True)
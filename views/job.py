@@ -0,0 +1,62 @@
+"""
+Polling of background Jobs
+"""
+# libs
+from cloudcix_rest.exceptions import Http404
+from django.conf import settings
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+# local
+from training.models import Job
+from training.permissions.job import Permissions
+from training.serializers import JobSerializer
+from .base import TrainingAPIView
+
+__all__ = [
+    'JobResource',
+]
+
+
+class JobResource(TrainingAPIView):
+    """
+    Handles methods regarding Job records that do require an id to be specified, i.e. read
+    """
+    def get(self, request: Request, pk: int) -> Response:
+        """
+        summary: Read the status of a specified Job record
+
+        description: |
+            Attempt to read a Job record in the requesting User's Member by the given 'pk', returning a 404 if it does
+            not exist in the Member. Requests that are too big to handle while waiting return a 202 with a Job, which
+            can be polled with this method until its 'status' is 'succeeded' or 'failed'.
+
+        path_params:
+            pk:
+                description: The id of the Job record to be read
+                type: integer
+
+        responses:
+            200:
+                description: Job record was read successfully
+            403: {}
+            404: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('retrieving_job_object', child_of=request.span):
+            try:
+                # Jobs in other Members are reported as missing rather than forbidden
+                obj = Job.objects.get(pk=pk, member_id=request.user.member['id'])
+            except Job.DoesNotExist:
+                return Http404(error_code='training_job_read_001')
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.read(request, obj)
+            if err is not None:
+                return err
+
+        with tracer.start_span('serializing_data', child_of=request.span):
+            data = JobSerializer(instance=obj).data
+
+        return Response({'content': data}, status=status.HTTP_200_OK)
@@ -0,0 +1,106 @@
+"""
+Full text search of the records in a Member
+"""
+# libs
+from cloudcix_rest.exceptions import Http400
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import CharField, F, Value
+from rest_framework.request import Request
+from rest_framework.response import Response
+# local
+from training.controllers import SearchListController
+from training.models import Student, Syllabus
+from training.serializers import StudentSerializer, SyllabusSerializer
+from .base import TrainingAPIView
+
+__all__ = [
+    'Search',
+]
+
+# The Model and Serializer for each type of record that can be searched
+SEARCHABLE = {
+    'student': (Student, StudentSerializer),
+    'syllabus': (Syllabus, SyllabusSerializer),
+}
+
+
+class Search(TrainingAPIView):
+    """
+    Handles methods regarding searching the records in a Member
+    """
+
+    def get(self, request: Request) -> Response:
+        """
+        summary: Search the Syllabus and Student records
+
+        description: |
+            Search the name and description of every Syllabus and the notes of every Student in the requesting User's
+            Member for the words in 'query', which supports quoted phrases, 'or' and '-' to exclude a word.
+            Results are ranked by how well they match, best first, with matches in the name of a Syllabus ranking
+            higher than matches in its description. Each result reports the 'type' of record it is, its 'rank' and
+            the 'record' itself. The 'types' parameter limits the search to a comma separated list of types.
+
+        responses:
+            200:
+                description: A page of the records that match the query
+            400: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = SearchListController(data=request.GET, request=request, span=span)
+            controller.is_valid()
+            if 'query' not in controller.cleaned_data:
+                return Http400(error_code='training_search_list_001')
+            if 'types' not in controller.cleaned_data:
+                return Http400(error_code='training_search_list_002')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            query = SearchQuery(controller.cleaned_data['query'], config='english', search_type='websearch')
+            # The matches of each type are found with their GIN index, scoped to the Member as Permissions.read is
+            matches = [
+                SEARCHABLE[name][0].objects.filter(
+                    member_id=request.user.member['id'],
+                    search=query,
+                ).annotate(
+                    type=Value(name, output_field=CharField()),
+                    rank=SearchRank(F('search'), query),
+                ).values('id', 'type', 'rank')
+                for name in controller.cleaned_data['types']
+            ]
+            results = matches[0].union(*matches[1:], all=True).order_by('-rank', 'type', 'id')
+
+        with tracer.start_span('generating_metadata', child_of=request.span):
+            limit = controller.cleaned_data['limit']
+            page = controller.cleaned_data['page']
+            results = list(results[page * limit:(page + 1) * limit])
+            metadata = {
+                'limit': limit,
+                'page': page,
+                'query': controller.cleaned_data['query'],
+                'total_records': sum(objs.count() for objs in matches),
+                'types': list(controller.cleaned_data['types']),
+                'warnings': controller.warnings,
+            }
+
+        with tracer.start_span('serializing_data', child_of=request.span) as span:
+            span.set_tag('num_objects', len(results))
+            # The records on the page are loaded with one query for each type
+            records = {
+                name: SEARCHABLE[name][0].objects.in_bulk(
+                    [result['id'] for result in results if result['type'] == name],
+                )
+                for name in controller.cleaned_data['types']
+            }
+            data = [
+                {
+                    'rank': result['rank'],
+                    'record': SEARCHABLE[result['type']][1](instance=records[result['type']][result['id']]).data,
+                    'type': result['type'],
+                }
+                for result in results
+                # Records deleted since the page was fetched are left out
+                if result['id'] in records[result['type']]
+            ]
+        return Response({'content': data, '_metadata': metadata})
@@ -1,86 +1,82 @@
 """
 Management of Students
 """
+# stdlib
+from typing import Dict, Optional
 # libs
+from asgiref.sync import sync_to_async
 from cloudcix_rest.exceptions import Http400, Http404
-from cloudcix_rest.views import APIView
-from datetime import datetime
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 # local
 from training.controllers import (
+    StudentBulkCreateController,
+    StudentBulkItemController,
+    StudentBulkUpdateController,
     StudentCreateController,
     StudentListController,
     StudentUpdateController,
 )
-from training.models import Student
+from training.models import Cls, Student
 from training.permissions.student import Permissions
-from training.serializers import StudentSerializer
+from training.serializers import StudentRowSerializer, StudentSerializer
+from training.utils import bulk, etag, export, jobs, membership, pagination, scoped
+from .base import AsyncTrainingAPIView, ListMixin, sync_handler, TrainingAPIView
 
 __all__ = [
+    'AsyncStudentCollection',
+    'AsyncStudentResource',
+    'StudentBulk',
     'StudentCollection',
+    'StudentExport',
     'StudentResource',
 ]
 
+# The number of rows written by each statement of a bulk write
+BULK_BATCH_SIZE = 500
 
-class StudentCollection(APIView):
+
+class StudentCollection(ListMixin, TrainingAPIView):
     """
     Handles methods regarding Student records that do not require an id to be specified, i.e. list, create
     """
+    list_controller = StudentListController
+    list_error_code = 'training_student_list'
+    list_model = Student
+    list_serializer = StudentRowSerializer
+
     def get(self, request: Request) -> Response:
         """
         summary: Retrieve a list of Student records
 
         description: |
             Retrieve a list of the Syllabus records for the requesting User's Member.
+            Pages can be requested by number with 'page', or walked in constant time by sending the 'next_cursor'
+            from the '_metadata' of the previous page as the 'cursor' parameter.
+            The 'count' parameter chooses how 'total_records' is generated; 'exact' (the default), 'estimated' from
+            the DB statistics, or 'none' to skip counting. The '_metadata' reports the kind of count returned.
+            The 'fields' parameter limits each record to the given comma separated keys, e.g. 'id,cls.trainer'.
+            Nested records are expanded by default. When the 'expand' parameter is sent, only the nested records
+            it lists, e.g. 'cls,cls.syllabus', are expanded and every other nested record is replaced by its id.
+            With 'layout' set to 'normalized', nested records are replaced by their id and each distinct one is
+            serialized once in the 'included' map of the response, keyed by type and id.
+            Lists counted exactly are sent with an 'ETag' header. Sending it back in 'If-None-Match' returns a 304
+            with no body until a record in the list has been added, changed or removed.
 
         responses:
             200:
                 description: A list of the department records, filtered and ordered by the User
+            304:
+                description: The list has not changed since the ETag sent in 'If-None-Match'
             400: {}
         """
-        tracer = settings.TRACER
-
-        with tracer.start_span('validating_controller', child_of=request.span) as span:
-            controller = StudentListController(data=request.GET, request=request, span=span)
-            controller.is_valid()
-
-        with tracer.start_span('get_objects', child_of=request.span):
-            try:
-                objs = Student.objects.filter(
-                    cls__syllabus__member_id=request.user.member['id'],
-                    **controller.cleaned_data['search'],
-                ).exclude(
-                    **controller.cleaned_data['exclude'],
-                ).order_by(
-                    controller.cleaned_data['order'],
-                )
-            except (ValueError, ValidationError):
-                return Http400(error_code='training_student_list_001')
-
-        with tracer.start_span('generating_metadata', child_of=request.span):
-            limit = controller.cleaned_data['limit']
-            order = controller.cleaned_data['order']
-            page = controller.cleaned_data['page']
-            total_records = objs.count()
-            warnings = controller.warnings
-            metadata = {
-                'limit': limit,
-                'order': order,
-                'page': page,
-                'total_records': total_records,
-                'warnings': warnings,
-            }
-            objs = objs[page * limit:(page + 1) * limit]
-
-        with tracer.start_span('serializing_data', child_of=request.span) as span:
-            span.set_tag('num_objects', objs.count())
-            data = StudentSerializer(instance=objs, many=True).data
-
-        return Response({'content': data, '_metadata': metadata})
+        return self.list(request)
 
     def post(self, request: Request) -> Response:
         """
@@ -103,7 +99,7 @@ class StudentCollection(APIView):
                 return Http400(errors=controller.errors)
 
         with tracer.start_span('checking_permissions', child_of=request.span):
-            err = Permissions.create(request, controller.instance.cls.syllabus)
+            err = Permissions.create(request, controller.instance.cls)
             if err is not None:
                 return err
 
@@ -116,7 +112,303 @@ class StudentCollection(APIView):
         return Response({'content': data}, status=status.HTTP_201_CREATED)
 
 
-class StudentResource(APIView):
+class StudentBulk(TrainingAPIView):
+    """
+    Handles methods regarding many Student records at once, i.e. bulk create, update, delete
+    """
+    def post(self, request: Request) -> Response:
+        """
+        summary: Create many Student records in a Class
+
+        description: |
+            Create a Student record in a Class in the requesting User's Member for each of the sent 'students', which
+            each take the same 'user_id' and 'notes' as a single create.
+            The Class and the permissions to it are checked once, and the Users are looked up in Membership together.
+            If any of the Students are invalid nothing is created, and the errors are reported by the position of the
+            Student in the list, e.g. 'students[3].user_id'.
+            A User that is already a Student in the Class is not created again, but has its notes updated if they
+            were sent, so a request can be safely repeated.
+
+        responses:
+            201:
+                description: The Student records were created or updated successfully
+            400: {}
+            403: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = StudentBulkCreateController(data=request.data, request=request, span=span)
+            if not controller.is_valid():
+                return Http400(errors=controller.errors)
+            cls = controller.cleaned_data['cls']
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.create(request, cls)
+            if err is not None:
+                return err
+
+        with tracer.start_span('validating_students', child_of=request.span) as span:
+            students = controller.cleaned_data['students']
+            span.set_tag('num_objects', len(students))
+            # Look up every User together so that the check for each Student is a cache hit
+            membership.prefetch_users(
+                request,
+                (student.get('user_id') for student in students if isinstance(student.get('user_id'), int)),
+                span,
+            )
+            errors = {}
+            # The notes to set for each User, which are None if they were not sent. A User sent more than once is
+            # only created once
+            notes: Dict[int, Optional[str]] = {}
+            for index, student in enumerate(students):
+                item = StudentBulkItemController(data=student, request=request, span=span)
+                if not item.is_valid():
+                    errors.update({f'students[{index}].{key}': error for key, error in item.errors.items()})
+                    continue
+                user_id = item.cleaned_data['user_id']
+                notes[user_id] = item.cleaned_data['notes'] if 'notes' in student else notes.get(user_id)
+            if len(errors) > 0:
+                return Http400(errors=errors)
+
+        with tracer.start_span('saving_objects', child_of=request.span):
+            with transaction.atomic(using=router.db_for_write(Student)):
+                # Lock the Class so that concurrent requests cannot create the same Student twice
+                list(Cls.objects.select_for_update(of=('self',)).filter(pk=cls.pk).values_list('pk', flat=True))
+                existing = {obj.user_id: obj for obj in Student.objects.filter(cls=cls, user_id__in=notes)}
+                created = [
+                    Student(cls=cls, member_id=cls.member_id, notes=user_notes or '', user_id=user_id)
+                    for user_id, user_notes in notes.items()
+                    if user_id not in existing
+                ]
+                updated = []
+                now = timezone.now()
+                for user_id, obj in existing.items():
+                    if notes[user_id] is not None and notes[user_id] != obj.notes:
+                        obj.notes = notes[user_id]
+                        obj.updated = now
+                        updated.append(obj)
+                Student.objects.bulk_create(created, batch_size=BULK_BATCH_SIZE)
+                Student.objects.bulk_update(updated, ['notes', 'updated'], batch_size=BULK_BATCH_SIZE)
+
+        with tracer.start_span('serializing_data', child_of=request.span):
+            objs = created + [existing[user_id] for user_id in notes if user_id in existing]
+            data = StudentSerializer(instance=objs, many=True).data
+            metadata = {
+                'created': len(created),
+                'total_records': len(objs),
+                'updated': len(updated),
+            }
+
+        return Response({'content': data, '_metadata': metadata}, status=status.HTTP_201_CREATED)
+
+    def patch(self, request: Request) -> Response:
+        """
+        summary: Update many Student records
+
+        description: |
+            Update every selected Student record in the requesting User's Member with the sent 'notes'.
+            Students are selected either by the comma separated 'ids' parameter, returning a 404 if any of them do
+            not exist, or by the same search and exclude parameters as the list. The permissions for every selected
+            Student are checked in one query, and they are all updated in a single statement. If more than 1000
+            Students are selected, they are updated in the background and a 202 is returned with a Job that can be
+            polled until they have been updated.
+
+        responses:
+            200:
+                description: The selected Student records were updated successfully
+            202:
+                description: The selected Student records will be updated by the returned Job
+            400: {}
+            403: {}
+            404: {}
+        """
+        tracer = settings.TRACER
+        member_id = request.user.member['id']
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            selection = StudentListController(data=request.GET, request=request, span=span)
+            selection.is_valid()
+            try:
+                ids = bulk.parse_ids(request.GET.get('ids'))
+            except ValueError:
+                return Http400(error_code='training_student_bulk_update_002')
+            if ids is None and len(selection.cleaned_data['search']) == 0:
+                return Http400(error_code='training_student_bulk_update_003')
+            controller = StudentBulkUpdateController(data=request.data, request=request, span=span, partial=True)
+            if not controller.is_valid():
+                return Http400(errors=controller.errors)
+            if len(controller.cleaned_data) == 0:
+                return Http400(error_code='training_student_bulk_update_005')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            try:
+                objs = bulk.select(
+                    Student.objects.all(),
+                    ids,
+                    'member_id',
+                    member_id,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                )
+                summary = bulk.summarise(objs, 'member_id', member_id)
+            except (ValueError, ValidationError):
+                return Http400(error_code='training_student_bulk_update_004')
+            if ids is not None and summary['found'] < len(ids):
+                return Http404(error_code='training_student_bulk_update_001')
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.bulk_update(request, summary)
+            if err is not None:
+                return err
+
+        with tracer.start_span('saving_objects', child_of=request.span):
+            # The Member is checked again by the UPDATE itself, in case any of the selected Students have since moved
+            objs = objs.filter(member_id=member_id)
+            # Updates that are too big to make while the request waits are made in the background
+            if summary['found'] > jobs.INLINE_LIMIT:
+                return jobs.accepted(jobs.enqueue(
+                    jobs.JOB_UPDATE,
+                    Student,
+                    'member_id',
+                    member_id,
+                    ids,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                    controller.cleaned_data,
+                ))
+            total_records = objs.update(**controller.cleaned_data, updated=timezone.now())
+
+        return Response({'_metadata': {'total_records': total_records}}, status=status.HTTP_200_OK)
+
+    def delete(self, request: Request) -> Response:
+        """
+        summary: Delete many Student records
+
+        description: |
+            Delete every selected Student record in the requesting User's Member.
+            Students are selected either by the comma separated 'ids' parameter, returning a 404 if any of them do
+            not exist, or by the same search and exclude parameters as the list. The permissions for every selected
+            Student are checked in one query, and they are all deleted in a single statement. If more than 1000
+            Students are selected, they are deleted in the background and a 202 is returned with a Job that can be
+            polled until they have been deleted.
+
+        responses:
+            200:
+                description: The selected Student records were deleted successfully
+            202:
+                description: The selected Student records will be deleted by the returned Job
+            400: {}
+            403: {}
+            404: {}
+        """
+        tracer = settings.TRACER
+        member_id = request.user.member['id']
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            selection = StudentListController(data=request.GET, request=request, span=span)
+            selection.is_valid()
+            try:
+                ids = bulk.parse_ids(request.GET.get('ids'))
+            except ValueError:
+                return Http400(error_code='training_student_bulk_delete_002')
+            if ids is None and len(selection.cleaned_data['search']) == 0:
+                return Http400(error_code='training_student_bulk_delete_003')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            try:
+                objs = bulk.select(
+                    Student.objects.all(),
+                    ids,
+                    'member_id',
+                    member_id,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                )
+                summary = bulk.summarise(objs, 'member_id', member_id)
+            except (ValueError, ValidationError):
+                return Http400(error_code='training_student_bulk_delete_004')
+            if ids is not None and summary['found'] < len(ids):
+                return Http404(error_code='training_student_bulk_delete_001')
+
+        with tracer.start_span('checking_permissions', child_of=request.span):
+            err = Permissions.bulk_delete(request, summary)
+            if err is not None:
+                return err
+
+        with tracer.start_span('saving_objects', child_of=request.span):
+            # The Member is checked again by the UPDATE itself, in case any of the selected Students have since moved
+            objs = objs.filter(member_id=member_id)
+            # Deletes that are too big to make while the request waits are made in the background
+            if summary['found'] > jobs.INLINE_LIMIT:
+                return jobs.accepted(jobs.enqueue(
+                    jobs.JOB_SOFT_DELETE,
+                    Student,
+                    'member_id',
+                    member_id,
+                    ids,
+                    selection.cleaned_data['search'],
+                    selection.cleaned_data['exclude'],
+                ))
+            now = timezone.now()
+            total_records = objs.update(deleted=now, updated=now)
+
+        return Response({'_metadata': {'total_records': total_records}}, status=status.HTTP_200_OK)
+
+
+class StudentExport(TrainingAPIView):
+    """
+    Handles streaming every Student record in a list, for exports that are too big to page through
+    """
+    def get(self, request: Request) -> StreamingHttpResponse:
+        """
+        summary: Export a list of Student records
+
+        description: |
+            Stream every Student record for the requesting User's Member that matches the sent search, exclude and
+            order parameters, without pagination. Records are sent as newline delimited JSON by default, or as CSV
+            when the 'output' parameter is set to 'csv'. The 'fields' and 'expand' parameters can be used in the same
+            way as for the list.
+
+        responses:
+            200:
+                description: The Student records are streamed
+            400: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = StudentListController(data=request.GET, request=request, span=span)
+            controller.is_valid()
+            output = request.GET.get('output') or export.EXPORT_NDJSON
+            if output not in export.EXPORT_OUTPUTS:
+                return Http400(error_code='training_student_export_002')
+            try:
+                fields = StudentRowSerializer.select(
+                    StudentRowSerializer.parse_fields(controller.cleaned_data['fields']),
+                    StudentRowSerializer.parse_expand(controller.cleaned_data['expand']),
+                )
+            except ValueError:
+                return Http400(error_code='training_student_export_003')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            try:
+                objs = Student.objects.filter(
+                    member_id=request.user.member['id'],
+                    **controller.cleaned_data['search'],
+                ).exclude(
+                    **controller.cleaned_data['exclude'],
+                ).order_by(
+                    *pagination.ordering(controller.cleaned_data['order']),
+                )
+            except (ValueError, ValidationError):
+                return Http400(error_code='training_student_export_001')
+
+        # The records are fetched and serialized as the response is streamed
+        return export.stream(objs, StudentRowSerializer, fields, output, 'students')
+
+
+class StudentResource(TrainingAPIView):
     """
     Handles methods regarding Student records that do require an id to be specified, i.e. read, update, delete
     """
@@ -127,6 +419,11 @@ class StudentResource(APIView):
         description: |
             Attempt to read a Student record in the requesting User's Member by the given 'pk', returning a 404 if
             it does not exist
+            The 'fields' parameter limits the record to the given comma separated keys, e.g. 'id,cls.trainer'.
+            Nested records are expanded by default. When the 'expand' parameter is sent, only the nested records
+            it lists, e.g. 'cls,cls.syllabus', are expanded and every other nested record is replaced by its id.
+            The record is sent with an 'ETag' header. Sending it back in 'If-None-Match' returns a 304 with no body
+            until the record has changed.
 
         path_params:
             pk:
@@ -136,6 +433,9 @@ class StudentResource(APIView):
         responses:
             200:
                 description: Student record was read successfully
+            304:
+                description: Student record has not changed since the ETag sent in 'If-None-Match'
+            400: {}
             403: {}
             404: {}
         """
@@ -143,7 +443,22 @@ class StudentResource(APIView):
 
         with tracer.start_span('retrieving_student_object', child_of=request.span):
             try:
-                obj = Student.objects.get(pk=pk)
+                fields = StudentRowSerializer.parse_fields(request.GET.get('fields'))
+            except ValueError:
+                return Http400(error_code='training_student_read_002')
+            try:
+                fields = StudentRowSerializer.select(
+                    fields,
+                    StudentRowSerializer.parse_expand(request.GET.get('expand')),
+                )
+            except ValueError:
+                return Http400(error_code='training_student_read_003')
+            objs = Student.objects.all()
+            if fields is not None:
+                # Only load the requested columns and nested records
+                objs = scoped.sparse(objs, StudentRowSerializer, fields)
+            try:
+                obj = scoped.get(objs, pk, request.user.member['id'])
             except Student.DoesNotExist:
                 return Http404(error_code='training_student_read_001')
 
@@ -152,10 +467,18 @@ class StudentResource(APIView):
             if err is not None:
                 return err
 
+        # Clients polling the record are only sent it again once it has changed
+        tag = etag.for_record(request, obj, StudentRowSerializer, fields)
+        if etag.if_none_match(request, tag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': tag})
+
         with tracer.start_span('serializing_data', child_of=request.span):
-            data = StudentSerializer(instance=obj).data
+            if fields is None:
+                data = StudentSerializer(instance=obj).data
+            else:
+                data = StudentRowSerializer.serialize_instance(obj, fields)
 
-        return Response({'content': data}, status=status.HTTP_200_OK)
+        return Response({'content': data}, status=status.HTTP_200_OK, headers={'ETag': tag})
 
     def put(self, request: Request, pk: int, partial: bool = False) -> Response:
         """
@@ -164,6 +487,8 @@ class StudentResource(APIView):
         description:
             Attempt to update a Student record in the requesting User's Member by the given 'pk'. returning a 404 if
             it does not exist
+            Sending the 'ETag' of the record in 'If-Match' makes the update conditional, returning a 412 if the
+            record has changed since.
 
         path_params:
             pk:
@@ -176,13 +501,15 @@ class StudentResource(APIView):
             400: {}
             403: {}
             404: {}
+            412:
+                description: Student record has changed since the ETag sent in 'If-Match'
         """
 
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_student_object', child_of=request.span):
             try:
-                obj = Student.objects.get(pk=pk)
+                obj = scoped.get(Student.objects.all(), pk, request.user.member['id'])
             except Student.DoesNotExist:
                 return Http404(error_code='training_student_update_001')
 
@@ -191,6 +518,11 @@ class StudentResource(APIView):
             if err is not None:
                 return err
 
+        # Only update the record if it has not changed since the client last read it, when they ask for that
+        tag = etag.for_record(None, obj, StudentRowSerializer)
+        if not etag.if_match(request, tag):
+            return Response(status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': tag})
+
         with tracer.start_span('validating_controller', child_of=request.span) as span:
             controller = StudentUpdateController(
                 data=request.data,
@@ -208,7 +540,8 @@ class StudentResource(APIView):
         with tracer.start_span('serializing_data', child_of=request.span):
             data = StudentSerializer(instance=controller.instance).data
 
-        return Response({'content': data}, status=status.HTTP_200_OK)
+        tag = etag.for_record(None, controller.instance, StudentRowSerializer)
+        return Response({'content': data}, status=status.HTTP_200_OK, headers={'ETag': tag})
 
     def patch(self, request: Request, pk: int) -> Response:
         """
@@ -239,7 +572,7 @@ class StudentResource(APIView):
 
         with tracer.start_span('retrieving_student_object', child_of=request.span):
             try:
-                obj = Student.objects.get(pk=pk)
+                obj = scoped.get(Student.objects.all(), pk, request.user.member['id'])
             except Student.DoesNotExist:
                 return Http404(error_code='training_student_delete_001')
 
@@ -249,7 +582,54 @@ class StudentResource(APIView):
                 return err
 
         with tracer.start_span('saving_object', child_of=request.span):
-            obj.deleted = datetime.now()
+            obj.deleted = timezone.now()
             obj.save()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncStudentCollection(AsyncTrainingAPIView, StudentCollection):
+    """
+    The async variant of StudentCollection, served under ASGI. A create waits for Membership to check the Student's
+    User without holding a thread
+    """
+    async def get(self, request: Request) -> Response:
+        """
+        Retrieve a list of Student records, as `StudentCollection.get` does
+        """
+        return await self.alist(request)
+
+    async def post(self, request: Request) -> Response:
+        """
+        Create a new Student record, as `StudentCollection.post` does.
+        The User is looked up first so that the Controller's check is a cache hit
+        """
+        with settings.TRACER.start_span('prefetching_users', child_of=request.span) as span:
+            await membership.aprefetch_users(request, [request.data.get('user_id')], span)
+        return await sync_to_async(StudentCollection.post)(self, request)
+
+
+class AsyncStudentResource(AsyncTrainingAPIView, StudentResource):
+    """
+    The async variant of StudentResource, served under ASGI. An update waits for Membership to check a changed User
+    without holding a thread
+    """
+    get = sync_handler(StudentResource.get)
+    delete = sync_handler(StudentResource.delete)
+
+    async def put(self, request: Request, pk: int, partial: bool = False) -> Response:
+        """
+        Update the details of a specified Student record, as `StudentResource.put` does.
+        A User that is sent is looked up first so that the Controller's check is a cache hit if the User is changed
+        """
+        user_id = request.data.get('user_id')
+        if user_id is not None:
+            with settings.TRACER.start_span('prefetching_users', child_of=request.span) as span:
+                await membership.aprefetch_users(request, [user_id], span)
+        return await sync_to_async(StudentResource.put)(self, request, pk, partial)
+
+    async def patch(self, request: Request, pk: int) -> Response:
+        """
+        Partially update a Student record
+        """
+        return await self.put(request, pk, True)
@@ -3,9 +3,10 @@ Management of Syllabuses
 """
 # libs
 from cloudcix_rest.exceptions import Http400, Http404
-from cloudcix_rest.views import APIView
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -15,20 +16,29 @@ from training.controllers import (
     SyllabusListController,
     SyllabusUpdateController,
 )
-from training.models import Syllabus
+from training.models import Student, Syllabus
 from training.permissions.syllabus import Permissions
-from training.serializers import SyllabusSerializer
+from training.serializers import SyllabusRowSerializer, SyllabusSerializer
+from training.utils import cascade, etag, export, jobs, pagination, scoped
+from .base import AsyncTrainingAPIView, ListMixin, sync_handler, TrainingAPIView
 
 __all__ = [
+    'AsyncSyllabusCollection',
+    'AsyncSyllabusResource',
     'SyllabusCollection',
+    'SyllabusExport',
     'SyllabusResource',
 ]
 
 
-class SyllabusCollection(APIView):
+class SyllabusCollection(ListMixin, TrainingAPIView):
     """
     Handles methods regarding Syllabus records that don't require an id to be specified
     """
+    list_controller = SyllabusListController
+    list_error_code = 'training_syllabus_list'
+    list_model = Syllabus
+    list_serializer = SyllabusRowSerializer
 
     def get(self, request: Request) -> Response:
         """
@@ -36,53 +46,22 @@ class SyllabusCollection(APIView):
 
         description: |
             Retrieve a list of Syllabus records for the requesting User's Member.
+            Pages can be requested by number with 'page', or walked in constant time by sending the 'next_cursor'
+            from the '_metadata' of the previous page as the 'cursor' parameter.
+            The 'count' parameter chooses how 'total_records' is generated; 'exact' (the default), 'estimated' from
+            the DB statistics, or 'none' to skip counting. The '_metadata' reports the kind of count returned.
+            The 'fields' parameter limits each record to the given comma separated keys, e.g. 'id,name'.
+            Lists counted exactly are sent with an 'ETag' header. Sending it back in 'If-None-Match' returns a 304
+            with no body until a record in the list has been added, changed or removed.
 
         responses:
             200:
                 description: A list of Syllabus records, filtered and ordered by the User
+            304:
+                description: The list has not changed since the ETag sent in 'If-None-Match'
             400: {}
         """
-        tracer = settings.TRACER
-
-        with tracer.start_span('validating_controller', child_of=request.span) as span:
-            controller = SyllabusListController(data=request.GET, request=request, span=span)
-            controller.is_valid()
-
-        with tracer.start_span('get_objects', child_of=request.span):
-            order = controller.cleaned_data['order']
-            try:
-                objs = Syllabus.objects.filter(
-                    member_id=request.user.member['id'],
-                    **controller.cleaned_data['search'],
-                ).exclude(
-                    **controller.cleaned_data['exclude'],
-                ).order_by(
-                    order,
-                )
-            except (ValueError, ValidationError):
-                return Http400(error_code='training_syllabus_list_001')
-
-        with tracer.start_span('generating_metadata', child_of=request.span):
-            total_records = objs.count()
-            page = controller.cleaned_data['page']
-            limit = controller.cleaned_data['limit']
-            warnings = controller.warnings
-            metadata = {
-                'limit': limit,
-                'order': order,
-                'page': page,
-                'total_records': total_records,
-                'warnings': warnings,
-            }
-            objs = objs[page * limit:(page + 1) * limit]
-
-        with tracer.start_span('serializing_data', child_of=request.span) as span:
-            span.set_tag('num_objects', objs.count())
-            data = SyllabusSerializer(
-                instance=objs,
-                many=True,
-            ).data
-            return Response({'content': data, '_metadata': metadata})
+        return self.list(request)
 
     def post(self, request: Request) -> Response:
         """
@@ -119,7 +98,59 @@ class SyllabusCollection(APIView):
         return Response({'content': data}, status=status.HTTP_201_CREATED)
 
 
-class SyllabusResource(APIView):
+class SyllabusExport(TrainingAPIView):
+    """
+    Handles streaming every Syllabus record in a list, for exports that are too big to page through
+    """
+    def get(self, request: Request) -> StreamingHttpResponse:
+        """
+        summary: Export a list of Syllabus records
+
+        description: |
+            Stream every Syllabus record for the requesting User's Member that matches the sent search, exclude and
+            order parameters, without pagination. Records are sent as newline delimited JSON by default, or as CSV
+            when the 'output' parameter is set to 'csv'. The 'fields' and 'expand' parameters can be used in the same
+            way as for the list.
+
+        responses:
+            200:
+                description: The Syllabus records are streamed
+            400: {}
+        """
+        tracer = settings.TRACER
+
+        with tracer.start_span('validating_controller', child_of=request.span) as span:
+            controller = SyllabusListController(data=request.GET, request=request, span=span)
+            controller.is_valid()
+            output = request.GET.get('output') or export.EXPORT_NDJSON
+            if output not in export.EXPORT_OUTPUTS:
+                return Http400(error_code='training_syllabus_export_002')
+            try:
+                fields = SyllabusRowSerializer.select(
+                    SyllabusRowSerializer.parse_fields(controller.cleaned_data['fields']),
+                    SyllabusRowSerializer.parse_expand(controller.cleaned_data['expand']),
+                )
+            except ValueError:
+                return Http400(error_code='training_syllabus_export_003')
+
+        with tracer.start_span('get_objects', child_of=request.span):
+            try:
+                objs = Syllabus.objects.filter(
+                    member_id=request.user.member['id'],
+                    **controller.cleaned_data['search'],
+                ).exclude(
+                    **controller.cleaned_data['exclude'],
+                ).order_by(
+                    *pagination.ordering(controller.cleaned_data['order']),
+                )
+            except (ValueError, ValidationError):
+                return Http400(error_code='training_syllabus_export_001')
+
+        # The records are fetched and serialized as the response is streamed
+        return export.stream(objs, SyllabusRowSerializer, fields, output, 'syllabi')
+
+
+class SyllabusResource(TrainingAPIView):
     """
     Handles methods regarding Syllabus records that do require an id to be specified, i.e. read, update, delete
     """
@@ -130,6 +161,9 @@ class SyllabusResource(APIView):
         description: |
             Attempt to read a Syllabus record in the requesting User's Member by the given 'pk', returning a 404 if
             it does not exist
+            The 'fields' parameter limits the record to the given comma separated keys, e.g. 'id,name'.
+            The record is sent with an 'ETag' header. Sending it back in 'If-None-Match' returns a 304 with no body
+            until the record has changed.
 
         path_params:
             pk:
@@ -139,6 +173,9 @@ class SyllabusResource(APIView):
         responses:
             200:
                 description: Syllabus record was read successfully
+            304:
+                description: Syllabus record has not changed since the ETag sent in 'If-None-Match'
+            400: {}
             403: {}
             404: {}
         """
@@ -146,7 +183,22 @@ class SyllabusResource(APIView):
 
         with tracer.start_span('retrieving_syllabus_object', child_of=request.span):
             try:
-                obj = Syllabus.objects.get(id=pk)
+                fields = SyllabusRowSerializer.parse_fields(request.GET.get('fields'))
+            except ValueError:
+                return Http400(error_code='training_syllabus_read_002')
+            try:
+                fields = SyllabusRowSerializer.select(
+                    fields,
+                    SyllabusRowSerializer.parse_expand(request.GET.get('expand')),
+                )
+            except ValueError:
+                return Http400(error_code='training_syllabus_read_003')
+            objs = Syllabus.objects.all()
+            if fields is not None:
+                # Only load the requested columns and nested records
+                objs = scoped.sparse(objs, SyllabusRowSerializer, fields)
+            try:
+                obj = scoped.get(objs, pk, request.user.member['id'])
             except Syllabus.DoesNotExist:
                 return Http404(error_code='training_syllabus_read_001')
 
@@ -156,10 +208,18 @@ class SyllabusResource(APIView):
             if err is not None:
                 return err
 
+        # Clients polling the record are only sent it again once it has changed
+        tag = etag.for_record(request, obj, SyllabusRowSerializer, fields)
+        if etag.if_none_match(request, tag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': tag})
+
         with tracer.start_span('serializing_data', child_of=request.span):
-            data = SyllabusSerializer(instance=obj).data
+            if fields is None:
+                data = SyllabusSerializer(instance=obj).data
+            else:
+                data = SyllabusRowSerializer.serialize_instance(obj, fields)
 
-        return Response({'content': data})
+        return Response({'content': data}, status=status.HTTP_200_OK, headers={'ETag': tag})
 
     def put(self, request: Request, pk: int, partial: bool = False) -> Response:
         """
@@ -167,6 +227,8 @@ class SyllabusResource(APIView):
         description: |
             Attempt to update a Syllabus record in the requesting User's Member by the given 'pk', returning a 404 if
             it does not exist
+            Sending the 'ETag' of the record in 'If-Match' makes the update conditional, returning a 412 if the
+            record has changed since.
 
         path_params:
             pk:
@@ -179,12 +241,14 @@ class SyllabusResource(APIView):
             400: {}
             403: {}
             404: {}
+            412:
+                description: Syllabus record has changed since the ETag sent in 'If-Match'
         """
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_syllabus_object', child_of=request.span):
             try:
-                obj = Syllabus.objects.get(id=pk)
+                obj = scoped.get(Syllabus.objects.all(), pk, request.user.member['id'])
             except Syllabus.DoesNotExist:
                 return Http404(error_code='training_syllabus_update_001')
 
@@ -193,6 +257,11 @@ class SyllabusResource(APIView):
             if err is not None:
                 return err
 
+        # Only update the record if it has not changed since the client last read it, when they ask for that
+        tag = etag.for_record(None, obj, SyllabusRowSerializer)
+        if not etag.if_match(request, tag):
+            return Response(status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': tag})
+
         with tracer.start_span('validating_controller', child_of=request.span) as span:
             controller = SyllabusUpdateController(
                 data=request.data,
@@ -209,7 +278,8 @@ class SyllabusResource(APIView):
 
         with tracer.start_span('Serializing_data', child_of=request.span):
             data = SyllabusSerializer(instance=controller.instance).data
-        return Response({'content': data}, status=status.HTTP_200_OK)
+        tag = etag.for_record(None, controller.instance, SyllabusRowSerializer)
+        return Response({'content': data}, status=status.HTTP_200_OK, headers={'ETag': tag})
 
     def patch(self, request: Request, pk: int) -> Response:
         """
@@ -223,7 +293,9 @@ class SyllabusResource(APIView):
 
         description: |
             Attempt to delete a Syllabus record in the requesting User's Member by the given 'pk', returning a 404 if
-            it does not exist
+            it does not exist. Every Class and Student in the Syllabus is deleted with it.
+            If there are more than 1000 records to delete, they are deleted in the background and a 202 is returned
+            with a Job that can be polled until they have been deleted.
 
         path_params:
             pk:
@@ -231,6 +303,8 @@ class SyllabusResource(APIView):
                 type: integer
 
         responses:
+            202:
+                description: Syllabus record will be deleted by the returned Job
             204:
                 description: Syllabus record was deleted successfully
             403: {}
@@ -239,8 +313,10 @@ class SyllabusResource(APIView):
         tracer = settings.TRACER
 
         with tracer.start_span('retrieving_syllabus_object', child_of=request.span):
+            # Whether the Syllabus has Students is fetched with it, for the permission check
+            objs = Syllabus.objects.annotate(has_students=Exists(Student.objects.filter(cls__syllabus=OuterRef('pk'))))
             try:
-                obj = Syllabus.objects.get(id=pk)
+                obj = scoped.get(objs, pk, request.user.member['id'])
             except Syllabus.DoesNotExist:
                 return Http404(error_code='training_syllabus_delete_001')
 
@@ -250,6 +326,37 @@ class SyllabusResource(APIView):
                 return err
 
         with tracer.start_span('deleting_object', child_of=request.span):
+            # Cascades that are too big to delete while the request waits are deleted in the background
+            if cascade.exceeds(Syllabus.objects.filter(pk=obj.pk), jobs.INLINE_LIMIT):
+                return jobs.accepted(jobs.enqueue(jobs.JOB_SOFT_DELETE, Syllabus, 'member_id', obj.member_id, [obj.pk]))
             obj.cascade_delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncSyllabusCollection(AsyncTrainingAPIView, SyllabusCollection):
+    """
+    The async variant of SyllabusCollection, served under ASGI
+    """
+    async def get(self, request: Request) -> Response:
+        """
+        Retrieve a list of Syllabus records, as `SyllabusCollection.get` does
+        """
+        return await self.alist(request)
+
+    post = sync_handler(SyllabusCollection.post)
+
+
+class AsyncSyllabusResource(AsyncTrainingAPIView, SyllabusResource):
+    """
+    The async variant of SyllabusResource, served under ASGI
+    """
+    get = sync_handler(SyllabusResource.get)
+    put = sync_handler(SyllabusResource.put)
+    delete = sync_handler(SyllabusResource.delete)
+
+    async def patch(self, request: Request, pk: int) -> Response:
+        """
+        Attempt to partially update a Syllabus record
+        """
+        return await self.put(request, pk, True)